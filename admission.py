@@ -0,0 +1,254 @@
+"""
+Admission control for the inference stage
+Per-client token-bucket quotas, bounded per-priority queues and a weighted
+fair queue that hands out a fixed number of inference slots. Priority
+classes share slots by weight; clients within a class take turns
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from metrics import metrics
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; retry_after is the suggested wait in seconds"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Server busy ({reason}), retry after {retry_after:.0f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `burst`; rate 0 means unlimited"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, cost: float = 1.0) -> float:
+        """Take cost tokens and return 0, or return the seconds until they are available"""
+        if not self.rate:
+            return 0.0
+        self._refill()
+        # A request larger than the burst costs a full bucket
+        cost = min(cost, self.burst)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def wait_time(self, cost: float = 1.0) -> float:
+        """Seconds until cost tokens are available, without taking them"""
+        if not self.rate:
+            return 0.0
+        self._refill()
+        return max(min(cost, self.burst) - self.tokens, 0.0) / self.rate
+
+
+class PriorityClass:
+    """
+    Scheduling and quota settings of one priority class
+    weight: share of slots relative to other classes while both are queued
+    rate / burst: per-client token bucket (requests per second, 0 = no quota)
+    max_queue: waiting requests before new ones are shed
+    max_wait: seconds a request may wait for a slot before it is shed
+    """
+
+    def __init__(self, name, weight=1.0, rate=0.0, burst=10.0, max_queue=64, max_wait=60.0):
+        self.name = name
+        self.weight = weight
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        # Scheduler state: stride pass value and per-client FIFOs in turn order
+        self.pass_value = 0.0
+        self.flows = OrderedDict()
+        self.queued = 0
+
+
+class _Waiter:
+    __slots__ = ("future", "cost", "enqueued")
+
+    def __init__(self, future, cost):
+        self.future = future
+        self.cost = cost
+        self.enqueued = time.monotonic()
+
+
+class AdmissionController:
+    """
+    Gatekeeper in front of model inference; used from the event loop only
+
+        controller.check_quota(client, "interactive")
+        async with controller.slot(client, "interactive"):
+            result = await run_in_threadpool(...)
+    """
+
+    def __init__(self, slots=2, classes=None, max_clients=10000):
+        self.slots = max(1, slots)
+        self.classes = {c.name: c for c in (classes or [PriorityClass("default")])}
+        self.max_clients = max_clients
+
+        self.in_flight = 0
+        self.virtual_time = 0.0
+        self.service_seconds = None
+        self._buckets = OrderedDict()
+
+    # ------------------------------------------------------------------
+    # Quotas
+    # ------------------------------------------------------------------
+
+    def _bucket(self, client: str, priority: str) -> TokenBucket:
+        key = (priority, client)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            cls = self.classes[priority]
+            bucket = self._buckets[key] = TokenBucket(cls.rate, cls.burst)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        self._buckets.move_to_end(key)
+        return bucket
+
+    def check_quota(self, client: str, priority: str, cost: float = 1.0):
+        """Charge cost tokens to the client, or raise AdmissionRejected"""
+        retry_after = self._bucket(client, priority).take(cost)
+        if retry_after:
+            metrics.inc("admission_requests_total", priority=priority, result="quota")
+            raise AdmissionRejected("quota", retry_after)
+
+    def quota_retry_after(self, client: str, priority: str) -> float:
+        """Seconds until the client can afford one request (0 if now)"""
+        return self._bucket(client, priority).wait_time()
+
+    async def wait_quota(self, client: str, priority: str, cost: float = 1.0):
+        """Charge cost tokens, sleeping until the bucket has them (paces bulk streams)"""
+        while True:
+            retry_after = self._bucket(client, priority).take(cost)
+            if not retry_after:
+                return
+            await asyncio.sleep(retry_after)
+
+    # ------------------------------------------------------------------
+    # Weighted fair queue
+    # ------------------------------------------------------------------
+
+    def estimated_wait(self) -> float:
+        """Rough seconds until a newly queued request would start"""
+        queued = sum(c.queued for c in self.classes.values())
+        per_request = self.service_seconds or 1.0
+        return (queued + 1) * per_request / self.slots
+
+    def _update_gauges(self):
+        metrics.set_gauge("admission_in_flight", self.in_flight)
+        for cls in self.classes.values():
+            metrics.set_gauge("admission_queue_depth", cls.queued, priority=cls.name)
+
+    def _dispatch(self):
+        while self.in_flight < self.slots:
+            active = [c for c in self.classes.values() if c.queued]
+            if not active:
+                break
+
+            # Stride scheduling across classes, round-robin across clients within one
+            cls = min(active, key=lambda c: c.pass_value)
+            client, waiters = next(iter(cls.flows.items()))
+            waiter = waiters.popleft()
+            cls.queued -= 1
+            if waiters:
+                cls.flows.move_to_end(client)
+            else:
+                del cls.flows[client]
+
+            self.virtual_time = cls.pass_value
+            cls.pass_value += waiter.cost / cls.weight
+            self.in_flight += 1
+            waiter.future.set_result(None)
+
+        self._update_gauges()
+
+    def _remove(self, cls: PriorityClass, client: str, waiter: _Waiter):
+        waiters = cls.flows.get(client)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            cls.queued -= 1
+            if not waiters:
+                del cls.flows[client]
+            self._update_gauges()
+
+    def _release(self, admitted_at: Optional[float]):
+        """Free a slot; admitted_at None skips the service-time estimate (no work was done)"""
+        self.in_flight -= 1
+        if admitted_at is not None:
+            duration = time.monotonic() - admitted_at
+            self.service_seconds = duration if self.service_seconds is None \
+                else 0.8 * self.service_seconds + 0.2 * duration
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, client: str, priority: str, cost: float = 1.0, bounded: bool = True):
+        """
+        Wait for an inference slot in the client's turn
+        With bounded=True a full queue or an expired max_wait raises
+        AdmissionRejected; bounded=False waits indefinitely (items of an
+        already-accepted stream)
+        """
+        cls = self.classes[priority]
+        if bounded and cls.queued >= cls.max_queue:
+            metrics.inc("admission_requests_total", priority=priority, result="queue_full")
+            raise AdmissionRejected("queue_full", self.estimated_wait())
+
+        # An idle class re-enters at the current virtual time, so it cannot bank credit
+        if not cls.queued:
+            cls.pass_value = max(cls.pass_value, self.virtual_time)
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), cost)
+        cls.flows.setdefault(client, deque()).append(waiter)
+        cls.queued += 1
+        self._dispatch()
+
+        try:
+            done, _ = await asyncio.wait({waiter.future}, timeout=cls.max_wait if bounded else None)
+        except asyncio.CancelledError:
+            # Client went away while queued (or right after being admitted, before any work ran)
+            if waiter.future.done():
+                self._release(None)
+            else:
+                waiter.future.cancel()
+                self._remove(cls, client, waiter)
+            raise
+
+        if not done:
+            waiter.future.cancel()
+            self._remove(cls, client, waiter)
+            metrics.inc("admission_requests_total", priority=priority, result="timeout")
+            raise AdmissionRejected("timeout", self.estimated_wait())
+
+        admitted_at = time.monotonic()
+        metrics.observe("admission_queue_wait_seconds", admitted_at - waiter.enqueued, priority=priority)
+        metrics.inc("admission_requests_total", priority=priority, result="admitted")
+        try:
+            yield
+        finally:
+            self._release(admitted_at)
+
+    def stats(self):
+        return {
+            "slots": self.slots,
+            "in_flight": self.in_flight,
+            "queued": {name: c.queued for name, c in self.classes.items()},
+            "service_seconds": self.service_seconds,
+        }
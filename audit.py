@@ -0,0 +1,324 @@
+"""
+Append-only prediction audit log
+Verdicts are queued in memory and written to SQLite in batches by a
+background thread, so recording one never waits on disk in the request
+path. The active database rotates into closed segments by row count or
+size; a segment is compacted when it closes and dropped once it falls
+outside the retention limits
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from metrics import metrics
+
+
+# (column, SQLite type); timings and details hold JSON objects
+COLUMNS = [
+    ("ts", "REAL NOT NULL"),
+    ("endpoint", "TEXT"),
+    ("content_hash", "TEXT"),
+    ("video_name", "TEXT"),
+    ("client", "TEXT"),
+    ("priority", "TEXT"),
+    ("model", "TEXT"),
+    ("architecture", "TEXT"),
+    ("threshold", "REAL"),
+    ("calibration", "TEXT"),
+    ("prediction", "TEXT"),
+    ("confidence", "REAL"),
+    ("raw_score", "REAL"),
+    ("is_fake", "INTEGER"),
+    ("cached", "INTEGER"),
+    ("short_circuited", "INTEGER"),
+    ("reason", "TEXT"),
+    ("frames_analyzed", "INTEGER"),
+    ("request_seconds", "REAL"),
+    ("timings", "TEXT"),
+    ("details", "TEXT"),
+]
+JSON_COLUMNS = {"timings", "details"}
+GROUP_COLUMNS = {"endpoint", "model", "architecture", "prediction", "client", "priority", "reason"}
+
+ACTIVE_NAME = "predictions.db"
+SEGMENT_GLOB = "predictions-*.db"
+
+
+class AuditLog:
+    """
+    Batched SQLite writer plus read-side queries over all segments
+    record() never blocks: when the queue is full the entry is dropped and
+    counted. Rows become visible to queries within flush_seconds
+    """
+
+    def __init__(self, directory, batch_size=256, flush_seconds=1.0, queue_size=10000,
+                 rotate_rows=500000, rotate_bytes=256 << 20, max_segments=30, retention_days=0):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.rotate_rows = rotate_rows
+        self.rotate_bytes = rotate_bytes
+        self.max_segments = max_segments
+        # 0 keeps segments regardless of age
+        self.retention_days = retention_days
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        # Held while the active file is renamed, so readers never see it half-rotated
+        self._files_lock = threading.Lock()
+        self._thread = None
+        self.written = 0
+        self.dropped = 0
+        self.active_rows = 0
+
+    # ------------------------------------------------------------------
+    # Write path
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def record(self, entry: dict) -> bool:
+        """Queue one verdict; returns False (and counts a drop) if the writer is behind"""
+        entry.setdefault("ts", time.time())
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            metrics.inc("audit_records_total", result="dropped")
+            return False
+
+    def close(self, timeout=10.0):
+        """Flush queued entries and stop the writer"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _connect(self, path: Path):
+        conn = sqlite3.connect(str(path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"CREATE TABLE IF NOT EXISTS predictions "
+                     f"(id INTEGER PRIMARY KEY, {', '.join(f'{c} {t}' for c, t in COLUMNS)})")
+        conn.execute("CREATE INDEX IF NOT EXISTS predictions_ts ON predictions (ts)")
+        conn.execute("CREATE INDEX IF NOT EXISTS predictions_content ON predictions (content_hash)")
+        conn.commit()
+        return conn
+
+    def _run(self):
+        conn = self._connect(self.directory / ACTIVE_NAME)
+        self.active_rows = conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+        self._prune()
+
+        stopping = False
+        while not stopping:
+            entry = self._queue.get()
+            batch = []
+            deadline = time.monotonic() + self.flush_seconds
+            # Collect up to batch_size entries or whatever arrives within flush_seconds
+            while True:
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    entry = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    self._write(conn, batch)
+                except Exception as e:
+                    print(f"⚠️ Audit log write failed: {e}")
+                    metrics.inc("audit_records_total", len(batch), result="failed")
+                    continue
+                if self._should_rotate():
+                    conn = self._rotate(conn)
+        conn.close()
+
+    def _write(self, conn, batch):
+        start = time.perf_counter()
+        rows = [
+            tuple(json.dumps(e.get(c)) if c in JSON_COLUMNS and e.get(c) is not None else e.get(c)
+                  for c, _ in COLUMNS)
+            for e in batch
+        ]
+        conn.executemany(
+            f"INSERT INTO predictions ({', '.join(c for c, _ in COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+            rows
+        )
+        conn.commit()
+        self.written += len(rows)
+        self.active_rows += len(rows)
+        metrics.observe("audit_write_seconds", time.perf_counter() - start)
+        metrics.inc("audit_records_total", len(rows), result="written")
+        metrics.set_gauge("audit_queue_depth", self._queue.qsize())
+
+    def _should_rotate(self) -> bool:
+        if self.rotate_rows and self.active_rows >= self.rotate_rows:
+            return True
+        path = self.directory / ACTIVE_NAME
+        wal = path.with_name(path.name + "-wal")
+        size = path.stat().st_size + (wal.stat().st_size if wal.exists() else 0)
+        return bool(self.rotate_bytes) and size >= self.rotate_bytes
+
+    def _rotate(self, conn):
+        """Close the active database as a compacted segment and start a new one"""
+        start = time.perf_counter()
+        # Fold the WAL back in so the segment is a single self-contained file
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+
+        segment = self.directory / f"predictions-{datetime.now().strftime('%Y%m%dT%H%M%S%f')}.db"
+        with self._files_lock:
+            (self.directory / ACTIVE_NAME).rename(segment)
+            conn = self._connect(self.directory / ACTIVE_NAME)
+        self.active_rows = 0
+
+        # Segments are read-only from here on; VACUUM drops free pages and defragments the indexes
+        compact = sqlite3.connect(str(segment))
+        compact.execute("VACUUM")
+        compact.close()
+        self._prune()
+
+        metrics.inc("audit_rotations_total")
+        metrics.observe("audit_rotate_seconds", time.perf_counter() - start)
+        print(f"✅ Audit log rotated to {segment.name}")
+        return conn
+
+    def _prune(self):
+        """Delete segments beyond max_segments or older than retention_days"""
+        segments = self._segments()
+        cutoff = time.time() - self.retention_days * 86400 if self.retention_days else None
+        with self._files_lock:
+            for i, path in enumerate(segments):
+                if (self.max_segments and i >= self.max_segments) or \
+                        (cutoff is not None and path.stat().st_mtime < cutoff):
+                    path.unlink()
+        metrics.set_gauge("audit_segments", len(self._segments()))
+
+    # ------------------------------------------------------------------
+    # Read path
+    # ------------------------------------------------------------------
+
+    def _segments(self):
+        """Closed segments, newest first"""
+        return sorted(self.directory.glob(SEGMENT_GLOB), reverse=True)
+
+    def _scan(self, since=None):
+        """Yield a read-only connection per database holding rows newer than since, newest first"""
+        with self._files_lock:
+            paths = [self.directory / ACTIVE_NAME] + self._segments()
+            for path in paths:
+                if not path.exists():
+                    continue
+                conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+                conn.row_factory = sqlite3.Row
+                try:
+                    newest = conn.execute("SELECT MAX(ts) FROM predictions").fetchone()[0]
+                    if newest is None:
+                        continue
+                    if since is not None and newest < since:
+                        # Older segments cannot hold newer rows
+                        break
+                    yield conn
+                except sqlite3.OperationalError:
+                    continue  # active database not created yet
+                finally:
+                    conn.close()
+
+    @staticmethod
+    def _where(filters: dict, since=None):
+        clauses, params = [], []
+        for column, value in filters.items():
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def recent(self, limit=50, since=None, **filters):
+        """Newest rows first; filters are exact matches on endpoint, prediction, content_hash, client..."""
+        where, params = self._where(filters, since)
+        rows = []
+        for conn in self._scan(since):
+            query = f"SELECT * FROM predictions{where} ORDER BY ts DESC LIMIT ?"
+            for row in conn.execute(query, params + [limit - len(rows)]):
+                entry = dict(row)
+                for column in JSON_COLUMNS:
+                    if entry[column] is not None:
+                        entry[column] = json.loads(entry[column])
+                rows.append(entry)
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def aggregate(self, since=None, group_by=None):
+        """
+        Counts, verdict shares, mean confidence and request latency
+        percentiles (computed over uncached requests), overall or per group_by column
+        """
+        if group_by is not None and group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Cannot group by '{group_by}'. Allowed: {', '.join(sorted(GROUP_COLUMNS))}")
+        key = group_by or "'all'"
+        where, params = self._where({}, since)
+
+        groups = {}
+        latencies = {}
+        for conn in self._scan(since):
+            query = (f"SELECT {key} AS grp, COUNT(*) AS count, SUM(is_fake) AS fake, SUM(cached) AS cached, "
+                     f"SUM(short_circuited) AS short_circuited, SUM(confidence) AS confidence "
+                     f"FROM predictions{where} GROUP BY grp")
+            for row in conn.execute(query, params):
+                totals = groups.setdefault(row["grp"], dict.fromkeys(
+                    ["count", "fake", "cached", "short_circuited", "confidence"], 0.0))
+                for field in totals:
+                    totals[field] += row[field] or 0
+
+            uncached = f"{where} {'AND' if where else 'WHERE'} cached = 0 AND request_seconds IS NOT NULL"
+            for grp, seconds in conn.execute(f"SELECT {key}, request_seconds FROM predictions{uncached}", params):
+                latencies.setdefault(grp, []).append(seconds)
+
+        result = {}
+        for grp, totals in groups.items():
+            count = int(totals["count"])
+            seconds = np.array(latencies.get(grp, []))
+            result[grp] = {
+                "count": count,
+                "fake_rate": totals["fake"] / count,
+                "cached_rate": totals["cached"] / count,
+                "short_circuit_rate": totals["short_circuited"] / count,
+                "mean_confidence": totals["confidence"] / count,
+                "request_seconds": {
+                    f"p{q}": float(np.percentile(seconds, q)) for q in (50, 95, 99)
+                } if len(seconds) else None,
+            }
+        return result
+
+    def stats(self):
+        return {
+            "directory": str(self.directory),
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "active_rows": self.active_rows,
+            "segments": len(self._segments()),
+        }
@@ -4,20 +4,47 @@ Combined single-file implementation based on ResNet50+BiLSTM model
 Updated with proper handling for class-imbalanced trained models
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Request, UploadFile, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
 from typing import Optional
 import tempfile
 import os
+import math
+import io
+import json
+import time
+import queue
+import asyncio
+import threading
+import hashlib
+import hmac
+import base64
+import zipfile
+import zlib
+import functools
+from collections import deque, OrderedDict
+from contextlib import nullcontext
 from pathlib import Path
-import torch
-import torch.nn as nn
-from torchvision import models
-import torchvision.transforms as T
-import cv2
+import numpy as np
 from PIL import Image
-from facenet_pytorch import MTCNN
+
+# torch, OpenCV and the modules built on them (decoders, face_detectors,
+# fingerprints, models) are imported where they are used, so importing the
+# app stays fast and the model loader pays for them on its own thread
+from inference_ipc import RemoteModelManager
+from metrics import metrics
+from admission import AdmissionController, AdmissionRejected, PriorityClass
+from buffers import BufferPool, MemoryBudget
+from calibration import Calibration, calibration_path
+from audit import AuditLog
+from profiling import RequestProfiler
 
 
 # ============================================================================
@@ -27,10 +54,24 @@ from facenet_pytorch import MTCNN
 class PredictionResponse(BaseModel):
     video_name: str
     prediction: str
-    confidence: float
-    is_fake: bool
+    # None when the cascade abstains (prediction "ABSTAIN")
+    confidence: Optional[float] = None
+    is_fake: Optional[bool] = None
     frames_analyzed: int
-    raw_score: float
+    raw_score: Optional[float] = None
+    short_circuited: bool = False
+    cascade_reason: Optional[str] = None
+    decoder: Optional[str] = None
+    frames_real: Optional[int] = None
+    frames_padded: Optional[int] = None
+    frames_reused: Optional[int] = None
+    frame_reuse_ratio: Optional[float] = None
+    near_duplicate: Optional[dict] = None
+    tta: Optional[dict] = None
+    faces: Optional[dict] = None
+    timings: Optional[dict] = None
+    cached: bool = False
+    prediction_id: Optional[str] = None
 
 
 class HealthResponse(BaseModel):
@@ -45,53 +86,19 @@ class BatchPredictionItem(BaseModel):
     confidence: Optional[float] = None
     is_fake: Optional[bool] = None
     frames_analyzed: Optional[int] = None
+    short_circuited: bool = False
+    cascade_reason: Optional[str] = None
+    decoder: Optional[str] = None
+    frames_real: Optional[int] = None
+    frames_padded: Optional[int] = None
+    frames_reused: Optional[int] = None
+    frame_reuse_ratio: Optional[float] = None
+    near_duplicate: Optional[dict] = None
+    timings: Optional[dict] = None
+    cached: bool = False
     error: Optional[str] = None
 
 
-# ============================================================================
-# MODEL ARCHITECTURE
-# ============================================================================
-
-class ResNet50BiLSTM(nn.Module):
-    """
-    ResNet50 feature extractor + BiLSTM temporal model for deepfake detection
-    Note: No sigmoid in forward pass when using BCEWithLogitsLoss during training
-    """
-
-    def __init__(self, hidden=256):
-        super().__init__()
-        # ResNet50 as feature extractor
-        base = models.resnet50(weights=models.ResNet50_Weights.IMAGENET1K_V2)
-        self.cnn = nn.Sequential(*list(base.children())[:-1])
-
-        # BiLSTM for temporal modeling
-        self.lstm = nn.LSTM(2048, hidden, batch_first=True, bidirectional=True)
-
-        # Classification head (no sigmoid - applied separately)
-        self.head = nn.Sequential(
-            nn.Linear(hidden * 2, 128),
-            nn.ReLU(inplace=True),
-            nn.Dropout(0.5),
-            nn.Linear(128, 1)
-        )
-
-    def forward(self, x):
-        # x shape: (batch, num_frames, 3, 224, 224)
-        B, T, C, H, W = x.shape
-
-        # Extract features for each frame
-        x = x.view(B * T, C, H, W)
-        feats = self.cnn(x)  # (B*T, 2048, 1, 1)
-        feats = feats.view(B, T, -1)  # (B, T, 2048)
-
-        # Temporal modeling with BiLSTM
-        lstm_out, _ = self.lstm(feats)
-
-        # Use last hidden state for classification
-        out = self.head(lstm_out[:, -1, :])
-        return out
-
-
 # ============================================================================
 # VIDEO PREPROCESSING
 # ============================================================================
@@ -99,26 +106,57 @@ class ResNet50BiLSTM(nn.Module):
 class VideoPreprocessor:
     """Extracts and preprocesses faces from video frames"""
 
-    def __init__(self, device='cuda', num_frames=12, image_size=224):
+    def __init__(self, device='cuda', num_frames=12, image_size=224, margin=20, detect_size=640,
+                 decoder="auto", decode_threads=0, face_detector="mtcnn", detector_options=None,
+                 detect_batch_size=4, index_cache_seconds=3600, index_cache_size=1024,
+                 buffer_pool_bytes=256 << 20, memory_budget=None, frame_candidates=1,
+                 probe_max_packets=0, frame_cache=None):
+        import torch
+        from decoders import DecoderSelector
+        from face_detectors import create_detector
         self.device = torch.device(device if torch.cuda.is_available() else 'cpu')
         self.num_frames = num_frames
         self.image_size = image_size
+        self.margin = margin
+
+        # Video decoder backend ("auto" picks the fastest installed one per container)
+        self.decoders = DecoderSelector(decoder, threads=decode_threads)
+        # Probed frame indexes keyed by content hash, so re-submitted videos skip the probe
+        self.indexes = TTLCache(index_cache_seconds, index_cache_size) if index_cache_size > 0 else None
+        # Longer containers are indexed from their headers instead of packet by packet
+        self.probe_max_packets = probe_max_packets
+
+        # Longest side of the proxy frame used for detection (0 = full resolution)
+        self.detect_size = detect_size
+        # Frames handed to the detector per call (bounds full-resolution frames held at once)
+        self.detect_batch_size = detect_batch_size
+
+        # Clip tensors and decode / proxy frames are recycled across requests
+        self.clips = BufferPool("clip", "torch", buffer_pool_bytes)
+        self.scratch = BufferPool("scratch", "numpy", buffer_pool_bytes)
+        # Shared cap on the working set of concurrent decodes (None = unlimited)
+        self.memory_budget = memory_budget
+        # Candidates scored per sampling slot by extract_frames (1 = the training-consistent positions only)
+        self.frame_candidates = max(frame_candidates, 1)
+        # Face boxes (and, filled in by ModelManager, trunk features) of frames seen before
+        self.frame_cache = frame_cache
 
         # Face detector
+        options = dict(detector_options or {})
+        if face_detector == "mtcnn":
+            options.setdefault("device", self.device)
         try:
-            self.mtcnn = MTCNN(
-                image_size=image_size,
-                margin=20,
-                keep_all=False,
-                device=self.device,
-                post_process=False
-            )
-            self.face_detection_enabled = True
+            self.detector = create_detector(face_detector, **options)
         except Exception as e:
             print(f"⚠️ Face detection disabled: {e}")
-            self.face_detection_enabled = False
+            self.detector = create_detector("none")
+        self.face_detection_enabled = self.detector.name != "none"
 
-        # Image transforms
+        # Image transforms (torchvision is imported here rather than at module
+        # import, so the API process boots before the model is built)
+        import torchvision.transforms as T
+
+        self.to_pil = T.ToPILImage()
         self.transform = T.Compose([
             T.Resize((image_size, image_size)),
             T.ToTensor(),
@@ -126,83 +164,763 @@ class VideoPreprocessor:
                        std=[0.229, 0.224, 0.225])
         ])
 
-    def extract_frames(self, video_path: str):
-        """Extract evenly-spaced frames from video with face detection"""
-        frames = []
-        cap = cv2.VideoCapture(video_path)
+    def downscale(self, frame):
+        """Shrink a decoded BGR frame to the detection proxy size, returns (proxy, scale)"""
+        import cv2
+        h, w = frame.shape[:2]
+        scale = self.detect_size / max(h, w) if self.detect_size else 1.0
+        if scale >= 1:
+            return frame, 1.0
+        size = (round(w * scale), round(h * scale))
+        proxy = self.scratch.acquire((size[1], size[0]) + frame.shape[2:], frame.dtype)
+        cv2.resize(frame, size, dst=proxy, interpolation=cv2.INTER_AREA)
+        return proxy, scale
+
+    def crop_face(self, frame, box, margin=None):
+        """
+        Crop a detected face from the full-resolution BGR frame
+        Mirrors MTCNN's own extract_face (margin in output pixels, bilinear
+        resize) so the model sees the same input as with mtcnn(img)
+        """
+        import cv2
+        import torch
+        h, w = frame.shape[:2]
+        margin = self.margin if margin is None else margin
+        margin_x = margin * (box[2] - box[0]) / (self.image_size - margin)
+        margin_y = margin * (box[3] - box[1]) / (self.image_size - margin)
+        x0 = int(max(box[0] - margin_x / 2, 0))
+        y0 = int(max(box[1] - margin_y / 2, 0))
+        x1 = int(min(box[2] + margin_x / 2, w))
+        y1 = int(min(box[3] + margin_y / 2, h))
+
+        # Only the face region is colour-converted, never the whole frame
+        region = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2RGB)
+        face = Image.fromarray(region).resize((self.image_size, self.image_size), Image.BILINEAR)
+        return torch.from_numpy(np.float32(face)).permute(2, 0, 1)
+
+    def frame_key(self, proxy, shape) -> str:
+        """
+        Lookup key of a decoded frame: a hash of its 32x32 luma and its size,
+        with no timestamps, so a frame keeps its key in trimmed or remuxed
+        copies. Distinct frames can share a key; FrameCache confirms matches
+        with the exact frame_digest
+        """
+        import cv2
+        small = cv2.resize(proxy, (32, 32), interpolation=cv2.INTER_AREA)
+        luma = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return hashlib.blake2b(luma.tobytes() + f"{shape[1]}x{shape[0]}".encode(), digest_size=16).hexdigest()
+
+    def locate_faces(self, frames, entries=None):
+        """
+        Downscale frames to detection proxies and find the largest face in
+        each, one detector call. Returns (proxies, scales, boxes, probs):
+        boxes are in full-resolution coordinates, None (prob 0) without a face
+        With a frame cache and a list passed as entries, frames seen before
+        reuse their cached box instead of being detected again, and entries
+        collects each frame's (key, cache entry or None)
+        Callers hand the proxies back with release_proxies(frames, proxies)
+        """
+        proxies, scales = zip(*(self.downscale(frame) for frame in frames))
+
+        try:
+            boxes = [None] * len(frames)
+            probs = [0.0] * len(frames)
+            todo = list(range(len(frames)))
+            if entries is not None and self.frame_cache is not None:
+                todo = []
+                for i, (frame, proxy) in enumerate(zip(frames, proxies)):
+                    key = self.frame_key(proxy, frame.shape)
+                    entry = self.frame_cache.get(key, frame)
+                    if entry is None or "box" not in entry:
+                        entry = None
+                        todo.append(i)
+                    else:
+                        boxes[i], probs[i] = entry["box"], entry["prob"]
+                    entries.append((key, entry))
+                metrics.inc("frame_cache_requests_total", len(frames) - len(todo), stage="detection", result="hit")
+                metrics.inc("frame_cache_requests_total", len(todo), stage="detection", result="miss")
+
+            # Try face detection on the proxies of frames without a known box
+            if todo:
+                try:
+                    detections = self.detector.detect([proxies[i] for i in todo])
+                except Exception:
+                    # Fallback on any error
+                    detections = [None] * len(todo)
+                for i, detection in zip(todo, detections):
+                    if detection is not None and len(detection[0]):
+                        # Face detected on the proxy, in full-resolution coordinates
+                        boxes[i] = detection[0][0] / scales[i]
+                        probs[i] = float(detection[1][0])
+        except BaseException:
+            self.release_proxies(frames, proxies)
+            raise
+
+        return proxies, scales, boxes, probs
+
+    def release_proxies(self, frames, proxies):
+        for frame, proxy in zip(frames, proxies):
+            if proxy is not frame:
+                self.scratch.release(proxy)
+
+    def crop_faces(self, frames, proxies, boxes, out=None, margins=None):
+        """
+        Normalized (3, H, W) face crops of frames with a located face, the
+        full proxy frame for the rest; out and margins as in process_frames
+        """
+        import cv2
+        import torch
+        tensors = []
+        for i, (frame, proxy, box) in enumerate(zip(frames, proxies, boxes)):
+            if box is not None:
+                # Crop the face from the full-resolution frame
+                crops = [self.transform(self.to_pil(self.crop_face(frame, box, margin)))
+                         for margin in (margins or [None])]
+            else:
+                # No face (or detection disabled), use full frame
+                full = self.transform(Image.fromarray(cv2.cvtColor(proxy, cv2.COLOR_BGR2RGB)))
+                crops = [full] * len(margins or [None])
+            tensor = torch.stack(crops) if margins is not None else crops[0]
+            if out is not None:
+                tensor = out[i].copy_(tensor)
+            tensors.append(tensor)
+        return tensors
+
+    def process_frames(self, frames, out=None, margins=None):
+        """
+        Turn decoded BGR frames into normalized (3, H, W) face tensors, one detector call
+        With out, a (len(frames), 3, H, W) tensor, results are written into it
+        and the returned tensors are views of its rows
+        With margins, every frame yields a (len(margins), 3, H, W) stack of
+        crops of the same detection, one per face margin
+        """
+        proxies, _, boxes, _ = self.locate_faces(frames)
+        try:
+            return self.crop_faces(frames, proxies, boxes, out, margins)
+        finally:
+            self.release_proxies(frames, proxies)
+
+    def frame_quality(self, proxies, scales, boxes, probs):
+        """
+        Cheap quality score of candidate frames, higher is better
+        A frame with a face always beats one without. Detection probability,
+        face size relative to the model input and sharpness (variance of the
+        Laplacian of the face region, squashed to [0, 1)) each add up to 1;
+        faceless frames are ranked on sharpness alone
+        """
+        import cv2
+        patches = np.empty((len(proxies), 64, 64), np.float32)
+        for i, (proxy, scale, box) in enumerate(zip(proxies, scales, boxes)):
+            region = proxy
+            if box is not None:
+                x0, y0, x1, y1 = np.clip(box * scale, 0, [proxy.shape[1], proxy.shape[0]] * 2).astype(int)
+                if x1 > x0 and y1 > y0:
+                    region = proxy[y0:y1, x0:x1]
+            patches[i] = cv2.cvtColor(cv2.resize(region, (64, 64), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+
+        # 4-neighbour Laplacian over all candidates at once
+        laplacian = (4 * patches[:, 1:-1, 1:-1] - patches[:, :-2, 1:-1] - patches[:, 2:, 1:-1]
+                     - patches[:, 1:-1, :-2] - patches[:, 1:-1, 2:])
+        sharpness = laplacian.var(axis=(1, 2))
+        sharpness = sharpness / (sharpness + 100.0)
+
+        has_face = np.array([box is not None for box in boxes])
+        side = np.array([min(box[2] - box[0], box[3] - box[1]) if box is not None else 0.0 for box in boxes])
+        size = np.minimum(side / self.image_size, 1.0)
+        return np.where(has_face, 1.0 + np.asarray(probs) + size + sharpness, sharpness)
+
+    def working_set_bytes(self, width: int, height: int, crops: Optional[int] = None) -> int:
+        """
+        Peak bytes of one decode: a detector batch of frames and proxies (plus
+        the rest of a slot's candidates with frame selection), plus the face
+        crops it fills (num_frames of them for extract_frames)
+        """
+        frame = width * height * 3
+        scale = self.detect_size / max(width, height) if self.detect_size and width and height else 1.0
+        proxy = int(frame * scale * scale) if scale < 1 else 0
+        clip = (crops or self.num_frames) * 3 * self.image_size * self.image_size * 4
+        return (self.detect_batch_size + self.frame_candidates - 1) * (frame + proxy) + clip
+
+    def video_index(self, video_path: str, content_key: Optional[str] = None):
+        """Probe (or fetch the cached) VideoIndex for a video; None if it cannot be probed"""
+        from decoders import probe_video
+        if content_key is not None and self.indexes is not None:
+            index = self.indexes.get(content_key)
+            if index is not None:
+                metrics.inc("video_index_requests_total", result="hit")
+                return index
+
+        start = time.perf_counter()
+        index = probe_video(video_path, self.probe_max_packets)
+        metrics.observe("video_probe_seconds", time.perf_counter() - start)
+        metrics.inc("video_index_requests_total", result="miss")
+
+        if index is not None and content_key is not None and self.indexes is not None:
+            self.indexes.put(content_key, index)
+        return index
+
+    def sample_indices(self, frame_count: int, offset: float = 0.0):
+        """
+        Training-consistent sampling: num_frames positions spaced frame_count // num_frames apart
+        offset (0 <= offset < 1) shifts every position by that fraction of the spacing
+        """
+        step = max(frame_count // self.num_frames, 1)
+        shift = int(offset * step)
+        return [i * step + shift for i in range(self.num_frames)]
+
+    def candidate_indices(self, frame_count: int, index=None):
+        """
+        Frame index -> sampling slot for the frame_candidates candidates of every slot
+        With packet checksums in the index, a slot's candidates are its frames
+        with the lowest checksums. A stream-copied trim or a copy with a new
+        intro then picks the same frames wherever its slots overlap the
+        original's, with a probability of about the overlap share. Otherwise
+        candidate j sits j / frame_candidates of the spacing after the slot's
+        training position, so j = 0 (the default sample) wins ties
+        """
+        crcs = index.packet_crcs if index is not None and index.exact else None
+        step = frame_count // self.num_frames
+        slot_of = {}
+        if crcs is not None and len(crcs) == frame_count and step > 0:
+            for slot in range(self.num_frames):
+                window = crcs[slot * step:(slot + 1) * step]
+                for i in np.argsort(window, kind="stable")[:self.frame_candidates]:
+                    slot_of[slot * step + int(i)] = slot
+            return slot_of
+
+        for j in range(self.frame_candidates):
+            for slot, i in enumerate(self.sample_indices(frame_count or 1, j / self.frame_candidates)):
+                slot_of.setdefault(i, slot)
+        return slot_of
+
+    def extract_frames(self, video_path: str, info=None, content_key: Optional[str] = None):
+        """
+        Extract evenly-spaced frames from video with face detection
+        Frame positions come from a packet-level index (cached under
+        content_key), so they do not depend on which decoder is used.
+        If an info dict is passed it is filled with decode details (decoder
+        name, real/padded frame counts, and the source frame indices under
+        "frame_indices"); with frame selection and a frame cache, each clip
+        row's (frame key, digest) goes under "frame_keys"
+        The clip comes from self.clips; callers hand it back with
+        self.clips.release(clip) once the forward pass is done
+        """
+        keys = None
+        if self.frame_candidates > 1:
+            clip, decoded, decoder_name, keys = self._select_faces(video_path, content_key)
+        else:
+            clip, decoded, _, decoder_name = self._decode_faces(video_path, [0.0], None, content_key)
+        count = len(decoded)
+
+        if info is not None:
+            info["decoder"] = decoder_name
+            info["frames_real"] = count
+            info["frames_padded"] = max(self.num_frames - count, 0)
+            info["frame_indices"] = decoded
+            if keys is not None:
+                info["frame_keys"] = keys
+
+        # Pad if needed (in case video is shorter than expected) by repeating the last frame
+        if count:
+            clip[count:] = clip[count - 1]
+        else:
+            clip.zero_()
+
+        return clip  # (T, 3, H, W)
+
+    def clip_from_frames(self, frames):
+        """
+        Preprocess already-decoded BGR frames into a pooled (T, 3, H, W) clip
+        More frames than num_frames are sampled evenly, fewer are padded by
+        repeating the last one as extract_frames does. Returns (clip, frames used);
+        callers hand the clip back with self.clips.release(clip)
+        """
+        if not frames:
+            raise ValueError("No frames to analyze")
+        if len(frames) > self.num_frames:
+            frames = [frames[i * len(frames) // self.num_frames] for i in range(self.num_frames)]
+
+        clip = self.clips.acquire((self.num_frames, 3, self.image_size, self.image_size))
+        try:
+            for i in range(0, len(frames), self.detect_batch_size):
+                chunk = frames[i:i + self.detect_batch_size]
+                self.process_frames(chunk, out=clip[i:i + len(chunk)])
+        except BaseException:
+            self.clips.release(clip)
+            raise
+        clip[len(frames):] = clip[len(frames) - 1]
+        return clip, len(frames)
+
+    def extract_variants(self, video_path: str, offsets=(0.0,), margins=(20,), info=None,
+                         content_key: Optional[str] = None):
+        """
+        Face crops for test-time augmentation from a single decode and detection pass
+        Every frame sampled at any of the offsets is decoded and detected once
+        and cropped once per margin. Returns (crops, clips): crops is a pooled
+        (N, len(margins), 3, H, W) tensor over the N decoded frames, clips a
+        list of (offset, rows) with the num_frames crop rows of each distinct
+        offset, padded by repeating the last frame as extract_frames does.
+        Callers hand crops back with self.clips.release(crops)
+        """
+        crops, decoded, requested, decoder_name = self._decode_faces(video_path, offsets, list(margins), content_key)
+        position = {index: row for row, index in enumerate(decoded)}
+
+        clips = []
+        padded = 0
+        for offset, indices in zip(offsets, requested):
+            rows = [position[i] for i in indices if i in position]
+            if not rows:
+                continue
+            padded = max(padded, self.num_frames - len(rows))
+            rows += rows[-1:] * (self.num_frames - len(rows))
+            # Short videos map several offsets onto the same frames
+            if all(rows != other for _, other in clips):
+                clips.append((offset, rows))
+
+        if not clips:
+            self.clips.release(crops)
+            raise ValueError("No frames could be decoded from the video")
+
+        if info is not None:
+            info["decoder"] = decoder_name
+            info["frames_real"] = len(decoded)
+            info["frames_padded"] = padded
+        return crops, clips
+
+    def extract_tracks(self, video_path: str, max_faces=4, min_prob=0.9, min_size=0, info=None,
+                       content_key: Optional[str] = None):
+        """
+        Every face of the sampled frames, for multi-face scoring
+        Frames are sampled and decoded as by extract_frames, and each keeps up
+        to max_faces detections of at least min_prob whose shorter side is at
+        least min_size full-resolution pixels, largest first. Returns
+        (crops, faces, clip): crops is a pooled (N, 3, H, W) tensor with one
+        row per kept face (rows past len(faces) are uninitialised), faces the
+        matching (frame position, box, prob) in frame order, boxes in
+        full-resolution coordinates; link_tracks() groups them into tracks.
+        clip is the (num_frames, 3, H, W) clip extract_frames would return,
+        padded the same way, so a video without tracks needs no second decode.
+        info is filled as by extract_frames. Callers hand crops and clip back
+        with self.clips.release()
+        """
+        index = self.video_index(video_path, content_key)
+        crops = None
+        clip = None
+        faces = []
+
+        try:
+            with self.decoders.open(video_path) as decoder:
+                decoder.scratch = self.scratch
+                total_frames = index.frame_count if index is not None and index.exact else decoder.frame_count
+                indices = self.sample_indices(total_frames or 1)
+                crops = self.clips.acquire((len(indices) * max_faces, 3, self.image_size, self.image_size))
+                clip = self.clips.acquire((len(indices), 3, self.image_size, self.image_size))
+
+                width, height = (index.width, index.height) if index is not None else (decoder.width, decoder.height)
+                budget = self.memory_budget.reserve(self.working_set_bytes(width, height, len(crops) + len(clip))) \
+                    if self.memory_budget is not None else nullcontext()
+
+                with budget:
+                    pending = []
+                    decoded = []
+                    limits = (max_faces, min_prob, min_size)
+                    for index_, frame in decoder.read(indices, index):
+                        decoded.append(index_)
+                        pending.append(frame)
+                        if len(pending) == self.detect_batch_size:
+                            self._faces_into(crops, clip, len(decoded) - len(pending), pending, faces, *limits)
+                            pending = []
+                    if pending:
+                        self._faces_into(crops, clip, len(decoded) - len(pending), pending, faces, *limits)
+        except BaseException:
+            self.clips.release(crops)
+            self.clips.release(clip)
+            raise
+
+        if not decoded:
+            self.clips.release(crops)
+            self.clips.release(clip)
+            raise ValueError("No frames could be decoded from the video")
+        clip[len(decoded):] = clip[len(decoded) - 1]
+
+        if info is not None:
+            info["decoder"] = decoder.name
+            info["frames_real"] = len(decoded)
+            info["frames_padded"] = max(self.num_frames - len(decoded), 0)
+            info["frame_indices"] = decoded
+        return crops, faces, clip
+
+    def _faces_into(self, crops, clip, first: int, frames, faces, max_faces: int, min_prob: float,
+                    min_size: float = 0):
+        """
+        Detect every face of frames (positions from first), crop each kept one
+        into the next crops row and the frame's largest face (as process_frames
+        would) into its clip row
+        """
+        proxies, scales = zip(*(self.downscale(frame) for frame in frames))
+        try:
+            try:
+                detections = self.detector.detect(list(proxies))
+            except Exception:
+                # Fallback on any error
+                detections = [None] * len(frames)
+            largest = [detection[0][0] / scale if detection is not None and len(detection[0]) else None
+                       for scale, detection in zip(scales, detections)]
+            self.crop_faces(frames, proxies, largest, out=clip[first:first + len(frames)])
+            for position, (frame, scale, detection) in enumerate(zip(frames, scales, detections), first):
+                if detection is None:
+                    continue
+                kept = [(box / scale, prob) for box, prob in zip(*detection) if prob >= min_prob]
+                kept = [(box, prob) for box, prob in kept
+                        if min(box[2] - box[0], box[3] - box[1]) >= min_size][:max_faces]
+                for box, prob in kept:
+                    crops[len(faces)].copy_(self.transform(self.to_pil(self.crop_face(frame, box))))
+                    faces.append((position, box, float(prob)))
+        finally:
+            self.release_proxies(frames, proxies)
+            for frame in frames:
+                self.scratch.release(frame)
 
-        if not cap.isOpened():
-            raise ValueError(f"Cannot open video file: {video_path}")
+    def _decode_faces(self, video_path: str, offsets, margins, content_key: Optional[str] = None):
+        """
+        Decode the union of the positions sampled at each offset in one pass
+        and process them into a pooled buffer of face crops, (N, 3, H, W) or
+        with margins (N, len(margins), 3, H, W); rows past the decoded count
+        are left uninitialised
+        Returns (buffer, decoded frame indices, sampled indices per offset, decoder name)
+        """
+        index = self.video_index(video_path, content_key)
+        buffer = None
+        count = 0
 
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or 1
-        step = max(total_frames // self.num_frames, 1)
+        try:
+            with self.decoders.open(video_path) as decoder:
+                decoder.scratch = self.scratch
+                total_frames = index.frame_count if index is not None and index.exact else decoder.frame_count
+                requested = [self.sample_indices(total_frames or 1, offset) for offset in offsets]
+                indices = sorted(set().union(*requested))
+
+                per_frame = (len(margins),) if margins is not None else ()
+                buffer = self.clips.acquire((len(indices),) + per_frame + (3, self.image_size, self.image_size))
+
+                # Reserve the decode working set before the first frame is read
+                width, height = (index.width, index.height) if index is not None else (decoder.width, decoder.height)
+                crops = buffer.numel() // (3 * self.image_size ** 2)
+                budget = self.memory_budget.reserve(self.working_set_bytes(width, height, crops)) \
+                    if self.memory_budget is not None else nullcontext()
+
+                with budget:
+                    pending = []
+                    decoded = []
+                    for index_, frame in decoder.read(indices, index):
+                        decoded.append(index_)
+                        pending.append(frame)
+                        if len(pending) == self.detect_batch_size:
+                            count += self._process_into(buffer, count, pending, margins)
+                            pending = []
+                    if pending:
+                        count += self._process_into(buffer, count, pending, margins)
+        except BaseException:
+            self.clips.release(buffer)
+            raise
+
+        return buffer, decoded, requested, decoder.name
+
+    def _select_faces(self, video_path: str, content_key: Optional[str] = None):
+        """
+        Quality-based frame selection: decode frame_candidates candidates
+        within each of the num_frames sampling slots (candidate_indices), score
+        them on their detection proxies (frame_quality) and crop only the best
+        of each slot into a pooled (num_frames, 3, H, W) clip; rows past the
+        selected count are left uninitialised. The model sees as many frames
+        as before
+        Returns (clip, selected frame indices, decoder name, the selected
+        frames' (key, digest) pairs or None without a frame cache)
+        """
+        index = self.video_index(video_path, content_key)
+        clip = None
+        count = 0
+        keys = [] if self.frame_cache is not None else None
 
-        for i in range(self.num_frames):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, i * step)
-            ret, frame = cap.read()
+        try:
+            with self.decoders.open(video_path) as decoder:
+                decoder.scratch = self.scratch
+                total_frames = index.frame_count if index is not None and index.exact else decoder.frame_count
+                slot_of = self.candidate_indices(total_frames, index)
+
+                clip = self.clips.acquire((self.num_frames, 3, self.image_size, self.image_size))
+                width, height = (index.width, index.height) if index is not None else (decoder.width, decoder.height)
+                budget = self.memory_budget.reserve(self.working_set_bytes(width, height)) \
+                    if self.memory_budget is not None else nullcontext()
+
+                with budget:
+                    # Whole slots are scored together, at least a detector batch at a time
+                    pending = []
+                    selected = []
+                    for index_, frame in decoder.read(sorted(slot_of), index):
+                        slot = slot_of[index_]
+                        if len(pending) >= self.detect_batch_size and slot != pending[-1][0]:
+                            count += self._select_into(clip, count, pending, selected, keys)
+                            pending = []
+                        pending.append((slot, index_, frame))
+                    if pending:
+                        count += self._select_into(clip, count, pending, selected, keys)
+        except BaseException:
+            self.clips.release(clip)
+            raise
+
+        metrics.inc("frame_selection_candidates_total", len(slot_of))
+        metrics.inc("frame_selection_moved_total", len(set(selected) - set(self.sample_indices(total_frames or 1))))
+        return clip, selected, decoder.name, keys
+
+    def _select_into(self, clip, start: int, pending, selected, keys=None) -> int:
+        """
+        Score (slot, index, frame) candidates, crop the best per slot into clip rows from start
+        With a keys list, the chosen frames' detections are cached and their
+        (key, digest) pairs appended
+        """
+        slots, indices, frames = zip(*pending)
+        entries = [] if keys is not None else None
+        try:
+            proxies, scales, boxes, probs = self.locate_faces(frames, entries)
+            try:
+                quality = self.frame_quality(proxies, scales, boxes, probs)
+                best = {}
+                for i, slot in enumerate(slots):
+                    if slot not in best or quality[i] > quality[best[slot]]:
+                        best[slot] = i
+                chosen = list(best.values())
+                self.crop_faces([frames[i] for i in chosen], [proxies[i] for i in chosen],
+                                [boxes[i] for i in chosen], out=clip[start:start + len(chosen)])
+                # Only the chosen frames are hashed and cached; the other candidates are detected again
+                if keys is not None:
+                    for i in chosen:
+                        key, entry = entries[i]
+                        if entry is None:
+                            digest = frame_digest(frames[i])
+                            self.frame_cache.update(key, digest, box=boxes[i], prob=probs[i])
+                        else:
+                            digest = entry["digest"]
+                        keys.append((key, digest))
+            finally:
+                self.release_proxies(frames, proxies)
+        finally:
+            for frame in frames:
+                self.scratch.release(frame)
+
+        selected.extend(indices[i] for i in chosen)
+        return len(chosen)
+
+    def _process_into(self, clip, start: int, frames, margins=None) -> int:
+        """Process decoded frames into clip rows from start, then recycle the frames"""
+        try:
+            self.process_frames(frames, out=clip[start:start + len(frames)], margins=margins)
+        finally:
+            for frame in frames:
+                self.scratch.release(frame)
+        return len(frames)
 
-            if not ret:
+
+def box_iou(a, b) -> float:
+    """Intersection over union of two x0, y0, x1, y1 boxes"""
+    w = min(a[2], b[2]) - max(a[0], b[0])
+    h = min(a[3], b[3]) - max(a[1], b[1])
+    if w <= 0 or h <= 0:
+        return 0.0
+    inter = w * h
+    return float(inter / ((a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter))
+
+
+def link_tracks(faces, iou_threshold=0.3):
+    """
+    Greedy IoU tracking of per-frame detections, (frame position, box, prob) in frame order
+    Frame by frame, the best-overlapping (track, face) pairs are linked
+    first; a face joins the track whose most recent box it overlaps by at
+    least iou_threshold, else it starts a new track. A track missing from a
+    frame keeps its last box, so it can pick up again after a gap
+    Returns tracks as lists of indices into faces, at most one per frame
+    """
+    tracks = []
+    by_position = {}
+    for i, (position, _, _) in enumerate(faces):
+        by_position.setdefault(position, []).append(i)
+
+    for position, current in by_position.items():
+        pairs = sorted(((box_iou(faces[track[-1]][1], faces[i][1]), t, i)
+                        for t, track in enumerate(tracks) for i in current), reverse=True)
+        linked_tracks, linked_faces = set(), set()
+        for iou, t, i in pairs:
+            if iou < iou_threshold:
                 break
+            if t not in linked_tracks and i not in linked_faces:
+                tracks[t].append(i)
+                linked_tracks.add(t)
+                linked_faces.add(i)
+        tracks.extend([i] for i in current if i not in linked_faces)
+    return tracks
 
-            # Convert BGR to RGB
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            pil_img = Image.fromarray(frame_rgb)
 
-            # Try face detection if enabled
-            if self.face_detection_enabled:
-                try:
-                    face = self.mtcnn(pil_img)
+# ============================================================================
+# CASCADE PRE-FILTER
+# ============================================================================
 
-                    if face is not None:
-                        # Face detected, use it
-                        frames.append(self.transform(T.ToPILImage()(face)))
-                    else:
-                        # No face, use center crop
-                        resized = T.Resize((self.image_size, self.image_size))(pil_img)
-                        frames.append(self.transform(resized))
-                except Exception:
-                    # Fallback on any error
-                    resized = T.Resize((self.image_size, self.image_size))(pil_img)
-                    frames.append(self.transform(resized))
-            else:
-                # Face detection disabled, use full frame
-                resized = T.Resize((self.image_size, self.image_size))(pil_img)
-                frames.append(self.transform(resized))
+class PrefilterCascade:
+    """
+    Cheap low-resolution first pass in front of the full model
+    Probes a few downscaled frames with the face detector; videos with no face at all are
+    answered with an abstention (the model has nothing to judge, and a failed
+    detection must not read as REAL), everything else escalates to ResNet50+BiLSTM
+    """
 
-        cap.release()
+    def __init__(self, preprocessor, probe_frames=4, probe_size=320, min_face_prob=0.9):
+        self.preprocessor = preprocessor
+        self.probe_frames = probe_frames
+        self.probe_size = probe_size
+        self.min_face_prob = min_face_prob
 
-        # Pad if needed (in case video is shorter than expected)
-        while len(frames) < self.num_frames:
-            if frames:
-                frames.append(frames[-1].clone())  # Duplicate last frame
-            else:
-                frames.append(torch.zeros(3, self.image_size, self.image_size))
+        # Moving average of the full pass, used to estimate time saved
+        self.full_pass_seconds = None
 
-        return torch.stack(frames)  # (T, 3, H, W)
+    def observe_full_pass(self, seconds: float):
+        if self.full_pass_seconds is None:
+            self.full_pass_seconds = seconds
+        else:
+            self.full_pass_seconds = 0.9 * self.full_pass_seconds + 0.1 * seconds
+
+    def _probe_images(self, video_path: str):
+        import cv2
+        with self.preprocessor.decoders.open(video_path) as decoder:
+            total_frames = decoder.frame_count or 1
+            step = max(total_frames // self.probe_frames, 1)
+            indices = [i * step for i in range(self.probe_frames)]
+
+            images = []
+            for _, frame in decoder.read(indices):
+                h, w = frame.shape[:2]
+                scale = self.probe_size / max(h, w)
+                if scale < 1:
+                    frame = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+                images.append(frame)
+
+        return images
+
+    def run(self, video_path: str):
+        """Return a short-circuit decision dict, or None to escalate"""
+        if not self.preprocessor.face_detection_enabled:
+            metrics.inc("cascade_decisions_total", decision="escalate", reason="no_detector")
+            return None
+
+        start = time.perf_counter()
+        images = self._probe_images(video_path)
+        if not images:
+            raise ValueError(f"No decodable frames in video file: {video_path}")
+
+        detections = self.preprocessor.detector.detect(images)
+        faces = sum(1 for _, probs in detections if len(probs) and probs.max() >= self.min_face_prob)
+        probe_seconds = time.perf_counter() - start
+        metrics.observe("cascade_probe_seconds", probe_seconds)
+
+        if faces > 0:
+            metrics.inc("cascade_decisions_total", decision="escalate", reason="face_present")
+            return None
+
+        metrics.inc("cascade_decisions_total", decision="short_circuit", reason="no_face")
+        if self.full_pass_seconds is not None:
+            metrics.inc("cascade_time_saved_seconds", max(self.full_pass_seconds - probe_seconds, 0.0))
+
+        return {"reason": "no_face"}
 
 
 # ============================================================================
 # MODEL MANAGER
 # ============================================================================
 
+def no_grad(method):
+    """torch.no_grad() as a decorator, entered per call so defining it does not import torch"""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        import torch
+        with torch.no_grad():
+            return method(*args, **kwargs)
+    return wrapper
+
+
 class ModelManager:
     """Manages model loading and inference"""
 
-    def __init__(self, model_path: str, device='cuda', threshold=0.5):
+    def __init__(self, model_path: str, device='cuda', threshold=None, cascade=False, architecture="resnet50"):
+        import torch
+        from fingerprints import FingerprintIndex
         self.device = torch.device(device if torch.cuda.is_available() else 'cpu')
         self.model = None
-        self.preprocessor = VideoPreprocessor(device=str(self.device))
-        self.threshold = threshold
+        # Used when the checkpoint does not name its own architecture
+        self.architecture = architecture
+        # Per-frame face boxes and trunk features, reused by trimmed / re-introed re-uploads (None disables)
+        self.frame_cache = FrameCache(FRAME_CACHE_MB << 20) if FRAME_CACHE_MB > 0 else None
+        self.preprocessor = VideoPreprocessor(
+            device=str(self.device),
+            detect_size=DETECT_SIZE,
+            decoder=VIDEO_DECODER,
+            decode_threads=DECODE_THREADS,
+            face_detector=FACE_DETECTOR,
+            detector_options=FACE_DETECTOR_OPTIONS,
+            index_cache_seconds=VIDEO_INDEX_CACHE_SECONDS,
+            index_cache_size=VIDEO_INDEX_CACHE_SIZE,
+            probe_max_packets=VIDEO_PROBE_MAX_PACKETS,
+            buffer_pool_bytes=BUFFER_POOL_MB << 20,
+            memory_budget=memory_budget,
+            frame_candidates=FRAME_CANDIDATES,
+            frame_cache=self.frame_cache
+        )
+        # None: the calibration's recommended threshold if there is one, else 0.5
+        self.requested_threshold = threshold
+        self.threshold = 0.5 if threshold is None else threshold
+        self.calibration = None
+        # cascade: False, True, or a dict of PrefilterCascade options
+        options = cascade if isinstance(cascade, dict) else {}
+        self.cascade = PrefilterCascade(self.preprocessor, **options) if cascade else None
+        # Short-lived last-stage activations for Grad-CAM (None disables)
+        self.activations = TTLCache(EXPLAIN_CACHE_SECONDS, EXPLAIN_CACHE_SIZE) if EXPLAIN_CACHE_SECONDS > 0 else None
         self.load_model(model_path)
+        # Perceptual fingerprints of scored videos, namespaced by model (None disables)
+        self.fingerprints = None
+        if not all(0 <= offset < 1 for offset in TTA_OFFSETS):
+            raise ValueError(f"TTA_OFFSETS must lie in [0, 1) (fractions of the sampling step), got {TTA_OFFSETS}")
+        if FINGERPRINT_MODE not in ("off", "prior", "reuse"):
+            raise ValueError(f"Unknown FINGERPRINT_MODE '{FINGERPRINT_MODE}'. Choose from: off, prior, reuse")
+        if FINGERPRINT_MODE != "off":
+            self.fingerprints = FingerprintIndex(
+                FINGERPRINT_INDEX_SIZE,
+                max_distance=FINGERPRINT_MAX_DISTANCE,
+                path=FINGERPRINT_INDEX_PATH or None,
+                namespace=f"{Path(model_path).name}:{self.architecture}"
+            )
 
     def load_model(self, model_path: str):
-        """Load trained model weights"""
-        self.model = ResNet50BiLSTM(hidden=256).to(self.device)
-
+        """
+        Load trained model weights
+        Checkpoints saved with an 'architecture' key (e.g. distilled students)
+        select their own architecture; plain state dicts use self.architecture
+        """
+        import torch
+        from models import build_model
+        checkpoint = None
         if Path(model_path).exists():
             try:
                 checkpoint = torch.load(model_path, map_location=self.device)
+            except Exception as e:
+                print(f"⚠️ Error loading model: {e}. Using untrained model.")
+        else:
+            print(f"⚠️ Model path not found: {model_path}. Using untrained model.")
+
+        config = {"hidden": 256}
+        if isinstance(checkpoint, dict) and 'architecture' in checkpoint:
+            self.architecture = checkpoint['architecture']
+            config.update(checkpoint.get('model_config') or {})
+        self.model = build_model(self.architecture, **config).to(self.device)
 
+        if checkpoint is not None:
+            try:
                 # Handle different checkpoint formats
                 if isinstance(checkpoint, dict) and 'model_state_dict' in checkpoint:
                     self.model.load_state_dict(checkpoint['model_state_dict'])
@@ -211,30 +929,536 @@ class ModelManager:
                 else:
                     self.model.load_state_dict(checkpoint)
 
-                self.model.eval()
-                print(f"✅ Model loaded from {model_path}")
+                print(f"✅ Model loaded from {model_path} ({self.architecture})")
             except Exception as e:
                 print(f"⚠️ Error loading model: {e}. Using untrained model.")
-                self.model.eval()
+
+        self.model.eval()
+        self.load_calibration(CALIBRATION_PATH or calibration_path(model_path))
+
+    def load_calibration(self, path):
+        """
+        Load the temperature / Platt scaling fitted by evaluate_model.py
+        Confidences are reported on the calibrated scale; raw_score stays the
+        model's own logit
+        """
+        self.calibration = None
+        if Path(path).exists():
+            try:
+                self.calibration = Calibration.load(path)
+                print(f"✅ Calibration loaded from {path} ({self.calibration.method}, "
+                      f"threshold {self.calibration.threshold})")
+            except Exception as e:
+                print(f"⚠️ Error loading calibration: {e}. Using raw scores.")
+
+        # Follow the calibration's operating point unless a threshold was given
+        if self.requested_threshold is not None:
+            self.threshold = self.requested_threshold
+        elif self.calibration is not None and self.calibration.threshold is not None:
+            self.threshold = self.calibration.threshold
         else:
-            print(f"⚠️ Model path not found: {model_path}. Using untrained model.")
-            self.model.eval()
+            self.threshold = 0.5
 
-    @torch.no_grad()
-    def predict(self, video_path: str):
+    @no_grad
+    def predict(self, video_path: str, cache_key: Optional[str] = None, allow_reuse: bool = True):
         """
         Run inference on video
         Returns prediction with proper sigmoid activation
+        cache_key is the video's content hash: it keys the probed frame index,
+        the video's fingerprint and, while explanations are enabled, the last
+        ResNet50 stage kept for explain(cache_key). With allow_reuse=False a
+        near-duplicate's verdict is never reused (the model always runs)
         """
+        import torch
+        start = time.perf_counter()
+        shortcut = self.prefilter(video_path)
+        if shortcut is not None:
+            shortcut["timings"] = {"cascade_seconds": time.perf_counter() - start}
+            return shortcut
+
         # Extract and preprocess frames
-        frames = self.preprocessor.extract_frames(video_path)
-        frames = frames.unsqueeze(0).to(self.device)  # Add batch dimension
+        start = time.perf_counter()
+        info = {}
+        with request_profiler.stage("extract_frames"):
+            frames = self.preprocessor.extract_frames(video_path, info, content_key=cache_key)
+        frame_indices = info.pop("frame_indices")
+        frame_keys = info.pop("frame_keys", None)
+        decoded = time.perf_counter()
+        timings = {"decode_seconds": decoded - start}
+
+        try:
+            with request_profiler.stage("near_duplicate"):
+                hashes, match = self.near_duplicate(frames, info["frames_real"], allow_reuse)
+            looked_up = time.perf_counter()
+            timings["fingerprint_seconds"] = looked_up - decoded
+            if match is not None and match["reused"]:
+                return dict(self.duplicate_result(match), timings=timings, **info)
+
+            with request_profiler.stage("model"):
+                keep_activations = cache_key is not None and self.activations is not None
+                count = info["frames_real"]
+                # The trunk only runs on real frames; padding repeats the last one's features
+                real = frames[:count] if count else frames
+                feats, activations, reused = self.frame_features(real, frame_keys if count else None,
+                                                                 keep_activations)
+                if frame_keys is not None:
+                    info["frames_reused"] = reused
+                    info["frame_reuse_ratio"] = reused / count if count else 0.0
+                if count:
+                    index = list(range(count)) + [count - 1] * (len(frames) - count)
+                    feats = feats[index]
+                    activations = activations[index] if keep_activations else None
+                logits, _ = self.model.classify_features(feats.unsqueeze(0))
+                result = self.format_result(float(logits.item()))
+                if keep_activations:
+                    self.activations.put(cache_key, {
+                        "activations": activations.to("cpu", torch.float16),
+                        "frame_indices": frame_indices,
+                    })
+        finally:
+            self.preprocessor.clips.release(frames)
+        timings["model_seconds"] = time.perf_counter() - looked_up
+
+        self.remember(cache_key, hashes, result)
+        self.observe_full_pass(time.perf_counter() - start)
+        if match is not None:
+            result["near_duplicate"] = self.describe_match(match)
+        return dict(result, timings=timings, **info)
+
+    @no_grad
+    def predict_tta(self, video_path: str, cache_key: Optional[str] = None, offsets=None, margins=None, flip=None):
+        """
+        Test-time augmentation: score every combination of frame offset, face
+        margin and (with flip) horizontal mirror, built from one decode and
+        detection pass. The trunk runs once over the distinct crops (in
+        TTA_TRUNK_BATCH chunks) and the temporal head once over the stacked
+        variant clips
+        raw_score is the mean variant logit; "tta" reports the per-variant
+        spread. Neither the cascade nor near-duplicate reuse applies
+        """
+        import torch
+        offsets = TTA_OFFSETS if offsets is None else offsets
+        margins = TTA_MARGINS if margins is None else margins
+        flips = [False, True] if (TTA_FLIP if flip is None else flip) else [False]
+
+        start = time.perf_counter()
+        info = {}
+        crops, clips = self.preprocessor.extract_variants(video_path, offsets, margins, info, content_key=cache_key)
+        decoded = time.perf_counter()
+        try:
+            # Rows past the decoded frames are uninitialised
+            frames, per_frame = info["frames_real"], crops.shape[1]
+            # Frames without a detected face give the same full-frame crop at every margin
+            source = torch.arange(frames * per_frame).view(frames, per_frame)
+            for m in range(1, per_frame):
+                same = [i for i in range(frames) if torch.equal(crops[i, m], crops[i, 0])]
+                source[same, m] = source[same, 0]
+            unique, inverse = torch.unique(source, return_inverse=True)
+
+            faces = crops[:frames].reshape(frames * per_frame, *crops.shape[2:])[unique].to(self.device)
+            if len(flips) > 1:
+                faces = torch.cat([faces, faces.flip(-1)])
+            feats = self.batched_features(faces, TTA_TRUNK_BATCH)
+            feats = feats.view(len(flips), len(unique), -1)[:, inverse]  # (flips, frames, margins, F)
+        finally:
+            self.preprocessor.clips.release(crops)
+
+        variants, sequences = [], []
+        for offset, rows in clips:
+            for m, margin in enumerate(margins):
+                for f, flipped in enumerate(flips):
+                    variants.append({"offset": offset, "margin": margin, "flip": flipped})
+                    sequences.append(feats[f, rows, m])
+        logits, _ = self.model.classify_features(torch.stack(sequences))
+
+        for variant, logit in zip(variants, logits.view(-1).cpu().tolist()):
+            scored = self.format_result(logit)
+            variant.update(raw_score=logit, confidence=scored["confidence"])
+
+        result = self.format_result(float(np.mean([v["raw_score"] for v in variants])))
+        confidences = np.array([v["confidence"] for v in variants])
+        result["tta"] = {
+            "variants": len(variants),
+            "confidence_std": float(confidences.std()),
+            "confidence_min": float(confidences.min()),
+            "confidence_max": float(confidences.max()),
+            # Share of variants that reach the same verdict as the aggregate
+            "agreement": float(np.mean((confidences > self.threshold) == result["is_fake"])),
+            "scores": variants,
+        }
+        result["timings"] = {"decode_seconds": decoded - start, "model_seconds": time.perf_counter() - decoded}
+        metrics.observe("tta_seconds", time.perf_counter() - start)
+        metrics.inc("tta_variants_total", len(variants))
+        return dict(result, **info)
+
+    def batched_features(self, crops, chunk: int = 0):
+        """
+        Trunk features (N, D) of many crops: one batch on GPU, clip-sized
+        chunks on CPU, where large batches run slower (chunk overrides this)
+        """
+        import torch
+        chunk = chunk or (len(crops) if self.device.type == "cuda" else self.preprocessor.num_frames)
+        return torch.cat([self.model.extract_features(crops[i:i + chunk]) for i in range(0, len(crops), chunk)])
+
+    @no_grad
+    def predict_faces(self, video_path: str, cache_key: Optional[str] = None):
+        """
+        Multi-face scoring: every face in the video is tracked across the
+        sampled frames (link_tracks) and each track is scored as its own clip,
+        padded by repeating its last face as short videos are. One decode and
+        detection pass serves all faces; the trunk runs once over all face
+        crops and the temporal head once over the stacked track clips
+        Tracks must cover MULTI_FACE_MIN_COVERAGE of the decoded frames with
+        faces of at least MULTI_FACE_MIN_SIZE pixels. The primary track (the
+        longest-lived, then largest) is judged at the usual threshold and the
+        others at the stricter MULTI_FACE_THRESHOLD, so extra faces do not
+        multiply the false-positive rate of a single-clip threshold; the
+        verdict is the most suspicious track that passes its threshold, else
+        the primary's. "faces" holds every track's verdict. Without a track
+        the clip decoded alongside is scored as /predict would. Neither the
+        cascade nor near-duplicate reuse applies
+        """
+        import torch
+        start = time.perf_counter()
+        info = {}
+        crops, faces, clip = self.preprocessor.extract_tracks(video_path, MULTI_FACE_MAX, MULTI_FACE_MIN_PROB,
+                                                              MULTI_FACE_MIN_SIZE, info, content_key=cache_key)
+        frame_indices = info.pop("frame_indices")
+        count = info["frames_real"]
+        decoded = time.perf_counter()
+        try:
+            # Short-lived tracks are most likely false detections, and would be mostly padding
+            min_frames = max(math.ceil(MULTI_FACE_MIN_COVERAGE * count), 1)
+            tracks = [track for track in link_tracks(faces, MULTI_FACE_IOU) if len(track) >= min_frames]
+            # The longest-lived (then largest) faces are kept when there are too many
+            sizes = [(len(track), np.mean([(faces[i][1][2] - faces[i][1][0]) * (faces[i][1][3] - faces[i][1][1])
+                                           for i in track])) for track in tracks]
+            order = sorted(range(len(tracks)), key=lambda t: sizes[t], reverse=True)
+            tracks = [tracks[t] for t in order[:MULTI_FACE_MAX]]
+            if tracks:
+                rows = sorted({i for track in tracks for i in track})
+                feats = self.batched_features(crops[rows].to(self.device))
+            else:
+                # Score the largest-face clip like predict: trunk on real frames, padded features
+                feats = self.model.extract_features(clip[:count].to(self.device))
+                logits, _ = self.model.classify_features(feats[[*range(count)] + [count - 1] * (len(clip) - count)]
+                                                         .unsqueeze(0))
+        finally:
+            self.preprocessor.clips.release(crops)
+            self.preprocessor.clips.release(clip)
+
+        if not tracks:
+            metrics.inc("multi_face_videos_total", tracks="0")
+            result = self.format_result(float(logits.item()))
+            result["faces"] = {"tracks": 0, "fake_tracks": 0, "aggregate": "primary", "scores": []}
+            result["timings"] = {"decode_seconds": decoded - start, "model_seconds": time.perf_counter() - decoded}
+            return dict(result, **info)
+
+        num_frames = self.preprocessor.num_frames
+        feature_row = {i: j for j, i in enumerate(rows)}
+        sequences = []
+        for track in tracks:
+            sequence = [feature_row[i] for i in track]
+            sequences.append(sequence + sequence[-1:] * (num_frames - len(sequence)))
+        logits, _ = self.model.classify_features(feats[torch.tensor(sequences, device=feats.device)])
+
+        strict = max(MULTI_FACE_THRESHOLD, self.threshold)
+        scores = []
+        for t, (track, logit) in enumerate(zip(tracks, logits.view(-1).cpu().tolist())):
+            boxes = np.array([faces[i][1] for i in track])
+            score = dict(
+                self.format_result(logit),
+                track=t,
+                frames_analyzed=len(track),
+                frame_indices=[frame_indices[faces[i][0]] for i in track],
+                # Mean box over the track, in full-resolution pixels
+                box=[round(float(v)) for v in boxes.mean(axis=0)],
+                face_prob=float(np.mean([faces[i][2] for i in track])),
+                threshold=self.threshold if t == 0 else strict,
+            )
+            score["is_fake"] = score["confidence"] > score["threshold"]
+            score["prediction"] = "FAKE" if score["is_fake"] else "REAL"
+            scores.append(score)
+
+        worst = max((score for score in scores if score["is_fake"] or score["track"] == 0),
+                    key=lambda score: score["raw_score"])
+        result = self.format_result(worst["raw_score"])
+        result["faces"] = {
+            "tracks": len(scores),
+            "fake_tracks": sum(score["is_fake"] for score in scores),
+            "aggregate": "primary",
+            "secondary_threshold": strict,
+            "worst_track": worst["track"],
+            "scores": scores,
+        }
+        result["timings"] = {"decode_seconds": decoded - start, "model_seconds": time.perf_counter() - decoded}
+        metrics.observe("multi_face_seconds", time.perf_counter() - start)
+        metrics.inc("multi_face_videos_total", tracks=str(len(scores)))
+        metrics.inc("multi_face_tracks_total", len(scores))
+        return dict(result, **info)
+
+    def near_duplicate(self, clip, count: int, allow_reuse: bool = True):
+        """
+        Fingerprint the first count (real) frames of a preprocessed clip and
+        look up earlier videos; returns (hashes, match or None). match["reused"]
+        says whether its verdict may stand in for running the model
+        """
+        from fingerprints import frame_hashes
+        if self.fingerprints is None or not count:
+            return None, None
+
+        hashes = frame_hashes(clip[:count])
+        match = self.fingerprints.lookup(hashes, min_similarity=FINGERPRINT_PRIOR_SIMILARITY)
+        if match is None:
+            metrics.inc("fingerprint_lookups_total", result="miss")
+            return hashes, None
+
+        match["reused"] = (allow_reuse and FINGERPRINT_MODE == "reuse"
+                           and match["similarity"] >= FINGERPRINT_REUSE_SIMILARITY)
+        metrics.inc("fingerprint_lookups_total", result="reused" if match["reused"] else "prior")
+        return hashes, match
+
+    def remember(self, cache_key: Optional[str], hashes, result: dict):
+        """Index a freshly scored video's fingerprint under its content hash"""
+        if self.fingerprints is not None and cache_key is not None and hashes is not None:
+            self.fingerprints.add(cache_key, hashes, result["raw_score"])
+
+    def describe_match(self, match: dict):
+        """The near_duplicate field of a response: which video matched, how closely, and its verdict"""
+        prior = self.format_result(match["raw_score"])
+        return {
+            "prediction_id": match["key"],
+            "similarity": match["similarity"],
+            "frames_matched": match["frames_matched"],
+            "distance": match["distance"],
+            "reused": match["reused"],
+            "prediction": prior["prediction"],
+            "confidence": prior["confidence"],
+        }
+
+    def duplicate_result(self, match: dict):
+        """Answer with a near-duplicate's verdict instead of running the model"""
+        result = self.format_result(match["raw_score"])
+        result.update(
+            frames_analyzed=0,
+            short_circuited=True,
+            cascade_reason="near_duplicate",
+            near_duplicate=self.describe_match(match)
+        )
+        return result
+
+    def explain(self, cache_key: str, size: int = 56):
+        """
+        Grad-CAM over the last ResNet50 stage for a recent prediction
+        Reuses the cached activations, so only avgpool + BiLSTM + head are
+        re-run and back-propagated; returns None when nothing is cached
+        """
+        import cv2
+        import torch
+        entry = self.activations.get(cache_key) if self.activations is not None else None
+        if entry is None:
+            return None
+
+        start = time.perf_counter()
+        activations = entry["activations"].to(self.device, torch.float32).requires_grad_(True)
+
+        # cuDNN only back-propagates RNNs in training mode
+        with torch.enable_grad(), torch.backends.cudnn.flags(enabled=False):
+            feats = activations.mean(dim=(2, 3))  # same as the trunk's avgpool
+            logits, _ = self.model.classify_features(feats.unsqueeze(0))
+            grads, = torch.autograd.grad(logits.sum(), activations)
+
+        with torch.no_grad():
+            weights = grads.mean(dim=(2, 3), keepdim=True)
+            cams = torch.relu((weights * activations).sum(dim=1, keepdim=True))  # (T, 1, 7, 7)
+            cams = torch.nn.functional.interpolate(cams, size=(size, size), mode="bilinear", align_corners=False)
+            cams = cams.squeeze(1).cpu()
+
+            # One scale for all frames so intensities are comparable across the clip
+            peak = float(cams.max())
+            heatmaps = (cams / peak * 255).to(torch.uint8) if peak > 0 else torch.zeros_like(cams, dtype=torch.uint8)
+
+        frames = []
+        for i, heatmap in enumerate(heatmaps.numpy()):
+            ok, png = cv2.imencode(".png", heatmap)
+            frames.append({
+                "position": i,
+                "frame_index": entry["frame_indices"][min(i, len(entry["frame_indices"]) - 1)] if entry["frame_indices"] else None,
+                "intensity": float(cams[i].max() / peak) if peak > 0 else 0.0,
+                "heatmap_png": base64.b64encode(png.tobytes()).decode("ascii"),
+            })
+
+        metrics.observe("explain_seconds", time.perf_counter() - start)
+        result = self.format_result(float(logits.item()))
+        return {
+            "prediction": result["prediction"],
+            "confidence": result["confidence"],
+            "method": "grad-cam",
+            "layer": self.model.cam_layer,
+            "heatmap_size": size,
+            "frames": frames,
+        }
+
+    def prefilter(self, video_path: str):
+        """
+        Run the cascade pre-filter; returns None to escalate, else an
+        abstention: prediction "ABSTAIN" with no confidence, score or verdict
+        """
+        if self.cascade is None:
+            return None
+
+        decision = self.cascade.run(video_path)
+        if decision is None:
+            return None
+
+        return {
+            "prediction": "ABSTAIN",
+            "confidence": None,
+            "is_fake": None,
+            "frames_analyzed": 0,
+            "raw_score": None,
+            "short_circuited": True,
+            "cascade_reason": decision["reason"]
+        }
+
+    def observe_full_pass(self, seconds: float):
+        metrics.observe("model_full_pass_seconds", seconds)
+        if self.cascade is not None:
+            self.cascade.observe_full_pass(seconds)
 
+    @no_grad
+    def warmup(self, batch_sizes=(1,), iterations=2):
+        """
+        Run the face detector and forward passes at each batch size on blank
+        input, so allocator growth, oneDNN / cuDNN kernel selection and lazy
+        detector setup happen before the first real request
+        Returns {stage: seconds of its last iteration}
+        """
+        import torch
+        timings = {}
+        preprocessor = self.preprocessor
+        if preprocessor.face_detection_enabled:
+            size = preprocessor.detect_size or 640
+            proxies = [np.zeros((size * 9 // 16, size, 3), np.uint8)] * preprocessor.detect_batch_size
+            for _ in range(iterations):
+                start = time.perf_counter()
+                preprocessor.detector.detect(proxies)
+                timings["detector"] = time.perf_counter() - start
+
+        for batch_size in batch_sizes:
+            clips = torch.zeros(batch_size, preprocessor.num_frames, 3,
+                                preprocessor.image_size, preprocessor.image_size, device=self.device)
+            for _ in range(iterations):
+                start = time.perf_counter()
+                self.model(clips)
+                if self.device.type == "cuda":
+                    torch.cuda.synchronize()
+                timings[f"batch_{batch_size}"] = time.perf_counter() - start
+
+        for stage, seconds in timings.items():
+            metrics.observe("warmup_seconds", seconds, stage=stage)
+        return timings
+
+    @no_grad
+    def frame_features(self, crops, keys=None, keep_activations=False):
+        """
+        Trunk features (N, D) of preprocessed frames, and with keep_activations
+        their (N, D, 7, 7) last-stage activations (else None)
+        keys holds each frame's (key, digest) from extract_frames: frames in
+        the frame cache reuse their features, the trunk runs once per other
+        distinct frame, and those are cached
+        Returns (features, activations, number of frames reused)
+        """
+        import torch
+        cache = self.frame_cache
+        if cache is None or keys is None:
+            out = self.model.extract_features(crops.to(self.device), keep_activations=keep_activations)
+            feats, activations = out if keep_activations else (out, None)
+            return feats, activations, 0
+
+        needed = ("features", "activations") if keep_activations else ("features",)
+        found = {}
+        missing = {}
+        for i, (key, digest) in enumerate(keys):
+            entry = cache.get(key, digest=digest)
+            if entry is not None and all(entry.get(field) is not None for field in needed):
+                found[key, digest] = entry
+            else:
+                missing.setdefault((key, digest), i)
+        reused = sum(tuple(pair) in found for pair in keys)
+        metrics.inc("frame_cache_requests_total", reused, stage="features", result="hit")
+        metrics.inc("frame_cache_requests_total", len(keys) - reused, stage="features", result="miss")
+
+        if missing:
+            out = self.model.extract_features(crops[list(missing.values())].to(self.device),
+                                              keep_activations=keep_activations)
+            feats, activations = out if keep_activations else (out, None)
+            for j, (key, digest) in enumerate(missing):
+                entry = {"features": feats[j].cpu().clone()}
+                if keep_activations:
+                    entry["activations"] = activations[j].to("cpu", torch.float16)
+                cache.update(key, digest, **entry)
+                found[key, digest] = dict(entry, activations=activations[j]) if keep_activations else entry
+
+        feats = torch.stack([found[tuple(pair)]["features"].to(self.device) for pair in keys])
+        activations = torch.stack([found[tuple(pair)]["activations"].to(self.device, torch.float32)
+                                   for pair in keys]) if keep_activations else None
+        return feats, activations, reused
+
+    @no_grad
+    def predict_clips(self, clips):
+        """
+        Run one batched forward pass over preprocessed clips
+        clips: tensor of shape (B, T, 3, H, W); returns one result dict per clip
+        """
         # Get raw logit output
-        logits = self.model(frames)
+        logits = self.model(clips.to(self.device)).view(-1)
+        return [self.format_result(float(logit)) for logit in logits.cpu()]
+
+    @no_grad
+    def predict_frames(self, frames):
+        """
+        Score already-decoded BGR frames (still images or extracted frames)
+        No video decode; the trunk runs once per unique frame and short sets
+        are padded by repeating the last frame's features, as extract_frames does
+        """
+        if not frames:
+            raise ValueError("No frames to analyze")
+
+        num_frames = self.preprocessor.num_frames
+        if len(frames) > num_frames:
+            frames = [frames[i * len(frames) // num_frames] for i in range(num_frames)]
+
+        start = time.perf_counter()
+        preprocessor = self.preprocessor
+        batch = preprocessor.clips.acquire((len(frames), 3, preprocessor.image_size, preprocessor.image_size))
+        try:
+            for i in range(0, len(frames), preprocessor.detect_batch_size):
+                chunk = frames[i:i + preprocessor.detect_batch_size]
+                preprocessor.process_frames(chunk, out=batch[i:i + len(chunk)])
 
-        # Apply sigmoid to get probability
-        confidence = torch.sigmoid(logits).item()
+            processed = time.perf_counter()
+            feats = self.model.extract_features(batch.to(self.device))
+        finally:
+            preprocessor.clips.release(batch)
+        index = list(range(len(frames))) + [len(frames) - 1] * (num_frames - len(frames))
+        logits, _ = self.model.classify_features(feats[index].unsqueeze(0))
+
+        result = self.format_result(float(logits.item()))
+        result["frames_analyzed"] = len(frames)
+        result["timings"] = {"preprocess_seconds": processed - start, "model_seconds": time.perf_counter() - processed}
+        return result
+
+    def predict_images(self, images):
+        """Decode encoded images (JPEG/PNG/...) in order and score them as one frame set"""
+        return self.predict_frames(decode_images(images))
+
+    def format_result(self, logit: float):
+        """Turn a raw model logit into the API result dict"""
+        import torch
+        # Apply sigmoid (after calibration, if fitted) to get probability
+        calibrated = self.calibration.apply(logit) if self.calibration is not None else logit
+        confidence = torch.sigmoid(torch.tensor(calibrated)).item()
 
         # Threshold for classification
         is_fake = confidence > self.threshold
@@ -245,10 +1469,368 @@ class ModelManager:
             "confidence": float(confidence),
             "is_fake": bool(is_fake),
             "frames_analyzed": self.preprocessor.num_frames,
-            "raw_score": float(logits.item())
+            "raw_score": float(logit)
         }
 
 
+def decode_images(images):
+    """Decode encoded images (JPEG/PNG/...) to BGR frames, in order"""
+    import cv2
+    frames = []
+    for i, data in enumerate(images):
+        frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise ValueError(f"Could not decode image #{i + 1}")
+        frames.append(frame)
+    return frames
+
+
+# ============================================================================
+# RESULT CACHE
+# ============================================================================
+
+def content_hash(kind: str, *blobs) -> str:
+    """SHA-256 over the request kind and every uploaded blob (length-prefixed)"""
+    digest = hashlib.sha256(kind.encode())
+    for blob in blobs:
+        digest.update(len(blob).to_bytes(8, "little"))
+        digest.update(blob)
+    return digest.hexdigest()
+
+
+def file_content_hash(kind: str, path: str, chunk_size=1 << 20) -> str:
+    """Same key as content_hash(kind, data) for a file's bytes, read in chunks"""
+    with open(path, "rb") as f:
+        return stream_content_hash(kind, f, os.path.getsize(path), chunk_size)
+
+
+def upload_content_hash(kind: str, file: UploadFile, chunk_size=1 << 20) -> str:
+    """Same key as content_hash(kind, data) for an upload, read in chunks and rewound"""
+    f = file.file
+    size = f.seek(0, os.SEEK_END)
+    f.seek(0)
+    try:
+        return stream_content_hash(kind, f, size, chunk_size)
+    finally:
+        f.seek(0)
+
+
+def stream_content_hash(kind: str, f, size: int, chunk_size=1 << 20) -> str:
+    """Same key as content_hash(kind, data) for size bytes read from a file object"""
+    digest = hashlib.sha256(kind.encode())
+    digest.update(size.to_bytes(8, "little"))
+    for chunk in iter(lambda: f.read(chunk_size), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Thread-safe LRU of prediction results keyed by content hash"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: str):
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+        metrics.inc("result_cache_requests_total", result="hit" if result is not None else "miss")
+        return result
+
+    def put(self, key: str, result: dict):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            metrics.set_gauge("result_cache_entries", len(self._entries))
+
+
+class TTLCache:
+    """Thread-safe LRU with a time-to-live (Grad-CAM activations, probed video indexes)"""
+
+    def __init__(self, ttl_seconds=300, max_entries=32):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        while self._entries:
+            key, (stored, _) = next(iter(self._entries.items()))
+            if now - stored < self.ttl:
+                break
+            del self._entries[key]
+
+    def get(self, key: str):
+        with self._lock:
+            self._expire(time.monotonic())
+            item = self._entries.get(key)
+            return item[1] if item is not None else None
+
+    def put(self, key: str, value):
+        with self._lock:
+            now = time.monotonic()
+            self._entries.pop(key, None)
+            self._entries[key] = (now, value)
+            self._expire(now)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def frame_digest(frame) -> bytes:
+    """Exact digest of a decoded frame's pixels and shape"""
+    digest = hashlib.sha256(str(frame.shape).encode())
+    digest.update(np.ascontiguousarray(frame))
+    return digest.digest()
+
+
+class FrameCache:
+    """
+    Thread-safe LRU of per-frame work, bounded in bytes
+    Keys are VideoPreprocessor.frame_key values, which distinct frames can
+    share, so every entry records its frame's frame_digest and is only
+    returned for that exact frame. An entry holds the face box and detection
+    probability and, once scored, the trunk features and (while explanations
+    are on) float16 last-stage activations
+    """
+
+    def __init__(self, max_bytes=256 << 20):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(entry: dict) -> int:
+        return 256 + sum(getattr(value, "nbytes", 0) for value in entry.values())
+
+    def get(self, key: str, frame=None, digest: Optional[bytes] = None):
+        """
+        The entry (treat as read-only) of the frame under key, or None
+        Pass the decoded frame, or its digest when already known; the frame is
+        only hashed when key has an entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry["digest"] != (digest if digest is not None else frame_digest(frame)):
+            metrics.inc("frame_cache_collisions_total")
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return entry
+
+    def update(self, key: str, digest: bytes, **fields):
+        """Add fields to the frame's entry; an entry of another frame under key is replaced"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= self._size(entry)
+            entry = dict(entry) if entry is not None and entry["digest"] == digest else {"digest": digest}
+            entry.update(fields)
+            self._entries[key] = entry
+            self.bytes += self._size(entry)
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= self._size(evicted)
+            metrics.set_gauge("frame_cache_entries", len(self._entries))
+            metrics.set_gauge("frame_cache_bytes", self.bytes)
+
+
+# ============================================================================
+# LIVE STREAM SCORING
+# ============================================================================
+
+class StreamScorer:
+    """
+    Incremental scorer for one live stream
+    Incoming frames are counted by sample(); the sampled frames of a window
+    go through the ResNet50 trunk as one batch and the BiLSTM scores them.
+    The forward direction's state is carried into the next window, the
+    backward direction restarts from zero since it cannot see future frames
+    """
+
+    def __init__(self, model_manager, window=12, sample_every=1, carry_state=True, history=5):
+        self.model_manager = model_manager
+        self.window = window
+        self.sample_every = sample_every
+        self.carry_state = carry_state
+
+        self.features = []
+        self.state = None
+        self.recent = deque(maxlen=history)
+        self.frames_received = 0
+        self.frames_scored = 0
+        self.windows = 0
+        self.window_started = None
+
+    def sample(self) -> bool:
+        """Count one incoming frame; True if it is a sampled frame to pass to add_frames"""
+        self.frames_received += 1
+        if (self.frames_received - 1) % self.sample_every:
+            return False
+        if not self.features and self.window_started is None:
+            self.window_started = time.perf_counter()
+        return True
+
+    @no_grad
+    def add_frames(self, frames):
+        """Run the trunk on sampled BGR frames (one batch); returns a score dict when a window completes"""
+        mm = self.model_manager
+        preprocessor = mm.preprocessor
+        batch = preprocessor.clips.acquire((len(frames), 3, preprocessor.image_size, preprocessor.image_size))
+        try:
+            for i in range(0, len(frames), preprocessor.detect_batch_size):
+                chunk = frames[i:i + preprocessor.detect_batch_size]
+                preprocessor.process_frames(chunk, out=batch[i:i + len(chunk)])
+            feats = mm.model.extract_features(batch.to(mm.device))
+        finally:
+            preprocessor.clips.release(batch)
+        self.features.extend(feats.split(1))
+        self.frames_scored += len(frames)
+        metrics.inc("stream_frames_total", len(frames))
+
+        if len(self.features) < self.window:
+            return None
+        return self._score_window()
+
+    @no_grad
+    def flush(self, frames=()):
+        """Add the last sampled frames and score the trailing partial window, if any"""
+        if frames:
+            result = self.add_frames(list(frames))
+            if result is not None:
+                return result
+        return self._score_window() if self.features else None
+
+    def _score_window(self):
+        import torch
+        mm = self.model_manager
+        start = time.perf_counter()
+        feats = torch.cat(self.features).unsqueeze(0)  # (1, T, feature_dim)
+        logits, state = mm.model.classify_features(feats, self.state)
+        self.features = []
+
+        # Pooling heads are stateless; each window stands alone
+        if self.carry_state and state is not None:
+            # Keep the forward direction, zero the backward one
+            h, c = state
+            self.state = (
+                torch.stack([h[0], torch.zeros_like(h[1])]),
+                torch.stack([c[0], torch.zeros_like(c[1])])
+            )
+
+        result = mm.format_result(float(logits.item()))
+        self.windows += 1
+        self.recent.append(result["confidence"])
+        latency = time.perf_counter() - start
+        metrics.inc("stream_windows_total")
+        metrics.observe("stream_window_seconds", latency)
+
+        result["frames_analyzed"] = feats.shape[1]
+        window_seconds = time.perf_counter() - self.window_started
+        self.window_started = None
+        return dict(
+            result,
+            type="score",
+            window=self.windows,
+            frames_received=self.frames_received,
+            rolling_confidence=sum(self.recent) / len(self.recent),
+            window_seconds=window_seconds,
+            latency_ms=latency * 1000
+        )
+
+    def summary(self):
+        return {
+            "frames_received": self.frames_received,
+            "frames_scored": self.frames_scored,
+            "windows": self.windows,
+            "rolling_confidence": sum(self.recent) / len(self.recent) if self.recent else None,
+        }
+
+
+class ChunkReader(io.RawIOBase):
+    """
+    Blocking file-like view over encoded video chunks arriving on a stream
+    Feeds PyAV from a bounded queue so a streamable container (WebM,
+    fragmented MP4, MPEG-TS) can be demuxed while it is still uploading.
+    Chunks are queued in pieces of at most max_bytes / max_chunks, so at
+    most max_bytes wait for the decoder
+    """
+
+    def __init__(self, max_chunks=32, max_bytes=8 << 20):
+        self.chunks = queue.Queue(maxsize=max_chunks)
+        self.piece_bytes = max(max_bytes // max_chunks, 1)
+        self.buffer = b""
+        self.eof = False
+
+    def readable(self):
+        return True
+
+    def feed(self, data: bytes):
+        """Queue a chunk; blocks while the decoder is behind, drops data once it has stopped"""
+        for start in range(0, len(data), self.piece_bytes):
+            piece = data[start:start + self.piece_bytes]
+            while not self.closed:
+                try:
+                    self.chunks.put(piece, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def close_input(self):
+        try:
+            self.chunks.put_nowait(None)
+        except queue.Full:
+            self.eof = True
+
+    def readinto(self, b):
+        while not self.buffer:
+            if self.eof:
+                return 0
+            chunk = self.chunks.get()
+            if chunk is None:
+                self.eof = True
+                return 0
+            self.buffer = chunk
+
+        n = min(len(b), len(self.buffer))
+        b[:n] = self.buffer[:n]
+        self.buffer = self.buffer[n:]
+        return n
+
+
+def decode_chunks(reader: ChunkReader, on_frame, on_error):
+    """Decode frames from a ChunkReader on a background thread; ends with on_frame(None)"""
+    try:
+        import av
+
+        with av.open(reader, mode="r") as container:
+            stream = container.streams.video[0]
+            stream.thread_type = "AUTO"
+            for frame in container.decode(stream):
+                on_frame(frame.to_ndarray(format="bgr24"))
+    except Exception as e:
+        on_error(e)
+    finally:
+        reader.close()
+        on_frame(None)
+
+
 # ============================================================================
 # FASTAPI APPLICATION
 # ============================================================================
@@ -273,26 +1855,369 @@ app.add_middleware(
 
 # Global model manager
 MODEL_PATH = os.getenv("MODEL_PATH", "model_epoch_30.pth")
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
-THRESHOLD = float(os.getenv("PREDICTION_THRESHOLD", "0.5"))
+# Architecture for checkpoints that do not record one (resnet50, mobilenet_v3, efficientnet_b0)
+MODEL_ARCH = os.getenv("MODEL_ARCH", "resnet50")
+# "cuda" when available, else "cpu"; probed by the model loader, which imports torch
+DEVICE = None
+# Unset: the calibrated threshold next to the checkpoint, else 0.5
+THRESHOLD = float(os.environ["PREDICTION_THRESHOLD"]) if os.getenv("PREDICTION_THRESHOLD") else None
+# Calibration file (default: <checkpoint>.calibration.json, written by evaluate_model.py)
+CALIBRATION_PATH = os.getenv("CALIBRATION_PATH", "")
+# Longest side of the downscaled proxy frame face detection runs on (0 = native resolution)
+DETECT_SIZE = int(os.getenv("DETECT_SIZE", "640"))
+# Video decoder: auto, opencv, pyav or decord (0 threads = library default)
+VIDEO_DECODER = os.getenv("VIDEO_DECODER", "auto")
+DECODE_THREADS = int(os.getenv("DECODE_THREADS", "0"))
+# Face detector: mtcnn, haar, yunet or none, with JSON keyword options
+FACE_DETECTOR = os.getenv("FACE_DETECTOR", "mtcnn")
+FACE_DETECTOR_OPTIONS = json.loads(os.getenv("FACE_DETECTOR_OPTIONS", "{}"))
+# Cheap face-presence pre-filter in front of the full model
+CASCADE_ENABLED = os.getenv("CASCADE_ENABLED", "0") == "1"
+CASCADE_OPTIONS = {
+    "probe_frames": int(os.getenv("CASCADE_PROBE_FRAMES", "4")),
+    "probe_size": int(os.getenv("CASCADE_PROBE_SIZE", "320")),
+    "min_face_prob": float(os.getenv("CASCADE_MIN_FACE_PROB", "0.9")),
+}
+# Probed frame indexes kept per content hash (size 0 disables)
+VIDEO_INDEX_CACHE_SECONDS = float(os.getenv("VIDEO_INDEX_CACHE_SECONDS", "3600"))
+VIDEO_INDEX_CACHE_SIZE = int(os.getenv("VIDEO_INDEX_CACHE_SIZE", "1024"))
+# Packets read when indexing a video; longer ones use header estimates (0 = no limit)
+VIDEO_PROBE_MAX_PACKETS = int(os.getenv("VIDEO_PROBE_MAX_PACKETS", "54000"))
+# Idle clip / scratch buffers kept per pool, and the decode working set allowed
+# across all concurrent requests (0 = unlimited), in MB
+BUFFER_POOL_MB = int(os.getenv("BUFFER_POOL_MB", "256"))
+MEMORY_BUDGET_MB = int(os.getenv("MEMORY_BUDGET_MB", "1024"))
+# Near-duplicate detection: "prior" only reports the match, "off" disables
+# fingerprinting. "reuse" answers close matches with the earlier verdict; it is
+# opt-in because a face swap made from already scored footage can match it.
+# Similarities are the share of frames within FINGERPRINT_MAX_DISTANCE bits
+FINGERPRINT_MODE = os.getenv("FINGERPRINT_MODE", "prior").lower()
+FINGERPRINT_INDEX_PATH = os.getenv("FINGERPRINT_INDEX_PATH", "")
+FINGERPRINT_INDEX_SIZE = int(os.getenv("FINGERPRINT_INDEX_SIZE", "100000"))
+FINGERPRINT_MAX_DISTANCE = int(os.getenv("FINGERPRINT_MAX_DISTANCE", "31"))
+FINGERPRINT_REUSE_SIMILARITY = float(os.getenv("FINGERPRINT_REUSE_SIMILARITY", "0.9"))
+FINGERPRINT_PRIOR_SIMILARITY = float(os.getenv("FINGERPRINT_PRIOR_SIMILARITY", "0.5"))
+# Live stream limits: frames buffered before the oldest are dropped, max window length
+STREAM_MAX_PENDING = int(os.getenv("STREAM_MAX_PENDING", "24"))
+STREAM_MAX_WINDOW = int(os.getenv("STREAM_MAX_WINDOW", "32"))
+# Largest binary message (frame or video chunk), and encoded video bytes buffered ahead of the decoder
+STREAM_MAX_MESSAGE_MB = float(os.getenv("STREAM_MAX_MESSAGE_MB", "8"))
+STREAM_MAX_BUFFER_MB = float(os.getenv("STREAM_MAX_BUFFER_MB", "16"))
+# Test-time augmentation (/predict?tta=true): frame offsets as a fraction of
+# the sampling step, face margins in output pixels, and horizontal flips
+TTA_OFFSETS = [float(x) for x in os.getenv("TTA_OFFSETS", "0,0.5").split(",")]
+TTA_MARGINS = [int(x) for x in os.getenv("TTA_MARGINS", "20,40").split(",")]
+TTA_FLIP = os.getenv("TTA_FLIP", "1") == "1"
+# Admission cost of a TTA request in plain predictions: decode and detection are
+# shared, so 8 variants measure about 4x (benchmark_tta.py)
+TTA_COST = max(1.0, len(TTA_OFFSETS) * len(TTA_MARGINS) * (2 if TTA_FLIP else 1) / 2)
+# Crops per trunk forward (0 = all at once on GPU, one clip's worth on CPU)
+TTA_TRUNK_BATCH = int(os.getenv("TTA_TRUNK_BATCH", "0"))
+# Multi-face scoring (/predict?multi_face=true): faces kept per frame and
+# tracks scored per video, minimum detection probability and face size
+# (shorter side, full-resolution pixels), IoU linking a face to a track's
+# last box, and the fraction of decoded frames a track must cover
+MULTI_FACE_MAX = int(os.getenv("MULTI_FACE_MAX", "4"))
+MULTI_FACE_MIN_PROB = float(os.getenv("MULTI_FACE_MIN_PROB", "0.9"))
+MULTI_FACE_MIN_SIZE = int(os.getenv("MULTI_FACE_MIN_SIZE", "40"))
+MULTI_FACE_IOU = float(os.getenv("MULTI_FACE_IOU", "0.3"))
+MULTI_FACE_MIN_COVERAGE = float(os.getenv("MULTI_FACE_MIN_COVERAGE", "0.5"))
+# Confidence a face other than the primary one needs to flag the video; the
+# single-clip threshold applied to every face would raise the false-positive
+# rate with each extra face (calibrate on real multi-face videos)
+MULTI_FACE_THRESHOLD = float(os.getenv("MULTI_FACE_THRESHOLD", "0.9"))
+# Content-hash result cache shared by the predict endpoints (0 disables)
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "256"))
+# Maximum images accepted by /predict/frames (individual files or zip members)
+MAX_FRAMES_PER_REQUEST = int(os.getenv("MAX_FRAMES_PER_REQUEST", "256"))
+# Size caps for frame sets, checked before decompressing: per image and for the whole set
+MAX_FRAME_MB = float(os.getenv("MAX_FRAME_MB", "20"))
+MAX_FRAME_SET_MB = float(os.getenv("MAX_FRAME_SET_MB", "256"))
+# Streamed batches: videos scored concurrently, and the directory manifests may
+# reference (manifest batches are disabled unless this is set)
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "2"))
+BATCH_MANIFEST_ROOT = os.getenv("BATCH_MANIFEST_ROOT")
+# Frame selection: candidates decoded and scored (face probability, size,
+# sharpness) per sampling slot, of which the best is analyzed (1 = off, the
+# training positions)
+FRAME_CANDIDATES = int(os.getenv("FRAME_CANDIDATES", "3"))
+# Per-frame face boxes and trunk features reused by trimmed / re-introed
+# re-uploads (0 disables)
+FRAME_CACHE_MB = int(os.getenv("FRAME_CACHE_MB", "256"))
+# Grad-CAM: how long activations from /predict are kept for /explain (0 disables)
+EXPLAIN_CACHE_SECONDS = float(os.getenv("EXPLAIN_CACHE_SECONDS", "300"))
+EXPLAIN_CACHE_SIZE = int(os.getenv("EXPLAIN_CACHE_SIZE", "32"))
+HEATMAP_SIZE = int(os.getenv("HEATMAP_SIZE", "56"))
+# When set, inference runs in a separate daemon (see inference_ipc.py)
+INFERENCE_SOCKET = os.getenv("INFERENCE_SOCKET")
+# Prediction audit log: SQLite files under AUDIT_LOG_DIR ("" disables), written
+# in batches off the request path. The active file rotates by rows or size into
+# compacted segments; the newest AUDIT_MAX_SEGMENTS are kept (and, when
+# AUDIT_RETENTION_DAYS > 0, only those younger than that)
+AUDIT_LOG_DIR = os.getenv("AUDIT_LOG_DIR", "audit")
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "256"))
+AUDIT_FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", "1.0"))
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_ROTATE_ROWS = int(os.getenv("AUDIT_ROTATE_ROWS", "500000"))
+AUDIT_ROTATE_MB = int(os.getenv("AUDIT_ROTATE_MB", "256"))
+AUDIT_MAX_SEGMENTS = int(os.getenv("AUDIT_MAX_SEGMENTS", "30"))
+AUDIT_RETENTION_DAYS = float(os.getenv("AUDIT_RETENTION_DAYS", "0"))
+# Admin endpoints (/admin/...) need this token in X-Admin-Token; unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+# On-demand request profiles (torch op traces + sampled Python stacks)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_HZ = int(os.getenv("PROFILE_SAMPLE_HZ", "200"))
+# Startup: "background" loads and warms up the model on a thread while the
+# server already answers /live; "blocking" does both before serving. Warm-up
+# runs WARMUP_ITERATIONS forward passes per clip batch size ("" skips them)
+STARTUP_MODE = os.getenv("STARTUP_MODE", "background").lower()
+WARMUP_BATCH_SIZES = [int(x) for x in os.getenv("WARMUP_BATCH_SIZES", "1").split(",") if x.strip()]
+WARMUP_ITERATIONS = int(os.getenv("WARMUP_ITERATIONS", "2"))
+# Admission control: concurrent inference slots, shared between priority classes
+# by weight. Each client can get a token-bucket quota per class (requests/sec,
+# 0 = unlimited, the default); queues are bounded in length and wait time
+ADMISSION_SLOTS = int(os.getenv("ADMISSION_SLOTS", "2"))
+# Identify clients by X-Client-ID only behind a gateway that sets it (else by address)
+TRUST_CLIENT_ID = os.getenv("TRUST_CLIENT_ID", "0") == "1"
+PRIORITY_CLASSES = [
+    PriorityClass(
+        "interactive",
+        weight=float(os.getenv("INTERACTIVE_WEIGHT", "4")),
+        rate=float(os.getenv("INTERACTIVE_RATE", "0")),
+        burst=float(os.getenv("INTERACTIVE_BURST", "10")),
+        max_queue=int(os.getenv("INTERACTIVE_MAX_QUEUE", "32")),
+        max_wait=float(os.getenv("INTERACTIVE_MAX_WAIT", "30"))
+    ),
+    PriorityClass(
+        "bulk",
+        weight=float(os.getenv("BULK_WEIGHT", "1")),
+        rate=float(os.getenv("BULK_RATE", "0")),
+        burst=float(os.getenv("BULK_BURST", "20")),
+        max_queue=int(os.getenv("BULK_MAX_QUEUE", "64")),
+        max_wait=float(os.getenv("BULK_MAX_WAIT", "600"))
+    ),
+]
+# Highest priority first; X-Priority may only move a request down this list
+PRIORITY_ORDER = [c.name for c in PRIORITY_CLASSES]
 
 model_manager = None
+audit_log = None
+result_cache = ResultCache(RESULT_CACHE_SIZE)
+admission = AdmissionController(ADMISSION_SLOTS, PRIORITY_CLASSES)
+memory_budget = MemoryBudget(MEMORY_BUDGET_MB << 20)
+request_profiler = RequestProfiler(PROFILE_DIR, PROFILE_SAMPLE_HZ)
+# starting -> loading_model -> warming_up -> ready, or failed; model_manager
+# is only published once warm, so endpoints answer 503 until then
+startup = {"stage": "starting", "started": time.time(), "ready_seconds": None, "warmup": None, "error": None}
 
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize model on startup"""
-    global model_manager
+
+def explain_enabled():
+    """Grad-CAM needs the in-process model with the activation cache on"""
+    return isinstance(model_manager, ModelManager) and model_manager.activations is not None
+
+
+def explain_id(key: str) -> Optional[str]:
+    """The content hash doubles as the /explain id, but only while its activations are cached"""
+    if explain_enabled() and model_manager.activations.get(key) is not None:
+        return key
+    return None
+
+
+def client_ticket(request: Request, default: str = "interactive"):
+    """
+    (client id, priority class) of a request
+    Clients are identified by their address, or by X-Client-ID when
+    TRUST_CLIENT_ID says a gateway sets it (callers could otherwise pick a
+    fresh id per request); X-Priority can only lower the endpoint's default
+    class (e.g. mark an upload as bulk)
+    """
+    client = request.headers.get("x-client-id") if TRUST_CLIENT_ID else None
+    client = client or (request.client.host if request.client else "anonymous")
+    priority = request.headers.get("x-priority", default).lower()
+    if priority not in PRIORITY_ORDER or PRIORITY_ORDER.index(priority) < PRIORITY_ORDER.index(default):
+        priority = default
+    return client, priority
+
+
+def rejection(e: AdmissionRejected):
+    """429 with a Retry-After header for a shed request"""
+    return HTTPException(
+        status_code=429,
+        detail=str(e),
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+    )
+
+
+def check_quota(ticket, cost: float = 1):
+    """Charge the client's quota for a request, or raise 429"""
     try:
-        model_manager = ModelManager(MODEL_PATH, device=DEVICE, threshold=THRESHOLD)
-        print(f"✅ API started successfully")
+        admission.check_quota(*ticket, cost)
+    except AdmissionRejected as e:
+        raise rejection(e)
+
+
+def profiled(compute, *args):
+    """Run compute, inside a profiling capture when one is armed"""
+    with request_profiler.capture(getattr(compute, "__name__", "request")):
+        return compute(*args)
+
+
+async def admitted_call(ticket, compute, *args, bounded: bool = True, cost: float = 1.0):
+    """
+    Run compute off the event loop once admission control grants an inference slot
+    cost weighs the request against others in its class (in plain predictions)
+    """
+    try:
+        async with admission.slot(*ticket, cost=cost, bounded=bounded):
+            job = asyncio.ensure_future(run_in_threadpool(profiled, compute, *args))
+            try:
+                return await asyncio.shield(job)
+            except asyncio.CancelledError:
+                # A worker thread cannot be interrupted: hold the slot (and the caller's
+                # files) until it has actually finished, then let the cancellation through
+                await asyncio.wait({job})
+                raise
+    except AdmissionRejected as e:
+        raise rejection(e)
+
+
+def require_admin(request: Request):
+    """Admin endpoints need ADMIN_TOKEN configured and sent as X-Admin-Token"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (set ADMIN_TOKEN)")
+    token = request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+def audit(endpoint: str, key: Optional[str], name: str, result: dict, ticket, seconds: float):
+    """Queue a verdict for the audit log; never blocks the response"""
+    if audit_log is None:
+        return
+    calibration = getattr(model_manager, "calibration", None)
+    details = {k: result[k] for k in ("decoder", "frames_real", "frames_padded", "frames_reused", "near_duplicate")
+               if result.get(k) is not None}
+    if result.get("tta"):
+        details["tta"] = {k: v for k, v in result["tta"].items() if k != "scores"}
+    if result.get("faces"):
+        details["faces"] = {k: v for k, v in result["faces"].items() if k != "scores"}
+        details["faces"]["confidences"] = [score["confidence"] for score in result["faces"]["scores"]]
+    audit_log.record({
+        "endpoint": endpoint,
+        "content_hash": key,
+        "video_name": name,
+        "client": ticket[0],
+        "priority": ticket[1],
+        "model": MODEL_PATH,
+        "architecture": getattr(model_manager, "architecture", MODEL_ARCH),
+        "threshold": getattr(model_manager, "threshold", THRESHOLD),
+        "calibration": calibration.method if calibration is not None else None,
+        "prediction": result.get("prediction"),
+        "confidence": result.get("confidence"),
+        "raw_score": result.get("raw_score"),
+        "is_fake": result.get("is_fake"),
+        "cached": result.get("cached", False),
+        "short_circuited": result.get("short_circuited", False),
+        "reason": result.get("cascade_reason"),
+        "frames_analyzed": result.get("frames_analyzed"),
+        "request_seconds": seconds,
+        # Stage timings of a cached result belong to the request that computed it
+        "timings": None if result.get("cached") else result.get("timings"),
+        "details": details,
+    })
+
+
+async def cached_predict(ticket, key: str, compute, *args):
+    """Serve a result from the content-hash cache, or charge the quota and compute it in an admitted slot"""
+    result = result_cache.get(key)
+    if result is not None:
+        return dict(result, cached=True)
+
+    check_quota(ticket)
+    result = await admitted_call(ticket, compute, *args)
+    result_cache.put(key, result)
+    return result
+
+
+def probe_device() -> str:
+    """"cuda" when available, else "cpu" (imports torch)"""
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def load_model_manager():
+    """Build and warm up the model manager, then publish it"""
+    global model_manager, DEVICE
+    try:
+        startup["stage"] = "loading_model"
+        DEVICE = probe_device()
+        if INFERENCE_SOCKET:
+            # The daemon loads and warms up its own model
+            manager = RemoteModelManager(INFERENCE_SOCKET)
+        else:
+            manager = ModelManager(MODEL_PATH, device=DEVICE, threshold=THRESHOLD, architecture=MODEL_ARCH,
+                                   cascade=CASCADE_ENABLED and CASCADE_OPTIONS)
+            startup["stage"] = "warming_up"
+            startup["warmup"] = manager.warmup(WARMUP_BATCH_SIZES, WARMUP_ITERATIONS)
+        model_manager = manager
+        startup["ready_seconds"] = time.time() - startup["started"]
+        startup["stage"] = "ready"
+        metrics.set_gauge("startup_ready_seconds", startup["ready_seconds"])
+
+        print(f"✅ Model ready after {startup['ready_seconds']:.1f}s")
         print(f"   Device: {DEVICE}")
+        if INFERENCE_SOCKET:
+            print(f"   Inference Daemon: {INFERENCE_SOCKET}")
         print(f"   Model Path: {MODEL_PATH}")
-        print(f"   Prediction Threshold: {THRESHOLD}")
+        print(f"   Prediction Threshold: {getattr(model_manager, 'threshold', THRESHOLD)}")
+        if startup["warmup"]:
+            print("   Warm-up: " + ", ".join(f"{k} {v * 1000:.0f} ms" for k, v in startup["warmup"].items()))
+    except Exception as e:
+        startup["error"] = str(e)
+        startup["stage"] = "failed"
+        print(f"❌ Failed to load model: {e}")
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Start the audit log and load the model (in the background unless STARTUP_MODE=blocking)"""
+    global audit_log
+    try:
+        if AUDIT_LOG_DIR:
+            audit_log = AuditLog(
+                AUDIT_LOG_DIR,
+                batch_size=AUDIT_BATCH_SIZE,
+                flush_seconds=AUDIT_FLUSH_SECONDS,
+                queue_size=AUDIT_QUEUE_SIZE,
+                rotate_rows=AUDIT_ROTATE_ROWS,
+                rotate_bytes=AUDIT_ROTATE_MB << 20,
+                max_segments=AUDIT_MAX_SEGMENTS,
+                retention_days=AUDIT_RETENTION_DAYS
+            )
+            audit_log.start()
     except Exception as e:
         print(f"❌ Failed to initialize API: {e}")
         raise
 
+    if STARTUP_MODE == "blocking":
+        load_model_manager()
+        if startup["stage"] == "failed":
+            raise RuntimeError(startup["error"])
+    else:
+        threading.Thread(target=load_model_manager, name="model-loader", daemon=True).start()
+    print(f"✅ API started successfully ({'model ready' if model_manager else 'model loading in background'})")
+    if audit_log is not None:
+        print(f"   Audit Log: {AUDIT_LOG_DIR}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush queued audit entries"""
+    if audit_log is not None:
+        await run_in_threadpool(audit_log.close)
+
 
 @app.get("/", response_model=HealthResponse)
 async def root():
@@ -300,27 +2225,77 @@ async def root():
     return HealthResponse(
         status="online",
         model_loaded=model_manager is not None,
-        device=DEVICE
+        device=DEVICE or "pending"
+    )
+
+
+@app.get("/live")
+async def live():
+    """
+    Liveness: the process is up and its event loop responds
+    503 only when the model failed to load, so the orchestrator restarts the worker
+    """
+    failed = startup["stage"] == "failed"
+    return JSONResponse(
+        status_code=503 if failed else 200,
+        content={"status": "failed" if failed else "alive", "stage": startup["stage"], "error": startup["error"]}
+    )
+
+
+async def model_loaded() -> bool:
+    """Whether the in-process model is built, or the inference daemon reports one loaded"""
+    if model_manager is None:
+        return False
+    if isinstance(model_manager, ModelManager):
+        return model_manager.model is not None
+    # Pinging the daemon is a blocking socket round trip; keep it off the event loop
+    return await run_in_threadpool(model_manager.model_loaded)
+
+
+@app.get("/ready")
+async def ready():
+    """
+    Readiness: the model is loaded and warmed up (and, with INFERENCE_SOCKET,
+    the daemon is reachable); route traffic here only on 200
+    """
+    is_ready = startup["stage"] == "ready" and await model_loaded()
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={
+            "ready": is_ready,
+            "stage": startup["stage"],
+            "uptime_seconds": time.time() - startup["started"],
+            "ready_seconds": startup["ready_seconds"],
+            "warmup": startup["warmup"],
+            "error": startup["error"],
+        }
     )
 
 
 @app.get("/health", response_model=HealthResponse)
 async def health():
     """Detailed health check endpoint"""
+    loaded = await model_loaded()
     return HealthResponse(
-        status="healthy" if model_manager and model_manager.model else "unhealthy",
-        model_loaded=model_manager is not None and model_manager.model is not None,
-        device=DEVICE
+        status="healthy" if loaded else "unhealthy",
+        model_loaded=loaded,
+        device=DEVICE or "pending"
     )
 
 
 @app.post("/predict", response_model=PredictionResponse)
-async def predict_video(file: UploadFile = File(...)):
+async def predict_video(request: Request, file: UploadFile = File(...), tta: bool = False,
+                        multi_face: bool = False):
     """
     Analyze uploaded video for deepfake detection
 
     Args:
         file: Video file (MP4, AVI, MOV, MKV formats supported)
+        tta: Average flipped, re-cropped and frame-shifted variants (slower,
+            more robust); the response's tta field holds their spread
+        multi_face: Score every tracked face separately; faces other than
+            the primary one flag the video only above MULTI_FACE_THRESHOLD,
+            and the faces field holds each track's verdict
 
     Returns:
         PredictionResponse with:
@@ -331,7 +2306,8 @@ async def predict_video(file: UploadFile = File(...)):
         - raw_score: Raw model logit output
 
     The model applies sigmoid activation to convert logits to probabilities.
-    Default threshold is 0.5 (can be adjusted via PREDICTION_THRESHOLD env var).
+    Default threshold is the calibrated one when a calibration file sits next
+    to the checkpoint, else 0.5 (can be adjusted via PREDICTION_THRESHOLD env var).
     """
     if model_manager is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
@@ -346,22 +2322,53 @@ async def predict_video(file: UploadFile = File(...)):
             detail=f"Unsupported file type '{file_ext}'. Allowed: {', '.join(allowed_extensions)}"
         )
 
+    if tta and not isinstance(model_manager, ModelManager):
+        raise HTTPException(status_code=501, detail="Test-time augmentation needs the in-process model")
+    if multi_face and not isinstance(model_manager, ModelManager):
+        raise HTTPException(status_code=501, detail="Multi-face scoring needs the in-process model")
+    if tta and multi_face:
+        raise HTTPException(status_code=400, detail="tta and multi_face cannot be combined")
+
+    ticket = client_ticket(request, "interactive")
+
+    start = time.perf_counter()
+    content = await file.read()
+    key = content_hash("video", content)
+    result_key = f"{key}:tta" if tta else f"{key}:faces" if multi_face else key
+
+    cached = result_cache.get(result_key)
+    if cached is not None:
+        metrics.observe("request_seconds", time.perf_counter() - start, endpoint="/predict")
+        audit("/predict", key, file.filename, dict(cached, cached=True), ticket, time.perf_counter() - start)
+        return PredictionResponse(video_name=file.filename, prediction_id=explain_id(key), **dict(cached, cached=True))
+
+    # Cache hits are free; only work for the model is charged, TTA by its extra passes
+    cost = TTA_COST if tta else 1.0
+    check_quota(ticket, cost)
+
     # Save uploaded file temporarily
     tmp_path = None
     try:
         with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp:
-            content = await file.read()
             tmp.write(content)
             tmp_path = tmp.name
 
-        # Run prediction
-        result = model_manager.predict(tmp_path)
+        # Run prediction off the event loop once admitted
+        predict = model_manager.predict_tta if tta else \
+            model_manager.predict_faces if multi_face else model_manager.predict
+        result = await admitted_call(ticket, predict, tmp_path, key, cost=cost)
+        result_cache.put(result_key, result)
+        metrics.observe("request_seconds", time.perf_counter() - start, endpoint="/predict")
+        audit("/predict", key, file.filename, result, ticket, time.perf_counter() - start)
 
         return PredictionResponse(
             video_name=file.filename,
+            prediction_id=explain_id(key),
             **result
         )
 
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -377,9 +2384,10 @@ async def predict_video(file: UploadFile = File(...)):
 
 
 @app.post("/predict/batch", response_model=dict)
-async def predict_batch(files: list[UploadFile] = File(...)):
+async def predict_batch(request: Request, files: list[UploadFile] = File(...)):
     """
     Analyze multiple videos in batch
+    For more than 10 videos or streamed results use /predict/batch/stream
 
     Args:
         files: List of video files
@@ -396,17 +2404,34 @@ async def predict_batch(files: list[UploadFile] = File(...)):
             detail="Maximum 10 videos allowed per batch request"
         )
 
+    # Batches are bulk work; the quota is charged up front, per video not already cached
+    ticket = client_ticket(request, "bulk")
+    keys = [await run_in_threadpool(upload_content_hash, "video", file) for file in files]
+    uncached = sum(1 for key in set(keys) if key not in result_cache)
+    if uncached:
+        check_quota(ticket, uncached)
+
     results = []
 
-    for file in files:
+    for file, key in zip(files, keys):
         tmp_path = None
         try:
+            start = time.perf_counter()
+            content = await file.read()
+            result = result_cache.get(key)
+            if result is not None:
+                result = dict(result, cached=True)
+                audit("/predict/batch", key, file.filename, result, ticket, time.perf_counter() - start)
+                results.append(BatchPredictionItem(video_name=file.filename, **result))
+                continue
+
             with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as tmp:
-                content = await file.read()
                 tmp.write(content)
                 tmp_path = tmp.name
 
-            result = model_manager.predict(tmp_path)
+            result = await admitted_call(ticket, model_manager.predict, tmp_path, key)
+            result_cache.put(key, result)
+            audit("/predict/batch", key, file.filename, result, ticket, time.perf_counter() - start)
 
             results.append(
                 BatchPredictionItem(
@@ -415,6 +2440,8 @@ async def predict_batch(files: list[UploadFile] = File(...)):
                 )
             )
 
+        except HTTPException as e:
+            results.append(BatchPredictionItem(video_name=file.filename, error=e.detail))
         except Exception as e:
             results.append(
                 BatchPredictionItem(
@@ -433,19 +2460,674 @@ async def predict_batch(files: list[UploadFile] = File(...)):
     return {"predictions": [r.dict() for r in results]}
 
 
+async def spool_multipart(request: Request):
+    """
+    Parse a multipart body as it arrives, writing each file part once, straight
+    into a named temp file (File() would spool it to disk first, and we would
+    then have to copy it again to get a path the decoders can open)
+    Returns ([(filename, path)], {field: value}); the caller unlinks the paths
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if not content_type:
+        return [], {}
+    if content_type == b"application/x-www-form-urlencoded":
+        # Fields only, nothing to spool
+        form = await request.form()
+        return [], {name: value for name, value in form.items() if isinstance(value, str)}
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data body")
+
+    uploads, fields = [], {}
+    part = {"header": b"", "value": b"", "disposition": b"", "name": "", "data": b"", "file": None}
+    writes, files = [], []
+
+    def on_header_field(data, start, end):
+        part["header"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        part["value"] += data[start:end]
+
+    def on_header_end():
+        if part["header"].lower() == b"content-disposition":
+            part["disposition"] = part["value"]
+        part["header"] = part["value"] = b""
+
+    def on_headers_finished():
+        _, options = parse_options_header(part["disposition"])
+        part["name"] = options.get(b"name", b"").decode("utf-8", "replace")
+        part["data"], part["file"] = b"", None
+        if b"filename" in options:
+            filename = options[b"filename"].decode("utf-8", "replace")
+            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix.lower())
+            files.append(tmp)
+            uploads.append((filename, tmp.name))
+            part["file"] = tmp
+
+    def on_part_data(data, start, end):
+        if part["file"] is None:
+            part["data"] += data[start:end]
+        else:
+            writes.append((part["file"], data[start:end]))
+
+    def on_part_end():
+        if part["file"] is None:
+            fields[part["name"]] = part["data"].decode("utf-8", "replace")
+        part["disposition"] = b""
+
+    def write_parts(chunks):
+        for tmp, data in chunks:
+            tmp.write(data)
+
+    parser = MultipartParser(boundary, {
+        "on_header_field": on_header_field, "on_header_value": on_header_value,
+        "on_header_end": on_header_end, "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data, "on_part_end": on_part_end,
+    })
+    try:
+        try:
+            async for chunk in request.stream():
+                parser.write(chunk)
+                if writes:
+                    # File writes stay off the event loop
+                    await run_in_threadpool(write_parts, writes[:])
+                    writes.clear()
+            parser.finalize()
+        finally:
+            for tmp in files:
+                tmp.close()
+    except BaseException as e:
+        for tmp in files:
+            os.unlink(tmp.name)
+        if isinstance(e, ValueError):
+            raise HTTPException(status_code=400, detail=f"Malformed multipart body: {e}")
+        raise
+    return uploads, fields
+
+
+def parse_manifest(manifest: str):
+    """
+    Resolve a manifest (JSON list or one path per line) against BATCH_MANIFEST_ROOT
+    Returns (name, path, error) tuples; paths outside the root become per-item errors
+    """
+    try:
+        entries = json.loads(manifest)
+        if not isinstance(entries, list):
+            raise ValueError
+    except ValueError:
+        entries = [line.strip() for line in manifest.splitlines()]
+        entries = [e for e in entries if e and not e.startswith("#")]
+
+    root = Path(BATCH_MANIFEST_ROOT).resolve()
+    items = []
+    for entry in entries:
+        path = (root / str(entry)).resolve()
+        if path != root and root not in path.parents:
+            items.append((str(entry), None, "Path is outside the manifest root"))
+        elif not path.is_file():
+            items.append((str(entry), None, "File not found"))
+        else:
+            items.append((str(entry), str(path), None))
+    return items
+
+
+async def score_video_file(ticket, path: str):
+    """
+    Cache-aware prediction for a video already on disk; returns (content hash, result)
+    Cache hits skip the quota and the queue; misses wait for both instead of failing
+    """
+    key = await run_in_threadpool(file_content_hash, "video", path)
+    result = result_cache.get(key)
+    if result is not None:
+        return key, dict(result, cached=True)
+
+    await admission.wait_quota(*ticket)
+    result = await admitted_call(ticket, model_manager.predict, path, key, bounded=False)
+    result_cache.put(key, result)
+    return key, result
+
+
+@app.post("/predict/batch/stream", openapi_extra={"requestBody": {"content": {"multipart/form-data": {"schema": {
+    "type": "object",
+    "properties": {
+        "files": {"type": "array", "items": {"type": "string", "format": "binary"}},
+        "manifest": {"type": "string"},
+    },
+}}}}})
+async def predict_batch_stream(request: Request):
+    """
+    Analyze any number of videos, streaming one NDJSON line per video as it finishes
+
+    Args:
+        files: Video files (optional)
+        manifest: Server-local paths relative to BATCH_MANIFEST_ROOT, as a JSON
+                  list or one path per line (optional; needs BATCH_MANIFEST_ROOT)
+
+    Each line is a BatchPredictionItem plus its 'index' in the request
+    (uploads first, then manifest entries). Lines arrive in completion order.
+    Per-item failures are reported in 'error' and do not stop the batch.
+    At most BATCH_CONCURRENCY videos are scored at once, as bulk work paced
+    by the client's quota (429 only if the quota is exhausted at the start).
+    """
+    if model_manager is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    ticket = client_ticket(request, "bulk")
+    retry_after = admission.quota_retry_after(*ticket)
+    if retry_after:
+        raise rejection(AdmissionRejected("quota", retry_after))
+
+    # Write uploads to disk now, once; the request body is gone once this handler returns
+    uploads, fields = await spool_multipart(request)
+    temp_paths = {path for _, path in uploads}
+    manifest = fields.get("manifest")
+    try:
+        if manifest and not BATCH_MANIFEST_ROOT:
+            raise HTTPException(status_code=403, detail="Manifest batches are disabled (set BATCH_MANIFEST_ROOT)")
+        if not uploads and not manifest:
+            raise HTTPException(status_code=400, detail="Provide files and/or a manifest")
+        items = [(name, path, None) for name, path in uploads]
+        if manifest:
+            items.extend(parse_manifest(manifest))
+    except Exception:
+        for path in temp_paths:
+            os.unlink(path)
+        raise
+
+    metrics.inc("batch_stream_items_total", len(items))
+
+    async def stream_results():
+        results = asyncio.Queue()
+        pending = iter(enumerate(items))
+
+        async def worker():
+            for index, (name, path, error) in pending:
+                if error is None:
+                    try:
+                        start = time.perf_counter()
+                        key, result = await score_video_file(ticket, path)
+                        audit("/predict/batch/stream", key, name, result, ticket, time.perf_counter() - start)
+                        item = BatchPredictionItem(video_name=name, **result)
+                    except Exception as e:
+                        item = BatchPredictionItem(video_name=name, error=str(e))
+                    finally:
+                        if path in temp_paths:
+                            temp_paths.discard(path)
+                            os.unlink(path)
+                else:
+                    item = BatchPredictionItem(video_name=name, error=error)
+                await results.put(json.dumps({"index": index, **item.dict()}) + "\n")
+
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, BATCH_CONCURRENCY))]
+        try:
+            for _ in range(len(items)):
+                yield await results.get()
+        finally:
+            # On disconnect, wait for scoring already running in threads before
+            # deleting the files they are reading
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            for path in list(temp_paths):
+                if os.path.exists(path):
+                    os.unlink(path)
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@app.post("/predict/image", response_model=PredictionResponse)
+async def predict_image(request: Request, file: UploadFile = File(...)):
+    """
+    Analyze a single still image (JPEG, PNG, BMP, WEBP)
+
+    The image goes straight to face detection and the model, with no video
+    decode. Its features are repeated to fill the model's frame window.
+    """
+    if model_manager is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    file_ext = Path(file.filename).suffix.lower()
+    if file_ext not in IMAGE_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type '{file_ext}'. Allowed: {', '.join(sorted(IMAGE_EXTENSIONS))}"
+        )
+
+    ticket = client_ticket(request, "interactive")
+
+    start = time.perf_counter()
+    content = await file.read()
+    key = content_hash("frames", content)
+    try:
+        result = await cached_predict(ticket, key, model_manager.predict_images, [content])
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+    metrics.observe("request_seconds", time.perf_counter() - start, endpoint="/predict/image")
+    audit("/predict/image", key, file.filename, result, ticket, time.perf_counter() - start)
+    return PredictionResponse(video_name=file.filename, **result)
+
+
+def read_frame_set(uploads, limit: Optional[int] = None):
+    """
+    Flatten uploaded images and zip archives (members in name order) into a list of image bytes
+    Sizes are checked before anything is decompressed: each image against
+    MAX_FRAME_MB and the whole set against MAX_FRAME_SET_MB (zip members by
+    their declared size, which also caps what reading them can produce).
+    With limit, only that many evenly spaced frames are read, the ones the
+    model would sample from the full set
+    """
+    frames = []  # (name, size, read)
+    archives = []
+    max_frame, max_total = MAX_FRAME_MB * (1 << 20), MAX_FRAME_SET_MB * (1 << 20)
+
+    def add(name, size, read):
+        if len(frames) >= MAX_FRAMES_PER_REQUEST:
+            raise ValueError(f"Maximum {MAX_FRAMES_PER_REQUEST} frames allowed per request")
+        if size > max_frame:
+            raise ValueError(f"Frame '{name}' is over {MAX_FRAME_MB:g} MB")
+        frames.append((name, size, read))
+
+    try:
+        for name, content in uploads:
+            suffix = Path(name).suffix.lower()
+            if suffix == ".zip":
+                try:
+                    archive = zipfile.ZipFile(io.BytesIO(content))
+                except zipfile.BadZipFile:
+                    raise ValueError(f"Invalid zip archive: {name}")
+                archives.append(archive)
+                members = sorted(
+                    (m for m in archive.infolist()
+                     if Path(m.filename).suffix.lower() in IMAGE_EXTENSIONS and not m.filename.startswith("__MACOSX/")),
+                    key=lambda m: m.filename
+                )
+                for member in members:
+                    add(member.filename, member.file_size, lambda archive=archive, member=member: archive.read(member))
+            elif suffix in IMAGE_EXTENSIONS:
+                add(name, len(content), lambda content=content: content)
+            else:
+                raise ValueError(f"Unsupported file type '{suffix}' in frame set: {name}")
+
+        if not frames:
+            raise ValueError("No image frames found in upload")
+        if sum(size for _, size, _ in frames) > max_total:
+            raise ValueError(f"Frame set is over {MAX_FRAME_SET_MB:g} MB uncompressed")
+
+        if limit and len(frames) > limit:
+            frames = [frames[i * len(frames) // limit] for i in range(limit)]
+        try:
+            return [read() for _, _, read in frames]
+        except (zipfile.BadZipFile, zlib.error) as e:
+            raise ValueError(f"Corrupt zip archive: {e}")
+    finally:
+        for archive in archives:
+            archive.close()
+
+
+@app.post("/predict/frames", response_model=PredictionResponse)
+async def predict_frames(request: Request, files: list[UploadFile] = File(...)):
+    """
+    Analyze an already-extracted frame set
+
+    Args:
+        files: Image files in temporal order, or a single zip of images
+               (members are taken in file-name order)
+
+    More frames than the model window are sampled evenly; fewer are padded
+    by repeating the last one. frames_analyzed reports the distinct frames used.
+    """
+    if model_manager is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+
+    ticket = client_ticket(request, "interactive")
+
+    start = time.perf_counter()
+    uploads = [(file.filename, await file.read()) for file in files]
+    try:
+        # Only the frames the model samples are decompressed and decoded
+        window = model_manager.preprocessor.num_frames if isinstance(model_manager, ModelManager) else 12
+        images = read_frame_set(uploads, limit=window)
+        key = content_hash("frames", *images)
+        result = await cached_predict(ticket, key, model_manager.predict_images, images)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+    metrics.observe("request_seconds", time.perf_counter() - start, endpoint="/predict/frames")
+    name = files[0].filename if len(files) == 1 else f"{len(images)} frames"
+    audit("/predict/frames", key, name, result, ticket, time.perf_counter() - start)
+    return PredictionResponse(video_name=name, **result)
+
+
+@app.websocket("/predict/stream")
+async def predict_stream(websocket: WebSocket, mode: str = "frames", window: int = 12,
+                         sample_every: int = 1, carry_state: bool = True):
+    """
+    Score live content while it is still arriving
+
+    Query params:
+        mode: "frames" (each binary message is one JPEG/PNG frame) or
+              "video" (binary messages are consecutive chunks of a streamable
+              container such as WebM or fragmented MP4)
+        window: sampled frames per BiLSTM window (capped by STREAM_MAX_WINDOW)
+        sample_every: keep every Nth incoming frame
+        carry_state: carry the forward LSTM state across windows
+
+    Send the text message {"type": "end"} to finish. The server pushes a
+    {"type": "score", ...} message per window and a final {"type": "end", ...}.
+    Each window is scored in its own admission slot, paced by the client's
+    quota. If frames arrive faster than they can be scored the oldest pending
+    frames are dropped, keeping latency and memory bounded. Binary messages
+    over STREAM_MAX_MESSAGE_MB close the stream (1009).
+    """
+    import cv2
+    await websocket.accept()
+
+    if not isinstance(model_manager, ModelManager):
+        await websocket.close(code=1013, reason="Streaming needs the in-process model")
+        return
+    if mode not in ("frames", "video"):
+        await websocket.close(code=1003, reason="mode must be 'frames' or 'video'")
+        return
+
+    ticket = client_ticket(websocket, "interactive")
+    scorer = StreamScorer(
+        model_manager,
+        window=max(1, min(window, STREAM_MAX_WINDOW)),
+        sample_every=max(1, sample_every),
+        carry_state=carry_state
+    )
+    pending = asyncio.Queue(maxsize=STREAM_MAX_PENDING)
+    dropped = 0
+    errors = []
+    loop = asyncio.get_running_loop()
+
+    def offer(frame):
+        # Drop the oldest pending frame rather than fall behind the live edge
+        nonlocal dropped
+        if pending.full():
+            pending.get_nowait()
+            dropped += 1
+            metrics.inc("stream_frames_dropped_total")
+        pending.put_nowait(frame)
+
+    async def score_window(compute, frames):
+        # One quota charge and one (unbounded) admission slot per window
+        await admission.wait_quota(*ticket)
+        result = await admitted_call(ticket, compute, frames, bounded=False)
+        if result is not None:
+            await websocket.send_json(dict(result, frames_dropped=dropped))
+
+    async def score_frames():
+        try:
+            frames = []
+            while True:
+                frame = await pending.get()
+                if frame is None:
+                    break
+                if not scorer.sample():
+                    continue
+                frames.append(frame)
+                if len(scorer.features) + len(frames) >= scorer.window:
+                    await score_window(scorer.add_frames, frames)
+                    frames = []
+
+            if frames or scorer.features:
+                await score_window(scorer.flush, frames)
+            await websocket.send_json(dict(scorer.summary(), type="end", frames_dropped=dropped, errors=errors))
+            await websocket.close()
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+
+    worker = asyncio.create_task(score_frames())
+    reader = None
+    if mode == "video":
+        reader = ChunkReader(max_bytes=int(STREAM_MAX_BUFFER_MB * (1 << 20)))
+        threading.Thread(
+            target=decode_chunks,
+            args=(reader, lambda f: loop.call_soon_threadsafe(offer, f), lambda e: errors.append(f"Decode failed: {e}")),
+            daemon=True
+        ).start()
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("bytes") is not None:
+                data = message["bytes"]
+                if len(data) > STREAM_MAX_MESSAGE_MB * (1 << 20):
+                    await websocket.close(code=1009, reason=f"Message over {STREAM_MAX_MESSAGE_MB:g} MB")
+                    break
+                if reader is not None:
+                    await run_in_threadpool(reader.feed, data)
+                    continue
+
+                frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+                if frame is None:
+                    await websocket.send_json({"type": "error", "detail": "Could not decode frame"})
+                    continue
+                offer(frame)
+
+            elif message.get("text") is not None:
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    control = {}
+                if control.get("type") == "end":
+                    break
+    finally:
+        # Signal end of input; the decode thread sends its own sentinel
+        if reader is not None:
+            reader.close_input()
+        else:
+            offer(None)
+
+    await worker
+
+
+@app.get("/explain/{prediction_id}")
+async def explain_prediction(request: Request, prediction_id: str):
+    """
+    Grad-CAM heatmaps for a recent /predict call
+
+    Uses the last ResNet50 stage activations cached by /predict (for
+    EXPLAIN_CACHE_SECONDS), so no second trunk pass is needed. Returns one
+    low-resolution uint8 PNG per analyzed frame (base64), all on one scale.
+    """
+    if model_manager is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    if not explain_enabled():
+        raise HTTPException(status_code=501, detail="Explanations need the in-process model and EXPLAIN_CACHE_SECONDS > 0")
+
+    # No trunk pass, so no quota charge, but the backward pass still takes a slot
+    ticket = client_ticket(request, "interactive")
+    explanation = await admitted_call(ticket, model_manager.explain, prediction_id, HEATMAP_SIZE)
+    if explanation is None:
+        raise HTTPException(
+            status_code=404,
+            detail="No cached activations for this prediction (expired or short-circuited); POST the video to /explain"
+        )
+    return dict(explanation, prediction_id=prediction_id)
+
+
+@app.post("/explain")
+async def explain_video(request: Request, file: UploadFile = File(...)):
+    """Grad-CAM heatmaps for an uploaded video, reusing cached activations when it was just predicted"""
+    if model_manager is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    if not explain_enabled():
+        raise HTTPException(status_code=501, detail="Explanations need the in-process model and EXPLAIN_CACHE_SECONDS > 0")
+
+    ticket = client_ticket(request, "interactive")
+    content = await file.read()
+    key = content_hash("video", content)
+    explanation = await admitted_call(ticket, model_manager.explain, key, HEATMAP_SIZE)
+    if explanation is not None:
+        metrics.inc("explain_requests_total", activations="cached")
+        return dict(explanation, prediction_id=key)
+
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix.lower()) as tmp:
+            tmp.write(content)
+            tmp_path = tmp.name
+
+        check_quota(ticket)
+        # Explanations need this video's own activations, never a near-duplicate's verdict
+        result = await admitted_call(ticket, model_manager.predict, tmp_path, key, False)
+        result_cache.put(key, result)
+        explanation = await admitted_call(ticket, model_manager.explain, key, HEATMAP_SIZE)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Explanation failed: {str(e)}")
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+    if explanation is None:
+        raise HTTPException(status_code=422, detail="Nothing to explain: the video was short-circuited by the cascade")
+    metrics.inc("explain_requests_total", activations="recomputed")
+    return dict(explanation, prediction_id=key)
+
+
+@app.get("/audit/recent")
+async def audit_recent(request: Request, limit: int = 50, hours: Optional[float] = None,
+                       endpoint: Optional[str] = None, prediction: Optional[str] = None,
+                       content_hash: Optional[str] = None, client: Optional[str] = None):
+    """
+    Most recent audited verdicts, newest first
+
+    Args:
+        limit: Rows to return (at most 1000)
+        hours: Only verdicts from the last this many hours
+        endpoint, prediction, content_hash, client: Exact-match filters
+
+    Verdicts appear within AUDIT_FLUSH_SECONDS of their response.
+    Requires X-Admin-Token (rows name clients and uploaded files).
+    """
+    require_admin(request)
+    if audit_log is None:
+        raise HTTPException(status_code=404, detail="Audit log is disabled (set AUDIT_LOG_DIR)")
+    since = time.time() - hours * 3600 if hours else None
+    rows = await run_in_threadpool(
+        audit_log.recent, max(1, min(limit, 1000)), since,
+        endpoint=endpoint,
+        prediction=prediction.upper() if prediction else None,
+        content_hash=content_hash,
+        client=client
+    )
+    return {"count": len(rows), "predictions": rows}
+
+
+@app.get("/audit/stats")
+async def audit_stats(request: Request, hours: float = 24, group_by: Optional[str] = None):
+    """
+    Aggregate verdict statistics over the last hours
+
+    Args:
+        group_by: Optional column (endpoint, model, architecture, prediction,
+                  client, priority or reason)
+
+    Per group: count, fake / cached / short-circuit rates, mean confidence
+    and p50/p95/p99 request latency of uncached requests.
+    Requires X-Admin-Token.
+    """
+    require_admin(request)
+    if audit_log is None:
+        raise HTTPException(status_code=404, detail="Audit log is disabled (set AUDIT_LOG_DIR)")
+    try:
+        groups = await run_in_threadpool(audit_log.aggregate, time.time() - hours * 3600, group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"hours": hours, "group_by": group_by, "groups": groups}
+
+
+@app.post("/admin/profile")
+async def start_profile(request: Request, requests: int = 0, seconds: float = 0,
+                        torch_ops: bool = True, python_stacks: bool = True):
+    """
+    Profile the next N inference requests and/or all of them for a time window
+
+    Args:
+        requests: Number of requests to profile
+        seconds: Length of the window (the capture ends at whichever comes first)
+        torch_ops: Record a torch.profiler CPU op trace (torch_trace.json, torch_ops.txt)
+        python_stacks: Sample the request thread's Python stacks (python.collapsed)
+
+    One request is profiled at a time; each gets a folder under PROFILE_DIR.
+    Requires X-Admin-Token.
+    """
+    require_admin(request)
+    try:
+        return request_profiler.arm(requests, seconds, torch_ops, python_stacks)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/admin/profile")
+async def profile_status(request: Request):
+    """Whether a capture is armed, and the most recent capture folders"""
+    require_admin(request)
+    return request_profiler.status()
+
+
+@app.delete("/admin/profile")
+async def stop_profile(request: Request):
+    """Disarm the current capture"""
+    require_admin(request)
+    return request_profiler.disarm()
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Counters, gauges and timing summaries collected by this process, plus admission state"""
+    return dict(metrics.snapshot(), admission=admission.stats(),
+                audit=audit_log.stats() if audit_log is not None else None)
+
+
 @app.get("/info")
 async def get_info():
     """Get API and model information"""
+    from decoders import available_decoders
+    from face_detectors import available_detectors
+    from models import MODEL_ARCHITECTURES
+    calibration = getattr(model_manager, "calibration", None)
     return {
         "api_version": "2.0.0",
-        "model_architecture": "ResNet50 + BiLSTM",
+        "model_architecture": getattr(model_manager, "architecture", MODEL_ARCH),
+        "available_architectures": MODEL_ARCHITECTURES,
         "input_frames": 12,
         "image_size": 224,
-        "device": DEVICE,
-        "threshold": THRESHOLD,
+        "device": DEVICE or "pending",
+        "threshold": getattr(model_manager, "threshold", THRESHOLD),
+        "calibration": calibration.to_dict() if calibration is not None else None,
         "model_path": MODEL_PATH,
+        "inference_socket": INFERENCE_SOCKET,
+        "cascade_enabled": CASCADE_ENABLED,
+        "video_decoder": VIDEO_DECODER,
+        "available_decoders": available_decoders(),
+        "face_detector": FACE_DETECTOR,
+        "available_face_detectors": available_detectors(),
+        "tta": {"offsets": TTA_OFFSETS, "margins": TTA_MARGINS, "flip": TTA_FLIP, "cost": TTA_COST},
+        "multi_face": {"max_faces": MULTI_FACE_MAX, "min_prob": MULTI_FACE_MIN_PROB,
+                       "min_size": MULTI_FACE_MIN_SIZE, "iou": MULTI_FACE_IOU,
+                       "min_coverage": MULTI_FACE_MIN_COVERAGE, "threshold": MULTI_FACE_THRESHOLD},
+        "startup": {"mode": STARTUP_MODE, "stage": startup["stage"], "warmup_batch_sizes": WARMUP_BATCH_SIZES},
         "features": [
-            "Face detection with MTCNN",
+            f"Face detection with {FACE_DETECTOR}",
             "Temporal modeling with BiLSTM",
             "Sigmoid activation for probability",
             "Configurable threshold"
@@ -458,12 +3140,20 @@ async def get_info():
 # ============================================================================
 
 if __name__ == "__main__":
+    import argparse
     import uvicorn
 
+    parser = argparse.ArgumentParser(description="Deepfake Detection API")
+    parser.add_argument("--profile-requests", type=int, default=0, help="Profile the first N inference requests")
+    parser.add_argument("--profile-seconds", type=float, default=0, help="Profile every request for this long")
+    args = parser.parse_args()
+
     port = int(os.getenv("PORT", "8000"))
     host = os.getenv("HOST", "0.0.0.0")
 
     print(f"Starting Deepfake Detection API on {host}:{port}")
+    if args.profile_requests or args.profile_seconds:
+        request_profiler.arm(args.profile_requests, args.profile_seconds)
 
     uvicorn.run(
         app,
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Decoder Benchmark Script
+Times every installed video decoder on a synthetic corpus and writes the
+per-container preference order used by automatic decoder selection
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from decoders import DECODERS, available_decoders
+
+
+# Synthetic corpus: (file name, fourcc) written with cv2.VideoWriter
+CORPUS = [
+    ("mpeg4.mp4", "mp4v"),
+    ("mpeg4.mov", "mp4v"),
+    ("mjpeg.avi", "MJPG"),
+    ("xvid.avi", "XVID"),
+    ("mpeg4.mkv", "mp4v"),
+    ("vp8.webm", "VP80"),
+]
+
+
+def make_video(path: Path, fourcc: str, num_frames: int, width: int, height: int, fps: int = 30):
+    """Write a moving-pattern test video; returns False if the codec is unavailable"""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+    if not writer.isOpened():
+        return False
+
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 40, (height, width, 3), dtype=np.uint8)
+    for i in range(num_frames):
+        frame = noise.copy()
+        cv2.circle(frame, ((i * 7) % width, height // 2), height // 6, (200, 170, 150), -1)
+        cv2.putText(frame, str(i), (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        writer.write(frame)
+    writer.release()
+    return path.exists() and path.stat().st_size > 0
+
+
+def time_decoder(name: str, path: Path, sample_frames: int, repeats: int, threads: int):
+    """Median seconds to open a file and read evenly-spaced frames, or None on failure"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        try:
+            with DECODERS[name](str(path), threads=threads) as decoder:
+                step = max((decoder.frame_count or 1) // sample_frames, 1)
+                read = sum(1 for _ in decoder.read([i * step for i in range(sample_frames)]))
+        except ValueError:
+            return None, 0
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), read
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark video decoders on a synthetic corpus")
+    parser.add_argument("--frames", type=int, default=300, help="Frames per synthetic video")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--sample-frames", type=int, default=12, help="Frames read per video, as in extract_frames")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--write-preferences", metavar="PATH",
+                        help="Write fastest-first decoder order per container (use with DECODER_PREFERENCES)")
+    parser.add_argument("--json", metavar="PATH", help="Write raw results as JSON")
+    args = parser.parse_args()
+
+    decoders = available_decoders()
+    print("🚀 Decoder Benchmark")
+    print("=" * 50)
+    print(f"   Available decoders: {', '.join(decoders)}")
+    print(f"   Corpus: {args.frames} frames at {args.width}x{args.height}, sampling {args.sample_frames}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for file_name, fourcc in CORPUS:
+            path = Path(tmp) / file_name
+            if not make_video(path, fourcc, args.frames, args.width, args.height):
+                print(f"\n⚠️ Skipping {file_name}: codec {fourcc} not available for writing")
+                continue
+
+            print(f"\n📼 {file_name} ({fourcc})")
+            for name in decoders:
+                seconds, read = time_decoder(name, path, args.sample_frames, args.repeats, args.threads)
+                if seconds is None:
+                    print(f"   {name:<8} failed to open")
+                    continue
+                print(f"   {name:<8} {seconds * 1000:8.1f} ms   frames read: {read}/{args.sample_frames}")
+                results.append({
+                    "file": file_name,
+                    "container": path.suffix,
+                    "fourcc": fourcc,
+                    "decoder": name,
+                    "seconds": seconds,
+                    "frames_read": read,
+                })
+
+    # Fastest-first per container by total time over its files; a decoder that
+    # dropped frames on any file of the container is left out
+    preferences = {}
+    for container in sorted({r["container"] for r in results}):
+        rows = [r for r in results if r["container"] == container]
+        incomplete = {r["decoder"] for r in rows if r["frames_read"] < args.sample_frames}
+        totals = {}
+        for r in rows:
+            if r["decoder"] not in incomplete:
+                totals[r["decoder"]] = totals.get(r["decoder"], 0.0) + r["seconds"]
+        preferences[container] = sorted(totals, key=totals.get)
+
+    print("\n💡 Fastest decoders per container:")
+    for container, order in preferences.items():
+        print(f"   {container:<6} {' > '.join(order) or '(none)'}")
+
+    if args.write_preferences:
+        with open(args.write_preferences, "w") as f:
+            json.dump(preferences, f, indent=2)
+        print(f"\n✅ Preferences written to {args.write_preferences}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "results": results, "preferences": preferences}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Face Detector Benchmark Script
+Compares detection rate, false positives and CPU frames/sec of every
+registered face detector at the proxy resolution used by the backend
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from face_detectors import FACE_DETECTORS, create_detector
+
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def load_images(directory: Path):
+    return [cv2.imread(str(p)) for p in sorted(directory.iterdir()) if p.suffix.lower() in IMAGE_SUFFIXES]
+
+
+def synthetic_corpus(portraits, count: int, width: int, height: int, seed: int = 0):
+    """Paste portraits at random scales/positions onto noisy backgrounds; returns (face frames, empty frames)"""
+    rng = np.random.default_rng(seed)
+    faces, empty = [], []
+
+    for i in range(count):
+        background = rng.integers(0, 255, (8, 8, 3), dtype=np.uint8)
+        background = cv2.resize(background, (width, height), interpolation=cv2.INTER_CUBIC)
+        empty.append(background.copy())
+
+        portrait = portraits[i % len(portraits)]
+        scale = rng.uniform(0.35, 0.9) * height / portrait.shape[0]
+        portrait = cv2.resize(portrait, (int(portrait.shape[1] * scale), int(portrait.shape[0] * scale)))
+        ph, pw = portrait.shape[:2]
+        if pw >= width:
+            portrait = portrait[:, :width - 1]
+            pw = portrait.shape[1]
+        x = int(rng.integers(0, width - pw))
+        y = int(rng.integers(0, max(height - ph, 1)))
+        background[y:y + ph, x:x + pw] = portrait[:height - y]
+        faces.append(background)
+
+    return faces, empty
+
+
+def downscale(frame, detect_size: int):
+    h, w = frame.shape[:2]
+    scale = detect_size / max(h, w) if detect_size else 1.0
+    if scale >= 1:
+        return frame
+    return cv2.resize(frame, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+
+
+def run_detector(detector, frames, batch_size: int):
+    """Returns (number of frames with at least one face, seconds)"""
+    found = 0
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        for boxes, _ in detector.detect(frames[i:i + batch_size]):
+            found += bool(len(boxes))
+    return found, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark face detectors on CPU")
+    parser.add_argument("--detectors", nargs="+", default=list(FACE_DETECTORS))
+    parser.add_argument("--detector-options", default="{}",
+                        help='Per-detector options as JSON, e.g. \'{"haar": {"min_neighbors": 3}}\'')
+    parser.add_argument("--faces", type=Path, help="Directory of frames that contain a face")
+    parser.add_argument("--non-faces", type=Path, help="Directory of frames without faces")
+    parser.add_argument("--portraits", type=Path, default=Path(__file__).parent / "public",
+                        help="Portraits used to build the synthetic corpus when --faces is not given")
+    parser.add_argument("--count", type=int, default=48, help="Synthetic frames of each kind")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--detect-size", type=int, default=640, help="Proxy resolution, as DETECT_SIZE")
+    parser.add_argument("--batch-size", type=int, default=4, help="Frames per detect() call")
+    parser.add_argument("--json", metavar="PATH", help="Write results as JSON")
+    args = parser.parse_args()
+
+    if args.faces:
+        face_frames = load_images(args.faces)
+        empty_frames = load_images(args.non_faces) if args.non_faces else []
+    else:
+        face_frames, empty_frames = synthetic_corpus(load_images(args.portraits), args.count, args.width, args.height)
+
+    face_frames = [downscale(f, args.detect_size) for f in face_frames]
+    empty_frames = [downscale(f, args.detect_size) for f in empty_frames]
+    all_options = json.loads(args.detector_options)
+
+    print("🚀 Face Detector Benchmark")
+    print("=" * 50)
+    print(f"   Frames: {len(face_frames)} with faces, {len(empty_frames)} without, proxy {args.detect_size}px")
+    print(f"\n   {'detector':<8} {'detect rate':>12} {'false pos':>10} {'frames/sec':>11}")
+
+    results = []
+    for name in args.detectors:
+        try:
+            detector = create_detector(name, **all_options.get(name, {}))
+        except Exception as e:
+            print(f"   {name:<8} unavailable: {e}")
+            continue
+
+        # Warm-up call so one-off initialization is not timed
+        detector.detect(face_frames[:1])
+
+        hits, face_seconds = run_detector(detector, face_frames, args.batch_size)
+        false_hits, empty_seconds = run_detector(detector, empty_frames, args.batch_size)
+        total = len(face_frames) + len(empty_frames)
+        fps = total / (face_seconds + empty_seconds) if total else 0.0
+
+        result = {
+            "detector": name,
+            "detection_rate": hits / len(face_frames) if face_frames else None,
+            "false_positive_rate": false_hits / len(empty_frames) if empty_frames else None,
+            "frames_per_second": fps,
+        }
+        results.append(result)
+
+        detect_rate = f"{result['detection_rate']:.1%}" if face_frames else "-"
+        false_rate = f"{result['false_positive_rate']:.1%}" if empty_frames else "-"
+        print(f"   {name:<8} {detect_rate:>12} {false_rate:>10} {fps:>11.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": {k: str(v) for k, v in vars(args).items()}, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
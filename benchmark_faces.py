@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Multi-Face Scoring Benchmark Script
+Times a plain prediction, multi-face scoring done naively (one decode,
+detection and forward pass per face track) and the batched
+ModelManager.predict_faces on the same videos, and checks that both paths
+score the tracks alike
+"""
+
+import argparse
+import json
+import math
+import statistics
+import time
+from pathlib import Path
+
+import torch
+
+import backend
+from backend import ModelManager, link_tracks
+
+
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm"}
+
+
+def timed(repeats: int, fn, *args):
+    """(median seconds, last return value) over repeats calls"""
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        value = fn(*args)
+        seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds), value
+
+
+@torch.no_grad()
+def naive_faces(manager, path: str, tracks: int):
+    """Every track as its own decode + detection + full forward pass; returns track logits"""
+    preprocessor = manager.preprocessor
+    logits = []
+    for t in range(tracks):
+        info = {}
+        crops, faces, primary = preprocessor.extract_tracks(path, backend.MULTI_FACE_MAX, backend.MULTI_FACE_MIN_PROB,
+                                                            backend.MULTI_FACE_MIN_SIZE, info)
+        preprocessor.clips.release(primary)
+        min_frames = max(math.ceil(backend.MULTI_FACE_MIN_COVERAGE * info["frames_real"]), 1)
+        try:
+            linked = [track for track in link_tracks(faces, backend.MULTI_FACE_IOU) if len(track) >= min_frames]
+            linked.sort(key=len, reverse=True)
+            rows = linked[t] + linked[t][-1:] * (preprocessor.num_frames - len(linked[t]))
+            clip = crops[rows]
+            logits.append(float(manager.model(clip.unsqueeze(0).to(manager.device)).item()))
+        finally:
+            preprocessor.clips.release(crops)
+    return logits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched multi-face scoring")
+    parser.add_argument("--model", default="model_epoch_30.pth")
+    parser.add_argument("--videos", type=Path, required=True, help="A video file or a directory of videos")
+    parser.add_argument("--limit", type=int, default=8, help="Videos to time")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--device", default="cuda")
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    videos = [args.videos] if args.videos.is_file() else \
+        sorted(p for p in args.videos.iterdir() if p.suffix.lower() in VIDEO_EXTENSIONS)
+    videos = videos[:args.limit]
+    if not videos:
+        raise SystemExit("❌ No videos found")
+
+    manager = ModelManager(args.model, device=args.device)
+    # Every pass must run the model
+    manager.cascade = None
+    manager.fingerprints = None
+
+    print("🚀 Multi-Face Scoring Benchmark")
+    print("=" * 50)
+    print(f"   Device: {manager.device}")
+    print(f"   Faces: up to {backend.MULTI_FACE_MAX}, min prob {backend.MULTI_FACE_MIN_PROB}, "
+          f"min size {backend.MULTI_FACE_MIN_SIZE}px, IoU {backend.MULTI_FACE_IOU}, "
+          f"min coverage {backend.MULTI_FACE_MIN_COVERAGE}")
+    print(f"\n   {'video':<24} {'tracks':>6} {'plain':>9} {'naive':>9} {'batched':>9} {'overhead':>9} {'Δlogit':>8}")
+
+    results = []
+    for path in videos:
+        path = str(path)
+        # Warm-up (detector / cuDNN initialisation)
+        manager.predict(path)
+
+        plain, _ = timed(args.repeats, manager.predict, path)
+        batched, result = timed(args.repeats, manager.predict_faces, path)
+        faces = result["faces"]
+        tracks = faces["tracks"]
+        if tracks:
+            naive, naive_logits = timed(args.repeats, naive_faces, manager, path, tracks)
+            # Tracks of equal length may be ordered differently, so compare the sorted logits
+            batched_logits = sorted(score["raw_score"] for score in faces["scores"])
+            difference = max(abs(a - b) for a, b in zip(sorted(naive_logits), batched_logits))
+        else:
+            naive, difference = None, None
+
+        name = Path(path).name
+        print(f"   {name[:24]:<24} {tracks:>6} {plain * 1000:>7.0f}ms "
+              f"{naive * 1000 if naive else float('nan'):>7.0f}ms {batched * 1000:>7.0f}ms "
+              f"{batched / plain:>8.2f}x {difference if difference is not None else float('nan'):>8.1e}")
+        results.append({
+            "video": name,
+            "tracks": tracks,
+            "plain_seconds": plain,
+            "naive_seconds": naive,
+            "batched_seconds": batched,
+            "confidence": result["confidence"],
+            "fake_tracks": faces["fake_tracks"],
+            "max_logit_difference": difference,
+        })
+
+    print("\n📊 Batched cost relative to a plain prediction, by number of tracks:")
+    for count in sorted({r["tracks"] for r in results}):
+        group = [r for r in results if r["tracks"] == count]
+        overhead = statistics.median(r["batched_seconds"] / r["plain_seconds"] for r in group)
+        naive = [r["naive_seconds"] / r["plain_seconds"] for r in group if r["naive_seconds"]]
+        print(f"   {count} track(s): batched {overhead:.2f}x"
+              + (f", naive {statistics.median(naive):.2f}x" if naive else ""))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": {k: str(v) for k, v in vars(args).items()}, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
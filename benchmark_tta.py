@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test-Time Augmentation Benchmark Script
+Times a plain prediction, TTA done naively (one decode, detection and
+forward pass per variant) and the batched ModelManager.predict_tta on the
+same videos, and checks that both TTA paths score the variants alike
+"""
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+import torch
+
+from backend import ModelManager
+
+
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm"}
+
+
+def timed(repeats: int, fn, *args):
+    """(median seconds, last return value) over repeats calls"""
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        value = fn(*args)
+        seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds), value
+
+
+@torch.no_grad()
+def naive_tta(manager, path: str, offsets, margins, flip: bool):
+    """Every variant as its own decode + detection + full forward pass; returns variant logits"""
+    preprocessor = manager.preprocessor
+    logits = []
+    for offset in offsets:
+        for margin in margins:
+            crops, clips = preprocessor.extract_variants(path, [offset], [margin])
+            try:
+                clip = crops[clips[0][1], 0]
+                for flipped in ([False, True] if flip else [False]):
+                    x = clip.flip(-1) if flipped else clip
+                    logits.append(float(manager.model(x.unsqueeze(0).to(manager.device)).item()))
+            finally:
+                preprocessor.clips.release(crops)
+    return logits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched test-time augmentation")
+    parser.add_argument("--model", default="model_epoch_30.pth")
+    parser.add_argument("--videos", type=Path, required=True, help="A video file or a directory of videos")
+    parser.add_argument("--limit", type=int, default=8, help="Videos to time")
+    parser.add_argument("--offsets", type=float, nargs="+", default=[0.0, 0.5])
+    parser.add_argument("--margins", type=int, nargs="+", default=[20, 40])
+    parser.add_argument("--no-flip", action="store_true")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--device", default="cuda")
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    videos = [args.videos] if args.videos.is_file() else \
+        sorted(p for p in args.videos.iterdir() if p.suffix.lower() in VIDEO_EXTENSIONS)
+    videos = videos[:args.limit]
+    if not videos:
+        raise SystemExit("❌ No videos found")
+
+    flip = not args.no_flip
+    manager = ModelManager(args.model, device=args.device)
+    # Every pass must run the model
+    manager.cascade = None
+    manager.fingerprints = None
+    variants = len(args.offsets) * len(args.margins) * (2 if flip else 1)
+
+    print("🚀 Test-Time Augmentation Benchmark")
+    print("=" * 50)
+    print(f"   Device: {manager.device}")
+    print(f"   Variants: {variants} (offsets {args.offsets}, margins {args.margins}, flip {flip})")
+    print(f"\n   {'video':<24} {'plain':>9} {'naive':>9} {'batched':>9} {'overhead':>9} {'spread':>7} {'Δlogit':>8}")
+
+    results = []
+    for path in videos:
+        path = str(path)
+        # Warm-up (detector / cuDNN initialisation)
+        manager.predict(path)
+
+        plain, _ = timed(args.repeats, manager.predict, path)
+        naive, naive_logits = timed(args.repeats, naive_tta, manager, path, args.offsets, args.margins, flip)
+        batched, result = timed(args.repeats, manager.predict_tta, path, None, args.offsets, args.margins, flip)
+
+        tta = result["tta"]
+        batched_logits = [v["raw_score"] for v in tta["scores"]]
+        # Short videos collapse duplicate offsets, so only compare full variant sets
+        difference = max(abs(a - b) for a, b in zip(naive_logits, batched_logits)) \
+            if len(naive_logits) == len(batched_logits) else None
+
+        name = Path(path).name
+        print(f"   {name[:24]:<24} {plain * 1000:>7.0f}ms {naive * 1000:>7.0f}ms {batched * 1000:>7.0f}ms "
+              f"{batched / plain:>8.2f}x {tta['confidence_std']:>7.3f} "
+              f"{difference if difference is not None else float('nan'):>8.1e}")
+        results.append({
+            "video": name,
+            "plain_seconds": plain,
+            "naive_seconds": naive,
+            "batched_seconds": batched,
+            "variants": tta["variants"],
+            "confidence": result["confidence"],
+            "confidence_std": tta["confidence_std"],
+            "agreement": tta["agreement"],
+            "max_logit_difference": difference,
+        })
+
+    plain = statistics.median(r["plain_seconds"] for r in results)
+    naive = statistics.median(r["naive_seconds"] for r in results)
+    batched = statistics.median(r["batched_seconds"] for r in results)
+    print(f"\n📊 Median latency: plain {plain * 1000:.0f} ms, naive TTA {naive * 1000:.0f} ms, "
+          f"batched TTA {batched * 1000:.0f} ms")
+    print(f"   Batched TTA costs {batched / plain:.2f}x a plain prediction "
+          f"({naive / batched:.2f}x faster than naive)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": {k: str(v) for k, v in vars(args).items()}, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Pooled buffers and a process-wide memory budget for preprocessing
+Clip tensors and decode scratch arrays are recycled across requests instead
+of being reallocated per frame, and every decode reserves its working set
+from a shared budget before it starts, so peak memory stays predictable
+under concurrency
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+from metrics import metrics
+
+
+# ============================================================================
+# BUFFER POOL
+# ============================================================================
+
+class BufferPool:
+    """
+    Free lists of same-shape buffers, keyed by (shape, dtype)
+    kind is "torch" (CPU tensors) or "numpy"; torch is only imported once a
+    torch pool hands out a buffer. Idle buffers are capped at max_bytes; the
+    least recently used shapes are dropped first. Buffers are handed out
+    uninitialised
+    """
+
+    def __init__(self, name: str, kind: str = "torch", max_bytes: int = 256 << 20):
+        self.name = name
+        self.kind = kind
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._free = OrderedDict()
+        self._lent = {}
+        self.idle_bytes = 0
+        self.in_use_bytes = 0
+        self.peak_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _allocate(self, shape, dtype):
+        if self.kind == "torch":
+            import torch
+            return torch.empty(shape, dtype=dtype)
+        return np.empty(shape, dtype=dtype)
+
+    @staticmethod
+    def _nbytes(buffer) -> int:
+        return buffer.nbytes
+
+    def _poolable(self, buffer) -> bool:
+        """Only whole, contiguous buffers we can safely overwrite are recycled"""
+        if self.kind == "torch":
+            import torch
+            return (isinstance(buffer, torch.Tensor) and buffer.device.type == "cpu" and buffer.is_contiguous()
+                    and buffer.storage_offset() == 0 and not buffer.requires_grad)
+        return (isinstance(buffer, np.ndarray) and buffer.base is None
+                and buffer.flags.c_contiguous and buffer.flags.writeable)
+
+    def _update_gauges(self):
+        metrics.set_gauge("buffer_pool_idle_bytes", self.idle_bytes, pool=self.name)
+        metrics.set_gauge("buffer_pool_in_use_bytes", self.in_use_bytes, pool=self.name)
+        metrics.set_gauge("buffer_pool_peak_bytes", self.peak_bytes, pool=self.name)
+        if self.hits + self.misses:
+            metrics.set_gauge("buffer_pool_hit_rate", self.hits / (self.hits + self.misses), pool=self.name)
+
+    def acquire(self, shape, dtype=None):
+        """A buffer of exactly shape / dtype (default float32), reused when one is idle"""
+        if dtype is None:
+            if self.kind == "torch":
+                import torch
+                dtype = torch.float32
+            else:
+                dtype = np.float32
+        # np.uint8 and np.dtype("uint8") compare equal but hash differently
+        key = (tuple(shape), dtype if self.kind == "torch" else np.dtype(dtype))
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                buffer = free.pop()
+                if not free:
+                    del self._free[key]
+                self.idle_bytes -= self._nbytes(buffer)
+                self.hits += 1
+                result = "hit"
+            else:
+                buffer = None
+                self.misses += 1
+                result = "miss"
+
+        if buffer is None:
+            buffer = self._allocate(key[0], dtype)
+
+        nbytes = self._nbytes(buffer)
+        with self._lock:
+            self._lent[id(buffer)] = nbytes
+            self.in_use_bytes += nbytes
+            self.peak_bytes = max(self.peak_bytes, self.in_use_bytes + self.idle_bytes)
+            self._update_gauges()
+        metrics.inc("buffer_pool_requests_total", pool=self.name, result=result)
+        return buffer
+
+    def release(self, buffer):
+        """
+        Return a buffer for reuse; the caller must not touch it afterwards
+        Buffers that did not come from acquire() (e.g. frames a decoder
+        allocated) are adopted into the pool when they are poolable
+        """
+        if buffer is None:
+            return
+        nbytes = self._nbytes(buffer)
+        with self._lock:
+            if self._lent.pop(id(buffer), None) is not None:
+                self.in_use_bytes -= nbytes
+
+            if self._poolable(buffer) and nbytes <= self.max_bytes:
+                key = (tuple(buffer.shape), buffer.dtype)
+                self._free.setdefault(key, deque()).append(buffer)
+                self._free.move_to_end(key)
+                self.idle_bytes += nbytes
+
+                # Drop idle buffers of the least recently used shapes
+                while self.idle_bytes > self.max_bytes:
+                    oldest_key, oldest = next(iter(self._free.items()))
+                    self.idle_bytes -= self._nbytes(oldest.popleft())
+                    if not oldest:
+                        del self._free[oldest_key]
+            self._update_gauges()
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else None,
+                "idle_bytes": self.idle_bytes,
+                "in_use_bytes": self.in_use_bytes,
+                "peak_bytes": self.peak_bytes,
+            }
+
+
+# ============================================================================
+# MEMORY BUDGET
+# ============================================================================
+
+class MemoryBudget:
+    """
+    Bytes of preprocessing working set allowed at once, shared by all threads
+    reserve() blocks until the request fits; a single request larger than
+    the whole budget waits until it can run alone. limit 0 means unlimited
+    """
+
+    def __init__(self, limit_bytes: int = 0):
+        self.limit = limit_bytes
+        self.used = 0
+        self.peak = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def reserve(self, nbytes: int):
+        nbytes = min(int(nbytes), self.limit) if self.limit else int(nbytes)
+        start = time.perf_counter()
+        with self._cond:
+            while self.limit and self.used and self.used + nbytes > self.limit:
+                self._cond.wait()
+            self.used += nbytes
+            self.peak = max(self.peak, self.used)
+            metrics.set_gauge("memory_budget_used_bytes", self.used)
+            metrics.set_gauge("memory_budget_peak_bytes", self.peak)
+        metrics.observe("memory_budget_wait_seconds", time.perf_counter() - start)
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.used -= nbytes
+                metrics.set_gauge("memory_budget_used_bytes", self.used)
+                self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {"limit_bytes": self.limit, "used_bytes": self.used, "peak_bytes": self.peak}
@@ -0,0 +1,250 @@
+"""
+Score calibration and evaluation metrics
+Vectorised ROC / PR curves, calibration error and operating-point thresholds
+over cached logits, plus temperature / Platt scaling fitted on them. A fitted
+Calibration is saved next to the checkpoint and applied by ModelManager
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+
+def sigmoid(x):
+    x = np.asarray(x, dtype=np.float64)
+    return np.exp(-np.logaddexp(0.0, -x))
+
+
+# ============================================================================
+# CURVES AND METRICS
+# ============================================================================
+
+def _cumulative_counts(labels, scores):
+    """True / false positives when thresholding at each distinct score, highest first"""
+    labels = np.asarray(labels, dtype=bool)
+    scores = np.asarray(scores, dtype=np.float64)
+    order = np.argsort(-scores, kind="mergesort")
+    scores, labels = scores[order], labels[order]
+
+    # Last position of every run of equal scores
+    distinct = np.r_[np.flatnonzero(np.diff(scores)), len(scores) - 1]
+    tp = np.cumsum(labels)[distinct]
+    fp = (distinct + 1) - tp
+    return tp, fp, scores[distinct]
+
+
+def roc_curve(labels, scores):
+    """(fpr, tpr, thresholds, auc); predicting positive when score >= threshold"""
+    tp, fp, thresholds = _cumulative_counts(labels, scores)
+    positives, negatives = tp[-1], fp[-1]
+    tpr = np.r_[0.0, tp / max(positives, 1)]
+    fpr = np.r_[0.0, fp / max(negatives, 1)]
+    thresholds = np.r_[np.inf, thresholds]
+    auc = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+    return fpr, tpr, thresholds, auc
+
+
+def pr_curve(labels, scores):
+    """(precision, recall, thresholds, average_precision)"""
+    tp, fp, thresholds = _cumulative_counts(labels, scores)
+    precision = tp / (tp + fp)
+    recall = tp / max(tp[-1], 1)
+    average_precision = float(np.sum(np.diff(np.r_[0.0, recall]) * precision))
+    return precision, recall, thresholds, average_precision
+
+
+def expected_calibration_error(labels, probs, bins=15):
+    """Sample-weighted mean |accuracy - confidence| over equal-width probability bins"""
+    labels = np.asarray(labels, dtype=np.float64)
+    probs = np.asarray(probs, dtype=np.float64)
+    which = np.minimum((probs * bins).astype(int), bins - 1)
+    prob_sums = np.bincount(which, weights=probs, minlength=bins)
+    label_sums = np.bincount(which, weights=labels, minlength=bins)
+    return float(np.abs(label_sums - prob_sums).sum() / max(len(probs), 1))
+
+
+def log_loss(labels, probs, eps=1e-7):
+    labels = np.asarray(labels, dtype=np.float64)
+    probs = np.clip(np.asarray(probs, dtype=np.float64), eps, 1 - eps)
+    return float(-np.mean(labels * np.log(probs) + (1 - labels) * np.log(1 - probs)))
+
+
+def confusion_at(labels, probs, threshold):
+    """Counts and rates for predicting FAKE when prob > threshold (ModelManager's rule)"""
+    labels = np.asarray(labels, dtype=bool)
+    predicted = np.asarray(probs) > threshold
+    tp = int(np.sum(predicted & labels))
+    fp = int(np.sum(predicted & ~labels))
+    fn = int(np.sum(~predicted & labels))
+    tn = int(np.sum(~predicted & ~labels))
+    return {
+        "threshold": float(threshold),
+        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "accuracy": (tp + tn) / max(len(labels), 1),
+        "tpr": tp / max(tp + fn, 1),
+        "fpr": fp / max(fp + tn, 1),
+        "precision": tp / max(tp + fp, 1),
+        "f1": 2 * tp / max(2 * tp + fp + fn, 1),
+    }
+
+
+def operating_thresholds(labels, probs, points=("youden", "f1", "accuracy", "fpr@0.01", "fpr@0.05", "tpr@0.95")):
+    """
+    Probability thresholds for named operating points, all from one sorted pass
+    youden: max TPR - FPR; f1 / accuracy: their maximum; fpr@x: highest TPR
+    with FPR <= x; tpr@x: lowest FPR with TPR >= x
+    """
+    labels = np.asarray(labels, dtype=bool)
+    tp, fp, scores = _cumulative_counts(labels, probs)
+    positives, negatives = tp[-1], fp[-1]
+    tpr = tp / max(positives, 1)
+    fpr = fp / max(negatives, 1)
+    fn = positives - tp
+    tn = negatives - fp
+
+    # Predicting positive for scores >= s_i equals prob > any cutoff between s_i
+    # and the next lower distinct score; take the midpoint
+    cutoffs = (scores + np.r_[scores[1:], 0.0]) / 2
+
+    thresholds = {}
+    for point in points:
+        if point == "youden":
+            i = int(np.argmax(tpr - fpr))
+        elif point == "f1":
+            i = int(np.argmax(2 * tp / np.maximum(2 * tp + fp + fn, 1)))
+        elif point == "accuracy":
+            i = int(np.argmax(tp + tn))
+        elif point.startswith("fpr@"):
+            allowed = np.flatnonzero(fpr <= float(point[4:]))
+            i = int(allowed[np.argmax(tpr[allowed])]) if len(allowed) else 0
+        elif point.startswith("tpr@"):
+            reached = np.flatnonzero(tpr >= float(point[4:]))
+            i = int(reached[0]) if len(reached) else len(tpr) - 1
+        else:
+            raise ValueError(f"Unknown operating point: {point}")
+        thresholds[point] = float(cutoffs[i])
+    return thresholds
+
+
+def evaluate(labels, probs, threshold=0.5, bins=15):
+    """Threshold-free and thresholded metrics of probabilities against 0/1 labels"""
+    _, _, _, auc = roc_curve(labels, probs)
+    _, _, _, average_precision = pr_curve(labels, probs)
+    return {
+        "count": len(labels),
+        "positives": int(np.sum(labels)),
+        "roc_auc": auc,
+        "average_precision": average_precision,
+        "ece": expected_calibration_error(labels, probs, bins),
+        "log_loss": log_loss(labels, probs),
+        "brier": float(np.mean((np.asarray(probs) - np.asarray(labels)) ** 2)),
+        **confusion_at(labels, probs, threshold),
+    }
+
+
+# ============================================================================
+# CALIBRATION
+# ============================================================================
+
+def _fit_logistic(logits, labels, fit_bias=True, iterations=100, l2=1e-6):
+    """Newton's method for p = sigmoid(a * logit + b); returns (a, b)"""
+    x = np.asarray(logits, dtype=np.float64)
+    y = np.asarray(labels, dtype=np.float64)
+    # Platt's smoothed targets keep the fit finite on separable data
+    positives, negatives = y.sum(), len(y) - y.sum()
+    y = np.where(y > 0, (positives + 1) / (positives + 2), 1 / (negatives + 2))
+
+    features = np.stack([x, np.ones_like(x)], axis=1) if fit_bias else x[:, None]
+
+    def loss(params):
+        z = features @ params
+        # log(1 + e^z) - y * z, computed without overflow
+        return np.mean(np.logaddexp(0.0, z) - y * z) + 0.5 * l2 * params @ params
+
+    params = np.zeros(features.shape[1])
+    params[0] = 1.0
+    current = loss(params)
+    for _ in range(iterations):
+        p = sigmoid(features @ params)
+        grad = features.T @ (p - y) / len(y) + l2 * params
+        hessian = (features * (p * (1 - p))[:, None]).T @ features / len(y) + l2 * np.eye(len(params))
+        step = np.linalg.solve(hessian, grad)
+
+        # Backtrack until the loss decreases (plain Newton overshoots on wide logits)
+        scale = 1.0
+        while scale > 1e-6 and loss(params - scale * step) > current:
+            scale /= 2
+        params = params - scale * step
+        previous, current = current, loss(params)
+        if previous - current < 1e-12:
+            break
+
+    a = float(params[0])
+    b = float(params[1]) if fit_bias else 0.0
+    return a, b
+
+
+class Calibration:
+    """
+    Maps raw model logits to calibrated logits: a * logit + b
+    method "temperature" fits a = 1 / T with b = 0 (ranking and the 0.5
+    decision point are unchanged), "platt" fits both. threshold is the
+    recommended probability threshold on the calibrated scale
+    """
+
+    def __init__(self, method="identity", a=1.0, b=0.0, threshold=None, operating_point=None, metrics=None):
+        self.method = method
+        self.a = a
+        self.b = b
+        self.threshold = threshold
+        self.operating_point = operating_point
+        self.metrics = metrics or {}
+
+    @classmethod
+    def fit(cls, logits, labels, method="temperature"):
+        if method == "temperature":
+            a, b = _fit_logistic(logits, labels, fit_bias=False)
+        elif method == "platt":
+            a, b = _fit_logistic(logits, labels, fit_bias=True)
+        elif method == "identity":
+            a, b = 1.0, 0.0
+        else:
+            raise ValueError(f"Unknown calibration method: {method}")
+        return cls(method, a, b)
+
+    @property
+    def temperature(self):
+        return 1.0 / self.a if self.a else float("inf")
+
+    def apply(self, logits):
+        """Calibrated logit(s) of a float or numpy array"""
+        return self.a * logits + self.b
+
+    def probabilities(self, logits):
+        return sigmoid(self.apply(logits))
+
+    def to_dict(self):
+        return {
+            "method": self.method,
+            "a": self.a,
+            "b": self.b,
+            "temperature": self.temperature,
+            "threshold": self.threshold,
+            "operating_point": self.operating_point,
+            "metrics": self.metrics,
+        }
+
+    def save(self, path):
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2))
+
+    @classmethod
+    def load(cls, path):
+        raw = json.loads(Path(path).read_text())
+        return cls(raw.get("method", "platt"), raw["a"], raw.get("b", 0.0), raw.get("threshold"),
+                   raw.get("operating_point"), raw.get("metrics"))
+
+
+def calibration_path(model_path) -> Path:
+    """Where a checkpoint's calibration lives: model_epoch_30.pth -> model_epoch_30.calibration.json"""
+    return Path(model_path).with_suffix(".calibration.json")
@@ -0,0 +1,478 @@
+"""
+Pluggable video decoders
+OpenCV, PyAV and decord readers behind one interface, plus per-container
+automatic selection of the fastest backend that is installed
+"""
+
+import json
+import os
+import zlib
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+# ============================================================================
+# VIDEO INDEX
+# ============================================================================
+
+class VideoIndex:
+    """
+    Probed container metadata plus a packet-level frame index
+    pts holds every frame's presentation time in seconds (sorted), keyframes
+    the positions of keyframes in that order. rotation is the counter-clockwise
+    rotation (degrees) needed to display frames upright. exact is False when
+    the index was estimated from container headers instead of packets.
+    packet_crcs, when known, holds the CRC-32 of each frame's compressed
+    packet in pts order; stream-copied trims and remuxes keep these values
+    """
+
+    def __init__(self, pts, keyframes, fps, duration, rotation=0, width=0, height=0, exact=True,
+                 packet_crcs=None):
+        self.pts = np.asarray(pts, dtype=np.float64)
+        self.keyframes = np.asarray(keyframes, dtype=np.int64)
+        self.fps = fps
+        self.duration = duration
+        self.rotation = rotation
+        self.width = width
+        self.height = height
+        self.exact = exact
+        self.packet_crcs = np.asarray(packet_crcs, dtype=np.uint32) if packet_crcs is not None else None
+
+        # Frame spacing varies by more than a millisecond (VFR)
+        gaps = np.diff(self.pts)
+        self.variable_rate = bool(len(gaps) and gaps.max() - gaps.min() > 1e-3)
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.pts)
+
+    def position_at(self, seconds: float) -> int:
+        """Position of the frame presented at `seconds` (or the first one after it)"""
+        # Frame and packet timestamps share a time base, so only float noise needs absorbing
+        return int(np.searchsorted(self.pts, seconds - 1e-6))
+
+    def keyframe_before(self, position: int) -> int:
+        """Position of the last keyframe at or before `position` (0 if unknown)"""
+        i = int(np.searchsorted(self.keyframes, position, side="right")) - 1
+        return int(self.keyframes[i]) if i >= 0 else 0
+
+    def summary(self):
+        return {
+            "frame_count": self.frame_count,
+            "keyframes": len(self.keyframes),
+            "fps": self.fps,
+            "duration": self.duration,
+            "variable_rate": self.variable_rate,
+            "rotation": self.rotation,
+            "width": self.width,
+            "height": self.height,
+            "exact": self.exact,
+        }
+
+
+def rotate_frame(frame, rotation: int):
+    """Rotate a frame counter-clockwise by a multiple of 90 degrees"""
+    k = (rotation // 90) % 4
+    return np.ascontiguousarray(np.rot90(frame, k)) if k else frame
+
+
+def display_rotation(path: str, tags=None) -> int:
+    """
+    Counter-clockwise display rotation (degrees) from the video stream's
+    display matrix side data, read without decoding a frame. Older FFmpeg
+    builds export it as a clockwise "rotate" tag instead
+    """
+    clockwise = int((tags or {}).get("rotate", 0) or 0)
+    if not clockwise:
+        cap = cv2.VideoCapture(path)
+        if cap.isOpened():
+            clockwise = int(cap.get(cv2.CAP_PROP_ORIENTATION_META) or 0)
+        cap.release()
+    return -clockwise % 360
+
+
+def probe_video(path: str, max_packets: int = 0):
+    """
+    Build a VideoIndex in one pass over the container's packets (no decoding).
+    Uses PyAV when installed, otherwise estimates from OpenCV's headers, as it
+    also does for containers with more than max_packets packets (0 = no limit);
+    None if unreadable
+    """
+    if PyAVDecoder.available():
+        import av
+
+        try:
+            with av.open(path) as container:
+                stream = container.streams.video[0]
+                time_base = float(stream.time_base)
+                start = stream.start_time or 0
+
+                pts, keyframe_pts, crcs = [], [], []
+                for packet in container.demux(stream):
+                    stamp = packet.pts if packet.pts is not None else packet.dts
+                    if stamp is None or not packet.size:
+                        continue
+                    if max_packets and len(pts) >= max_packets:
+                        # Too long to index exactly; fall back to the header estimate
+                        pts = None
+                        break
+                    seconds = (stamp - start) * time_base
+                    pts.append(seconds)
+                    crcs.append(zlib.crc32(packet))
+                    if packet.is_keyframe:
+                        keyframe_pts.append(seconds)
+
+                if pts is not None:
+                    rotation = display_rotation(path, stream.metadata) if pts else 0
+                    order = np.argsort(np.asarray(pts, dtype=np.float64), kind="stable")
+                    pts = np.asarray(pts, dtype=np.float64)[order]
+                    keyframes = np.searchsorted(pts, np.asarray(keyframe_pts, dtype=np.float64))
+                    fps = float(stream.average_rate or 0.0)
+                    if not fps and len(pts) > 1:
+                        fps = (len(pts) - 1) / (pts[-1] - pts[0])
+                    duration = float(pts[-1] - pts[0]) + (1.0 / fps if fps else 0.0) if len(pts) else 0.0
+
+                    return VideoIndex(
+                        pts, np.unique(keyframes), fps, duration, rotation,
+                        stream.codec_context.width, stream.codec_context.height,
+                        packet_crcs=np.asarray(crcs, dtype=np.uint32)[order]
+                    )
+        except (av.FFmpegError, IndexError, ZeroDivisionError):
+            pass
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        return None
+    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    rotation = -int(cap.get(cv2.CAP_PROP_ORIENTATION_META) or 0) % 360
+    cap.release()
+
+    pts = np.arange(max(count, 0)) / fps if fps else np.arange(max(count, 0), dtype=np.float64)
+    return VideoIndex(pts, [0], fps, count / fps if fps else 0.0, rotation, width, height, exact=False)
+
+
+# ============================================================================
+# DECODER INTERFACE
+# ============================================================================
+
+class VideoDecoder:
+    """
+    Base class for video readers
+    Subclasses open the file in __init__, expose frame_count/fps/width/height
+    (0 when the container does not report them) and yield BGR uint8 frames
+    for a sorted list of frame indices. Callers may set `scratch` to a
+    numpy BufferPool that decoders able to write into caller memory reuse
+    """
+
+    name = "base"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.frame_count = 0
+        self.fps = 0.0
+        self.width = 0
+        self.height = 0
+        self.scratch = None
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def read(self, indices, index=None):
+        """
+        Yield (index, BGR frame) for each index; stops early if decoding fails
+        An optional VideoIndex lets decoders seek only when a keyframe lies
+        between the current position and the target
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def should_seek(index, current: int, target: int, fallback: bool) -> bool:
+        """Seek when the nearest keyframe before target is past the current position"""
+        if target <= current:
+            return True
+        if index is None or not index.exact:
+            return fallback
+        return index.keyframe_before(target) > current
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class OpenCVDecoder(VideoDecoder):
+    """cv2.VideoCapture with an explicit backend, decode thread count and optional HW acceleration"""
+
+    name = "opencv"
+
+    # Gaps up to this many frames are skipped with grab() instead of seeking
+    max_grab_gap = 8
+
+    def __init__(self, path: str, api_preference=cv2.CAP_FFMPEG, threads=0, hw_accel=False):
+        super().__init__(path)
+        params = [cv2.CAP_PROP_N_THREADS, threads]
+        if hw_accel:
+            params += [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+
+        self.cap = cv2.VideoCapture(path, api_preference, params)
+        if not self.cap.isOpened():
+            # Fall back to whatever backend OpenCV picks by default
+            self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise ValueError(f"Cannot open video file: {path}")
+
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = float(self.cap.get(cv2.CAP_PROP_FPS) or 0.0)
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def read(self, indices, index=None):
+        # OpenCV seeks by frame number times the average rate, which lands on
+        # the wrong frame in variable-rate files; decode forward there instead
+        forward_only = index is not None and index.exact and index.variable_rate
+        position = 0
+        # Decoded shape (OpenCV may rotate frames, so it is learnt from the first one)
+        shape = (self.height, self.width, 3)
+        for target in indices:
+            gap = target - position
+            seek = self.should_seek(index, position - 1, target, gap > self.max_grab_gap)
+            if gap < 0 or (gap > 0 and seek and not forward_only):
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+            else:
+                for _ in range(gap):
+                    self.cap.grab()
+
+            buffer = self.scratch.acquire(shape, np.uint8) if self.scratch is not None and all(shape) else None
+            ret, frame = self.cap.read(buffer)
+            if buffer is not None and (not ret or frame is not buffer):
+                # Unused: decoding failed or needed a different shape
+                self.scratch.release(buffer)
+            if not ret:
+                return
+            shape = frame.shape
+            position = target + 1
+            yield target, frame
+
+    def close(self):
+        self.cap.release()
+
+
+class PyAVDecoder(VideoDecoder):
+    """FFmpeg through PyAV with frame-threaded decoding and keyframe seeks for sparse reads"""
+
+    name = "pyav"
+
+    # Gaps larger than this many frames seek to the nearest keyframe instead of decoding through
+    max_decode_gap = 48
+
+    def __init__(self, path: str, threads=0):
+        super().__init__(path)
+        import av
+
+        try:
+            self.container = av.open(path)
+            self.stream = self.container.streams.video[0]
+        except (av.FFmpegError, IndexError) as e:
+            raise ValueError(f"Cannot open video file: {path} ({e})")
+
+        self.stream.thread_type = "AUTO"
+        self.stream.thread_count = threads
+        self.time_base = float(self.stream.time_base or 0) or None
+        self.start_time = self.stream.start_time or 0
+
+        self.fps = float(self.stream.average_rate or 0.0)
+        self.frame_count = self.stream.frames
+        if not self.frame_count and self.fps:
+            # Matroska/WebM often carry no frame count; estimate from duration
+            if self.stream.duration and self.time_base:
+                self.frame_count = int(self.stream.duration * self.time_base * self.fps)
+            elif self.container.duration:
+                self.frame_count = int(self.container.duration / av.time_base * self.fps)
+        self.width = self.stream.codec_context.width
+        self.height = self.stream.codec_context.height
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import av  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def _frame_index(self, frame, fallback: int, index=None) -> int:
+        if frame.pts is None or not self.time_base:
+            return fallback
+        seconds = (frame.pts - self.start_time) * self.time_base
+        if index is not None and index.exact:
+            # Exact position even for variable frame rate
+            return index.position_at(seconds)
+        if not self.fps:
+            return fallback
+        return int(round(seconds * self.fps))
+
+    @staticmethod
+    def _to_bgr(frame, rotation: int):
+        return rotate_frame(frame.to_ndarray(format="bgr24"), rotation)
+
+    def read(self, indices, index=None):
+        import av
+
+        # From the stream's display matrix, once (not every PyAV release exposes it per frame)
+        rotation = index.rotation if index is not None else display_rotation(self.path, self.stream.metadata)
+
+        can_seek = bool(self.time_base and (self.fps or index is not None))
+        frames = None
+        frame = None
+        current = -1
+        try:
+            for target in indices:
+                if frame is not None and target <= current:
+                    # Already decoded past this index (duplicates or VFR gaps)
+                    yield target, self._to_bgr(frame, rotation)
+                    continue
+
+                if can_seek and self.should_seek(index, current, target, target - current > self.max_decode_gap):
+                    if index is not None and index.exact:
+                        seconds = index.pts[index.keyframe_before(min(target, index.frame_count - 1))]
+                    else:
+                        seconds = target / self.fps
+                    self.container.seek(self.start_time + int(seconds / self.time_base), stream=self.stream,
+                                        backward=True, any_frame=False)
+                    frames = None
+                if frames is None:
+                    frames = self.container.decode(self.stream)
+
+                # Decode forward until the target index is reached
+                while True:
+                    frame = next(frames, None)
+                    if frame is None:
+                        return
+                    current = self._frame_index(frame, current + 1, index)
+                    if current >= target:
+                        break
+
+                yield target, self._to_bgr(frame, rotation)
+        except av.FFmpegError:
+            return
+
+    def close(self):
+        self.container.close()
+
+
+class DecordDecoder(VideoDecoder):
+    """decord VideoReader: random access through its packet index, one batched fetch"""
+
+    name = "decord"
+
+    def __init__(self, path: str, threads=0):
+        super().__init__(path)
+        import decord
+
+        try:
+            self.reader = decord.VideoReader(path, ctx=decord.cpu(0), num_threads=threads)
+        except (decord.DECORDError, RuntimeError) as e:
+            raise ValueError(f"Cannot open video file: {path} ({e})")
+
+        self.frame_count = len(self.reader)
+        self.fps = float(self.reader.get_avg_fps() or 0.0)
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import decord  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def read(self, indices, index=None):
+        indices = [i for i in indices if i < self.frame_count]
+        if not indices:
+            return
+        batch = self.reader.get_batch(indices).asnumpy()
+        self.height, self.width = batch.shape[1:3]
+        for position, frame in zip(indices, batch):
+            yield position, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+
+    def close(self):
+        self.reader = None
+
+
+# ============================================================================
+# REGISTRY AND AUTOMATIC SELECTION
+# ============================================================================
+
+DECODERS = {
+    OpenCVDecoder.name: OpenCVDecoder,
+    PyAVDecoder.name: PyAVDecoder,
+    DecordDecoder.name: DecordDecoder,
+}
+
+# Fastest-first order per container, overridable with benchmark_decoders.py output
+DEFAULT_PREFERENCES = {
+    ".mp4": ["pyav", "decord", "opencv"],
+    ".mov": ["decord", "pyav", "opencv"],
+    ".mkv": ["pyav", "decord", "opencv"],
+    ".webm": ["pyav", "decord", "opencv"],
+    ".avi": ["decord", "pyav", "opencv"],
+    "default": ["opencv"],
+}
+
+
+def available_decoders():
+    """Names of the decoders whose libraries are importable"""
+    return [name for name, cls in DECODERS.items() if cls.available()]
+
+
+def load_preferences(path=None):
+    """Merge a benchmark-generated preference file over the defaults"""
+    preferences = dict(DEFAULT_PREFERENCES)
+    path = path or os.getenv("DECODER_PREFERENCES")
+    if path and Path(path).exists():
+        with open(path) as f:
+            preferences.update(json.load(f))
+    return preferences
+
+
+class DecoderSelector:
+    """Opens videos with a fixed decoder, or with the fastest available one for the container"""
+
+    def __init__(self, decoder="auto", threads=0, preferences=None):
+        if decoder != "auto" and decoder not in DECODERS:
+            raise ValueError(f"Unknown decoder '{decoder}'. Choose from: auto, {', '.join(DECODERS)}")
+        self.available = set(available_decoders())
+        # A forced decoder must be importable now, not fail on every request
+        if decoder != "auto" and decoder not in self.available:
+            raise ValueError(f"Decoder '{decoder}' is not installed (see requirements-optional.txt). "
+                             f"Available: {', '.join(sorted(self.available))}")
+        self.decoder = decoder
+        self.threads = threads
+        self.preferences = preferences or load_preferences()
+
+    def candidates(self, path: str):
+        if self.decoder != "auto":
+            return [self.decoder]
+        order = self.preferences.get(Path(path).suffix.lower(), self.preferences["default"])
+        names = [name for name in order if name in self.available]
+        if "opencv" not in names:
+            names.append("opencv")
+        return names
+
+    def open(self, path: str) -> VideoDecoder:
+        """Open with the first candidate that accepts the file"""
+        error = None
+        for name in self.candidates(path):
+            try:
+                return DECODERS[name](path, threads=self.threads)
+            except ValueError as e:
+                error = e
+        raise error
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Student Distillation Script
+Trains a MobileNetV3 / EfficientNet-B0 + BiLSTM student from the ResNet50BiLSTM
+checkpoint on cached face crops, and reports accuracy versus throughput
+
+    python distill_student.py train --teacher model_epoch_30.pth \\
+        --frames-dir /content/frames --metadata metadata.json --student mobilenet_v3
+    python distill_student.py report --models model_epoch_30.pth student_mobilenet_v3.pth \\
+        --frames-dir /content/frames --metadata metadata.json
+"""
+
+import argparse
+
+import torch
+import torch.optim as optim
+
+from models import StudentBiLSTM
+from training import (
+    accuracy, agreement, compare_models, list_videos, load_checkpoint, load_labels, make_loader,
+    predict_logits, print_report, save_checkpoint, split_names, teacher_logits, train_epoch, write_report
+)
+
+
+def report(model_paths, frames_dir, labels, names, device, batch_size, workers, reference=None):
+    """Accuracy / agreement / cost table for each checkpoint; the first one is the reference"""
+    loader = make_loader(frames_dir, names, labels, batch_size=batch_size, workers=workers)
+    models = []
+    for path in model_paths:
+        model, architecture, _ = load_checkpoint(path, device=device)
+        models.append((path, model, architecture))
+
+    rows = compare_models(models, loader, device, reference)
+    print_report(rows)
+    return rows
+
+
+def train(args):
+    device = torch.device(args.device if torch.cuda.is_available() else "cpu")
+    labels = load_labels(args.metadata)
+    names = list_videos(args.frames_dir)
+    if not names:
+        raise SystemExit(f"❌ No cached face crops found in {args.frames_dir}")
+    train_names, val_names = split_names(names, args.val_fraction)
+
+    print("🚀 Student Distillation")
+    print("=" * 50)
+    print(f"   Teacher: {args.teacher}")
+    print(f"   Student: {args.student} ({'ImageNet init' if args.pretrained else 'random init'})")
+    print(f"   Videos: {len(train_names)} train, {len(val_names)} validation, {len(labels)} labelled")
+
+    soft_targets = teacher_logits(args.teacher, args.frames_dir, names, device, args.batch_size, args.workers)
+    train_targets = soft_targets[:len(train_names)]
+    val_targets = soft_targets[len(train_names):].numpy()
+
+    student = StudentBiLSTM(trunk=args.student, pretrained=args.pretrained).to(device)
+    opt = optim.Adam(student.parameters(), lr=args.lr)
+    train_loader = make_loader(args.frames_dir, train_names, labels, augment=True,
+                               batch_size=args.batch_size, workers=args.workers, shuffle=True)
+    val_loader = make_loader(args.frames_dir, val_names, labels, batch_size=args.batch_size, workers=args.workers)
+
+    best = -1.0
+    for epoch in range(1, args.epochs + 1):
+        train_loss = train_epoch(student, train_loader, opt, train_targets, device,
+                                 args.temperature, args.alpha, desc=f"Epoch {epoch} Training")
+
+        logits, val_labels = predict_logits(student, val_loader, device)
+        val_acc = accuracy(logits, val_labels)
+        val_agree = agreement(logits, val_targets)
+        print(f"Epoch {epoch}: Train Loss={train_loss:.4f} | Val Agreement={val_agree:.4f}"
+              + (f" | Val Acc={val_acc:.4f}" if val_acc is not None else ""))
+
+        # Keep the epoch that best matches labels, or the teacher when unlabelled
+        score = val_acc if val_acc is not None else val_agree
+        if score >= best:
+            best = score
+            save_checkpoint(args.output, student, args.student, teacher=str(args.teacher), epoch=epoch,
+                            val_accuracy=val_acc, val_agreement=val_agree)
+
+    print(f"\n✅ Student saved to {args.output} (serve with MODEL_PATH={args.output})")
+
+    rows = report([args.teacher, args.output], args.frames_dir, labels, val_names, device,
+                  args.batch_size, args.workers, reference=val_targets)
+    if args.json:
+        write_report(args.json, args, rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill a lightweight student from ResNet50BiLSTM")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def common(p):
+        p.add_argument("--frames-dir", required=True, help="Face crops as written by the training notebook")
+        p.add_argument("--metadata", help="DFDC metadata.json with REAL/FAKE labels (optional)")
+        p.add_argument("--val-fraction", type=float, default=0.2)
+        p.add_argument("--batch-size", type=int, default=4)
+        p.add_argument("--workers", type=int, default=2)
+        p.add_argument("--device", default="cuda")
+        p.add_argument("--json", metavar="PATH", help="Write the report as JSON")
+
+    p = sub.add_parser("train", help="Distill a student and report it against the teacher")
+    common(p)
+    p.add_argument("--teacher", default="model_epoch_30.pth")
+    p.add_argument("--student", choices=list(StudentBiLSTM.TRUNKS), default="mobilenet_v3")
+    p.add_argument("--output", help="Student checkpoint path (default student_<trunk>.pth)")
+    p.add_argument("--epochs", type=int, default=10)
+    p.add_argument("--lr", type=float, default=1e-4)
+    p.add_argument("--temperature", type=float, default=2.0)
+    p.add_argument("--alpha", type=float, default=0.7, help="Weight of the distillation term vs labels")
+    p.add_argument("--no-pretrained", dest="pretrained", action="store_false",
+                   help="Start the student trunk from random weights instead of ImageNet")
+
+    p = sub.add_parser("report", help="Accuracy versus throughput for existing checkpoints")
+    common(p)
+    p.add_argument("--models", nargs="+", required=True, help="Checkpoints; the first is the agreement reference")
+
+    args = parser.parse_args()
+
+    if args.command == "train":
+        args.output = args.output or f"student_{args.student}.pth"
+        train(args)
+        return
+
+    device = torch.device(args.device if torch.cuda.is_available() else "cpu")
+    labels = load_labels(args.metadata)
+    _, val_names = split_names(list_videos(args.frames_dir), args.val_fraction)
+    print("🚀 Model Report")
+    print("=" * 50)
+    print(f"   Validation videos: {len(val_names)}")
+    rows = report(args.models, args.frames_dir, labels, val_names, device, args.batch_size, args.workers)
+    if args.json:
+        write_report(args.json, args, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Evaluation & Calibration Script
+Scores a labelled local dataset once and caches the raw logits, then reports
+ROC / PR / calibration metrics, picks operating-point thresholds and fits
+temperature or Platt scaling, saved next to the checkpoint where
+ModelManager loads it. Later runs only score videos missing from the cache,
+so re-calibrating (another --operating-point or --method) takes seconds
+
+    python evaluate_model.py --model model_epoch_30.pth --videos /data/dfdc_val --metadata metadata.json
+    python evaluate_model.py --model model_epoch_30.pth --frames-dir /content/frames \\
+        --metadata metadata.json --operating-point fpr@0.05
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import torch
+from tqdm import tqdm
+
+from calibration import (
+    Calibration, calibration_path, confusion_at, evaluate, log_loss, operating_thresholds, roc_curve, sigmoid
+)
+from training import list_videos, load_checkpoint, load_labels, make_loader, predict_logits, split_names
+
+
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm"}
+OPERATING_POINTS = ["youden", "f1", "accuracy", "fpr@0.01", "fpr@0.05", "tpr@0.95"]
+
+
+# ============================================================================
+# SCORING
+# ============================================================================
+
+def score_videos(model_path, videos_dir, names, device):
+    """Raw logits through the serving path (decode, face detection, model)"""
+    from backend import ModelManager
+
+    manager = ModelManager(str(model_path), device=device)
+    # Evaluation must run the model on every video
+    manager.cascade = None
+    manager.fingerprints = None
+
+    files = {p.stem: p for p in Path(videos_dir).iterdir() if p.suffix.lower() in VIDEO_EXTENSIONS}
+    logits = {}
+    for name in tqdm(names, desc="Scoring videos"):
+        try:
+            logits[name] = manager.predict(str(files[name]))["raw_score"]
+        except Exception as e:
+            print(f"⚠️ Skipping {name}: {e}")
+    return logits
+
+
+def score_frames(model_path, frames_dir, names, device, batch_size, workers):
+    """Raw logits on the training notebook's cached face crops"""
+    model, _, _ = load_checkpoint(model_path, device=device)
+    loader = make_loader(frames_dir, names, batch_size=batch_size, workers=workers)
+    values, _ = predict_logits(model, loader, device)
+    return {name: float(v) for name, v in zip(names, values)}
+
+
+def cached_logits(args, labels, device):
+    """{video: raw logit} for every labelled video, scoring only those missing from the cache"""
+    if args.videos:
+        available = sorted(p.stem for p in Path(args.videos).iterdir() if p.suffix.lower() in VIDEO_EXTENSIONS)
+    else:
+        available = list_videos(args.frames_dir)
+    names = [n for n in available if n in labels]
+
+    source = "videos" if args.videos else "frames"
+    cache = {"model": str(args.model), "source": source, "logits": {}}
+    if args.cache.exists():
+        cached = json.loads(args.cache.read_text())
+        if cached.get("source") == source:
+            cache = cached
+        else:
+            print(f"⚠️ {args.cache} holds {cached.get('source')} logits; rescoring from {source}")
+
+    missing = [n for n in names if n not in cache["logits"]]
+    if missing:
+        print(f"🧮 Scoring {len(missing)} videos ({len(names) - len(missing)} cached)")
+        if args.videos:
+            cache["logits"].update(score_videos(args.model, args.videos, missing, device))
+        else:
+            cache["logits"].update(score_frames(args.model, args.frames_dir, missing, device,
+                                                args.batch_size, args.workers))
+        args.cache.write_text(json.dumps(cache))
+    else:
+        print(f"📦 All {len(names)} videos cached in {args.cache}")
+
+    return {n: cache["logits"][n] for n in names if n in cache["logits"]}
+
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+def print_metrics(title, rows):
+    print(f"\n{title}")
+    print(f"   {'':<12} {'ROC AUC':>8} {'AP':>6} {'ECE':>6} {'logloss':>8} {'brier':>6} {'acc@thr':>8}")
+    for name, m in rows:
+        print(f"   {name:<12} {m['roc_auc']:>8.4f} {m['average_precision']:>6.3f} {m['ece']:>6.3f} "
+              f"{m['log_loss']:>8.4f} {m['brier']:>6.3f} {m['accuracy']:>8.1%}")
+
+
+def curve_points(labels, probs, max_points=200):
+    """Downsampled ROC curve for the JSON report"""
+    fpr, tpr, thresholds, _ = roc_curve(labels, probs)
+    keep = np.unique(np.linspace(0, len(fpr) - 1, min(max_points, len(fpr))).astype(int))
+    return {"fpr": fpr[keep].tolist(), "tpr": tpr[keep].tolist(),
+            "thresholds": np.nan_to_num(thresholds[keep], posinf=1.0).tolist()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate a checkpoint and fit its score calibration")
+    parser.add_argument("--model", type=Path, default=Path("model_epoch_30.pth"))
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--videos", type=Path, help="Directory of labelled videos (scored through the serving path)")
+    source.add_argument("--frames-dir", type=Path, help="Face crops as written by the training notebook")
+    parser.add_argument("--metadata", required=True, help="DFDC metadata.json with REAL/FAKE labels")
+    parser.add_argument("--cache", type=Path, help="Logit cache (default <model>.<videos|frames>.logits.json)")
+    parser.add_argument("--method", choices=["temperature", "platt", "auto"], default="auto",
+                        help="auto picks the lower held-out log loss")
+    parser.add_argument("--operating-point", default="youden",
+                        help=f"Threshold to recommend: {', '.join(OPERATING_POINTS)}, or fpr@x / tpr@x")
+    parser.add_argument("--holdout", type=float, default=0.5, help="Share of videos kept for reporting")
+    parser.add_argument("--bins", type=int, default=15, help="Bins for expected calibration error")
+    parser.add_argument("--output", type=Path, help="Calibration file (default next to the checkpoint)")
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--device", default="cuda")
+    parser.add_argument("--json", metavar="PATH", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    args.cache = args.cache or args.model.with_suffix(f".{'videos' if args.videos else 'frames'}.logits.json")
+    args.output = args.output or calibration_path(args.model)
+    device = args.device if torch.cuda.is_available() else "cpu"
+
+    print("🚀 Model Evaluation & Calibration")
+    print("=" * 50)
+    print(f"   Model: {args.model}")
+    print(f"   Data: {args.videos or args.frames_dir}")
+
+    labels = load_labels(args.metadata)
+    logits = cached_logits(args, labels, device)
+    if not logits:
+        raise SystemExit("❌ No labelled videos found")
+
+    names = sorted(logits)
+    fit_names, holdout_names = split_names(names, args.holdout)
+    if not holdout_names or not fit_names:
+        fit_names = holdout_names = names
+        print("⚠️ Too few videos to hold any out; fitting and reporting on all of them")
+
+    def arrays(subset):
+        return np.array([logits[n] for n in subset]), np.array([labels[n] for n in subset]) > 0.5
+
+    fit_logits, fit_labels = arrays(fit_names)
+    test_logits, test_labels = arrays(holdout_names)
+    print(f"   Videos: {len(fit_names)} fit, {len(holdout_names)} held out, "
+          f"{int(fit_labels.sum() + test_labels.sum())} FAKE")
+
+    # Fit both scalings; auto keeps the one with the lower held-out log loss
+    fitted = {m: Calibration.fit(fit_logits, fit_labels, m) for m in ["temperature", "platt"]}
+    method = args.method
+    if method == "auto":
+        method = min(fitted, key=lambda m: log_loss(test_labels, fitted[m].probabilities(test_logits)))
+    calibration = fitted[method]
+
+    # Thresholds are chosen on the fit split, on the calibrated scale
+    points = list(dict.fromkeys(OPERATING_POINTS + [args.operating_point]))
+    thresholds = operating_thresholds(fit_labels, calibration.probabilities(fit_logits), points)
+    calibration.threshold = thresholds[args.operating_point]
+    calibration.operating_point = args.operating_point
+
+    raw_probs = sigmoid(test_logits)
+    rows = [("raw", evaluate(test_labels, raw_probs, 0.5, args.bins))]
+    for m, c in fitted.items():
+        rows.append((m, evaluate(test_labels, c.probabilities(test_logits), calibration.threshold, args.bins)))
+    print_metrics("📊 Held-out metrics (raw at 0.5, calibrated at the chosen threshold)", rows)
+
+    test_probs = calibration.probabilities(test_logits)
+    print(f"\n🎯 Operating points ({method}, thresholds fitted on the fit split, rates held out)")
+    print(f"   {'point':<10} {'threshold':>9} {'TPR':>6} {'FPR':>6} {'prec':>6} {'F1':>6}")
+    operating = {}
+    for point in points:
+        m = confusion_at(test_labels, test_probs, thresholds[point])
+        operating[point] = m
+        marker = " ◀" if point == args.operating_point else ""
+        print(f"   {point:<10} {m['threshold']:>9.4f} {m['tpr']:>6.1%} {m['fpr']:>6.1%} "
+              f"{m['precision']:>6.1%} {m['f1']:>6.3f}{marker}")
+
+    calibration.metrics = dict(rows)[method]
+    calibration.save(args.output)
+    print(f"\n✅ Calibration saved to {args.output} ({method}, T={calibration.temperature:.3f}, "
+          f"a={calibration.a:.4f}, b={calibration.b:.4f}, threshold {calibration.threshold:.4f})")
+    print("   ModelManager loads it automatically for this checkpoint; PREDICTION_THRESHOLD still overrides")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "config": {k: str(v) for k, v in vars(args).items()},
+                "calibration": calibration.to_dict(),
+                "metrics": dict(rows),
+                "operating_points": operating,
+                "roc": {"raw": curve_points(test_labels, raw_probs), method: curve_points(test_labels, test_probs)},
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Pluggable face detectors
+MTCNN, OpenCV Haar cascade, YuNet (ONNX via cv2.FaceDetectorYN) and a
+no-op center-crop detector behind one batched interface
+"""
+
+import os
+
+import cv2
+import numpy as np
+
+
+# ============================================================================
+# DETECTOR INTERFACE
+# ============================================================================
+
+class FaceDetector:
+    """
+    Base class for face detectors
+    detect() takes a list of BGR uint8 frames and returns, per frame, a
+    (boxes, probs) pair: boxes is a float (N, 4) array of x0, y0, x1, y1
+    sorted largest-first, probs the matching (N,) confidences
+    """
+
+    name = "base"
+
+    @classmethod
+    def available(cls, **options) -> bool:
+        return True
+
+    def detect(self, frames):
+        raise NotImplementedError
+
+    @staticmethod
+    def _empty():
+        return np.zeros((0, 4), dtype=np.float32), np.zeros((0,), dtype=np.float32)
+
+    @staticmethod
+    def _largest_first(boxes, probs):
+        if len(boxes) == 0:
+            return FaceDetector._empty()
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        probs = np.asarray(probs, dtype=np.float32).reshape(-1)
+        order = np.argsort(-(boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1]), kind="stable")
+        return boxes[order], probs[order]
+
+
+class MTCNNDetector(FaceDetector):
+    """facenet-pytorch MTCNN; frames of equal size are detected in one batched call"""
+
+    name = "mtcnn"
+
+    def __init__(self, device="cpu", min_face_size=20, thresholds=(0.6, 0.7, 0.7)):
+        from facenet_pytorch import MTCNN
+
+        self.mtcnn = MTCNN(
+            keep_all=True,
+            min_face_size=min_face_size,
+            thresholds=list(thresholds),
+            device=device,
+            post_process=False
+        )
+
+    def detect(self, frames):
+        if not frames:
+            return []
+
+        images = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames]
+        if len({image.shape for image in images}) == 1:
+            batch_boxes, batch_probs = self.mtcnn.detect(np.stack(images))
+        else:
+            batch_boxes, batch_probs = zip(*(self.mtcnn.detect(image) for image in images))
+
+        results = []
+        for boxes, probs in zip(batch_boxes, batch_probs):
+            if boxes is None:
+                results.append(self._empty())
+            else:
+                results.append(self._largest_first(boxes, probs))
+        return results
+
+
+class HaarDetector(FaceDetector):
+    """OpenCV Haar cascade; fast on CPU, no confidence score (probs are 1.0)"""
+
+    name = "haar"
+
+    def __init__(self, cascade="haarcascade_frontalface_default.xml", scale_factor=1.1,
+                 min_neighbors=5, min_face_size=30):
+        path = cascade if os.path.isabs(cascade) else os.path.join(cv2.data.haarcascades, cascade)
+        self.classifier = cv2.CascadeClassifier(path)
+        if self.classifier.empty():
+            raise ValueError(f"Cannot load Haar cascade: {path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_face_size = min_face_size
+
+    def detect(self, frames):
+        results = []
+        for frame in frames:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            rects = self.classifier.detectMultiScale(
+                gray,
+                scaleFactor=self.scale_factor,
+                minNeighbors=self.min_neighbors,
+                minSize=(self.min_face_size, self.min_face_size)
+            )
+            boxes = [(x, y, x + w, y + h) for x, y, w, h in rects]
+            results.append(self._largest_first(boxes, [1.0] * len(boxes)))
+        return results
+
+
+class YuNetDetector(FaceDetector):
+    """
+    YuNet ONNX face detector through cv2.FaceDetectorYN
+    Needs the model file (face_detection_yunet_2023mar.onnx from the OpenCV
+    model zoo), passed as model_path or the YUNET_MODEL env var
+    """
+
+    name = "yunet"
+
+    def __init__(self, model_path=None, score_threshold=0.8, nms_threshold=0.3, top_k=50):
+        model_path = model_path or os.getenv("YUNET_MODEL", "face_detection_yunet_2023mar.onnx")
+        if not os.path.exists(model_path):
+            raise ValueError(f"YuNet model not found: {model_path}")
+        self.net = cv2.FaceDetectorYN.create(model_path, "", (320, 320), score_threshold, nms_threshold, top_k)
+        self.input_size = None
+
+    @classmethod
+    def available(cls, model_path=None, **options) -> bool:
+        model_path = model_path or os.getenv("YUNET_MODEL", "face_detection_yunet_2023mar.onnx")
+        return hasattr(cv2, "FaceDetectorYN") and os.path.exists(model_path)
+
+    def detect(self, frames):
+        results = []
+        for frame in frames:
+            size = (frame.shape[1], frame.shape[0])
+            if size != self.input_size:
+                self.net.setInputSize(size)
+                self.input_size = size
+
+            _, faces = self.net.detect(frame)
+            if faces is None:
+                results.append(self._empty())
+                continue
+
+            boxes = np.column_stack([faces[:, 0], faces[:, 1], faces[:, 0] + faces[:, 2], faces[:, 1] + faces[:, 3]])
+            results.append(self._largest_first(boxes, faces[:, -1]))
+        return results
+
+
+class NoFaceDetector(FaceDetector):
+    """Skips detection entirely; every frame takes the full-frame fallback"""
+
+    name = "none"
+
+    def __init__(self, **options):
+        pass
+
+    def detect(self, frames):
+        return [self._empty() for _ in frames]
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+FACE_DETECTORS = {
+    MTCNNDetector.name: MTCNNDetector,
+    HaarDetector.name: HaarDetector,
+    YuNetDetector.name: YuNetDetector,
+    NoFaceDetector.name: NoFaceDetector,
+}
+
+
+def available_detectors():
+    """Names of detectors that can be constructed with default options"""
+    return [name for name, cls in FACE_DETECTORS.items() if cls.available()]
+
+
+def create_detector(name: str, **options) -> FaceDetector:
+    """Build a registered detector with per-detector keyword options"""
+    if name not in FACE_DETECTORS:
+        raise ValueError(f"Unknown face detector '{name}'. Choose from: {', '.join(FACE_DETECTORS)}")
+    return FACE_DETECTORS[name](**options)
@@ -0,0 +1,226 @@
+"""
+Perceptual fingerprints for near-duplicate videos
+Each scored video is summarised by one 256-bit DCT hash per sampled face
+crop. Hashes go into a banded LSH index, so re-encodes, crops and re-uploads
+of an already scored video can be recognised before the model runs
+"""
+
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from itertools import chain, combinations, repeat
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from metrics import metrics
+
+
+# Hash geometry: 64x64 grey proxy, lowest 16x16 DCT coefficients -> 256 bits
+HASH_SIZE = 16
+PROXY_SIZE = 64
+HASH_WORDS = HASH_SIZE * HASH_SIZE // 64
+HASH_BYTES = HASH_WORDS * 8
+
+# Band values probed per band and frame; beyond this, use more bands
+MAX_PROBES = 4096
+
+
+def _dct_matrix(n: int) -> torch.Tensor:
+    k = torch.arange(n, dtype=torch.float64).unsqueeze(1)
+    i = torch.arange(n, dtype=torch.float64).unsqueeze(0)
+    m = torch.cos(torch.pi * (2 * i + 1) * k / (2 * n)) * (2.0 / n) ** 0.5
+    m[0] /= 2 ** 0.5
+    return m.float()
+
+
+_DCT = _dct_matrix(PROXY_SIZE)[:HASH_SIZE]
+
+
+@torch.no_grad()
+def frame_hashes(frames: torch.Tensor) -> np.ndarray:
+    """
+    (N, 3, H, W) preprocessed frames -> (N, HASH_WORDS) uint64 perceptual hashes
+    Works on the model's face crops, so framing changes around the face do
+    not move the hash; bits are DCT coefficients above their frame's median
+    """
+    grey = frames.float().mean(dim=1, keepdim=True)
+    proxy = F.interpolate(grey, size=(PROXY_SIZE, PROXY_SIZE), mode="area").squeeze(1)
+    coeffs = (_DCT @ proxy @ _DCT.T).flatten(1)
+    # The DC term only tracks overall brightness
+    median = coeffs[:, 1:].median(dim=1, keepdim=True).values
+    bits = (coeffs > median).numpy()
+    return np.packbits(bits, axis=1).view(">u8").astype(np.uint64)
+
+
+def hamming(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """(N, W) x (M, W) uint64 hashes -> (N, M) bit distances"""
+    xor = a[:, None, :] ^ b[None, :, :]
+    return np.unpackbits(xor.view(np.uint8), axis=-1).sum(axis=-1)
+
+
+class FingerprintIndex:
+    """
+    Multi-probe banded LSH over frame hashes with a bounded number of videos
+    Each hash is split into `bands` equal bit ranges. Two frames within
+    max_distance bits differ in at most max_distance // bands bits of some
+    band, so lookups probe every value of each band within that radius and
+    never miss a frame inside max_distance. The default 31 bits over 16
+    bands needs one flipped bit per probe (17 per band); 32 would need 137.
+    Candidate videos are then verified by exact Hamming distance
+    path: optional JSONL file the index is replayed from and appended to
+    """
+
+    def __init__(self, max_entries=100000, bands=16, max_distance=31, path=None, namespace=""):
+        if bands < 1 or HASH_BYTES % bands or HASH_BYTES // bands > 8:
+            raise ValueError(f"bands must divide the {HASH_BYTES}-byte hash into bands of at most 8 bytes, got {bands}")
+        band_bits = HASH_BYTES // bands * 8
+        radius = max_distance // bands
+        masks = [0]
+        for flips in range(1, min(radius, band_bits) + 1):
+            masks += [sum(1 << bit for bit in bits) for bits in combinations(range(band_bits), flips)]
+            if len(masks) > MAX_PROBES:
+                raise ValueError(f"max_distance {max_distance} needs over {MAX_PROBES} probes per band "
+                                 f"with {bands} bands; use more bands or a smaller max_distance")
+
+        self.max_entries = max_entries
+        self.bands = bands
+        self.max_distance = max_distance
+        self.path = Path(path) if path else None
+        # Verdicts of another model must not be reused
+        self.namespace = namespace
+        # Every band value within `radius` bits of a query band
+        self._probes = np.array(masks, dtype=np.uint64)
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._keys = {}
+        self._tables = [{} for _ in range(bands)]
+        self._next_id = 0
+        self.lookups = 0
+        self.hits = 0
+
+        if self.path is not None and self.path.exists():
+            self._replay()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _band_values(self, hashes: np.ndarray) -> np.ndarray:
+        """(N, W) hashes -> (N, bands) uint64 band values"""
+        rows = hashes.astype(">u8").view(np.uint8).reshape(len(hashes), self.bands, -1).astype(np.uint64)
+        weights = np.uint64(256) ** np.arange(rows.shape[-1] - 1, -1, -1, dtype=np.uint64)
+        return (rows * weights).sum(axis=-1, dtype=np.uint64)
+
+    def _band_keys(self, hashes: np.ndarray):
+        """(N, W) hashes -> per frame, the value of each band"""
+        return self._band_values(hashes).tolist()
+
+    def _insert(self, key: str, hashes: np.ndarray, raw_score: float):
+        if key in self._keys:
+            return
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = {"key": key, "hashes": hashes, "raw_score": raw_score}
+        self._keys[key] = entry_id
+
+        for frame_keys in self._band_keys(hashes):
+            for table, band_key in zip(self._tables, frame_keys):
+                table.setdefault(band_key, set()).add(entry_id)
+
+        while len(self._entries) > self.max_entries:
+            old_id, old = self._entries.popitem(last=False)
+            del self._keys[old["key"]]
+            for frame_keys in self._band_keys(old["hashes"]):
+                for table, band_key in zip(self._tables, frame_keys):
+                    ids = table.get(band_key)
+                    if ids is not None:
+                        ids.discard(old_id)
+                        if not ids:
+                            del table[band_key]
+        metrics.set_gauge("fingerprint_index_entries", len(self._entries))
+
+    def add(self, key: str, hashes: np.ndarray, raw_score: float):
+        """Remember a scored video's frame hashes and raw model score"""
+        if not len(hashes):
+            return
+        with self._lock:
+            self._insert(key, hashes, raw_score)
+        if self.path is not None:
+            record = {"namespace": self.namespace, "key": key, "raw_score": raw_score,
+                      "hashes": [[f"{w:016x}" for w in row] for row in hashes.tolist()]}
+            with self._lock, open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def _replay(self):
+        """Load the newest max_entries records of this namespace, compacting the file if it grew past that"""
+        mine, others = [], []
+        for line in self.path.read_text().splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn final line
+            (mine if record.get("namespace") == self.namespace else others).append((line, record))
+
+        for _, record in mine[-self.max_entries:]:
+            hashes = np.array([[int(w, 16) for w in row] for row in record["hashes"]], dtype=np.uint64)
+            self._insert(record["key"], hashes, record["raw_score"])
+
+        if len(mine) > self.max_entries:
+            kept = others + mine[-self.max_entries:]
+            self.path.write_text("".join(line + "\n" for line, _ in kept))
+        print(f"✅ Fingerprint index: {len(self._entries)} videos from {self.path}")
+
+    def lookup(self, hashes: np.ndarray, min_similarity=0.5, max_candidates=32):
+        """
+        Best near-duplicate of a video, or None if none reaches min_similarity
+        Returns {"key", "raw_score", "frames_matched", "similarity", "distance"}
+        where similarity is the share of query frames within max_distance bits
+        of some frame of the match, and distance their mean bit distance
+        """
+        if not len(hashes):
+            return None
+        start = time.perf_counter()
+        best = None
+        with self._lock:
+            votes = Counter()
+            probed = self._band_values(hashes)[:, :, None] ^ self._probes
+            for band, table in enumerate(self._tables):
+                votes.update(chain.from_iterable(map(table.get, np.unique(probed[:, band]).tolist(), repeat(()))))
+
+            for entry_id, _ in votes.most_common(max_candidates):
+                entry = self._entries[entry_id]
+                nearest = hamming(hashes, entry["hashes"]).min(axis=1)
+                matched = nearest <= self.max_distance
+                if not matched.any() or matched.mean() < min_similarity:
+                    continue
+                candidate = {
+                    "key": entry["key"],
+                    "raw_score": entry["raw_score"],
+                    "frames_matched": int(matched.sum()),
+                    "similarity": float(matched.mean()),
+                    "distance": float(nearest[matched].mean()),
+                }
+                if best is None or (candidate["frames_matched"], -candidate["distance"]) > \
+                        (best["frames_matched"], -best["distance"]):
+                    best = candidate
+
+            self.lookups += 1
+            if best is not None:
+                self.hits += 1
+            hit_rate = self.hits / self.lookups
+
+        metrics.observe("fingerprint_lookup_seconds", time.perf_counter() - start)
+        metrics.set_gauge("fingerprint_hit_rate", hit_rate)
+        return best
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "lookups": self.lookups,
+                "hit_rate": self.hits / self.lookups if self.lookups else None,
+            }
@@ -0,0 +1,431 @@
+"""
+Deepfake Detection Inference Daemon
+Standalone process that owns the ModelManager and batches forward passes,
+plus the client used by API front-ends to reach it over a Unix domain socket
+"""
+
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+
+
+# ============================================================================
+# WIRE PROTOCOL
+# ============================================================================
+#
+# Every message is a fixed 12-byte header followed by a JSON metadata block
+# and an optional raw binary blob (used to ship video bytes):
+#
+#   magic (2s) | version (B) | opcode (B) | meta_len (I) | blob_len (I)
+#
+
+MAGIC = b"DF"
+PROTOCOL_VERSION = 1
+HEADER = struct.Struct("!2sBBII")
+
+OP_PING = 0x01
+OP_PREDICT_PATH = 0x02
+OP_PREDICT_BYTES = 0x03
+OP_PREDICT_IMAGES = 0x04
+OP_PONG = 0x81
+OP_RESULT = 0x82
+OP_ERROR = 0x8F
+
+MAX_META_BYTES = 1 << 20
+# Blobs carry frame sets, so the cap follows the API's MAX_FRAME_SET_MB
+MAX_BLOB_BYTES = int(float(os.getenv("INFERENCE_MAX_BLOB_MB", "256")) * (1 << 20))
+
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), "deepfake-inference.sock")
+
+
+class ProtocolError(Exception):
+    """Raised when a peer sends a malformed frame"""
+
+
+def _recv_exact(sock, size: int) -> bytes:
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            raise ConnectionError("Connection closed by peer")
+        received += n
+    return bytes(buf)
+
+
+def send_message(sock, opcode: int, meta=None, blob: bytes = b""):
+    """Send one framed message"""
+    meta_bytes = json.dumps(meta or {}, separators=(",", ":")).encode("utf-8")
+    header = HEADER.pack(MAGIC, PROTOCOL_VERSION, opcode, len(meta_bytes), len(blob))
+    sock.sendall(header + meta_bytes)
+    if blob:
+        sock.sendall(blob)
+
+
+def recv_message(sock):
+    """Receive one framed message, returns (opcode, meta, blob)"""
+    magic, version, opcode, meta_len, blob_len = HEADER.unpack(_recv_exact(sock, HEADER.size))
+
+    if magic != MAGIC or version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Bad frame header (magic={magic!r}, version={version})")
+    if meta_len > MAX_META_BYTES or blob_len > MAX_BLOB_BYTES:
+        raise ProtocolError("Frame too large")
+
+    meta = json.loads(_recv_exact(sock, meta_len)) if meta_len else {}
+    blob = _recv_exact(sock, blob_len) if blob_len else b""
+    return opcode, meta, blob
+
+
+# ============================================================================
+# INFERENCE DAEMON
+# ============================================================================
+
+class InferenceDaemon:
+    """
+    Serves ModelManager over a Unix domain socket
+    Each connection preprocesses its own video or frame set on a handler
+    thread; the forward passes of concurrent requests are coalesced into one batch
+    """
+
+    def __init__(self, model_manager, socket_path=DEFAULT_SOCKET_PATH,
+                 max_batch_size=8, max_wait_ms=5.0, socket_mode=0o600, path_roots=None):
+        self.model_manager = model_manager
+        self.socket_path = socket_path
+        # Owner-only by default: anyone who can connect can make the daemon read files
+        self.socket_mode = socket_mode
+        # OP_PREDICT_PATH only reads files under these directories (the API's temp dir by default)
+        self.path_roots = [os.path.realpath(root) for root in (path_roots or [tempfile.gettempdir()])]
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._server = None
+
+    def submit(self, clip) -> Future:
+        """Queue a preprocessed (T, 3, H, W) clip for the next batch"""
+        future = Future()
+        self._queue.put((clip, future))
+        return future
+
+    def _batch_loop(self):
+        import torch
+
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            clips = [clip for clip, _ in batch]
+            futures = [future for _, future in batch]
+            # Clips and the stacked batch are pooled buffers, recycled after the forward
+            pool = self.model_manager.preprocessor.clips
+            stacked = pool.acquire((len(clips),) + tuple(clips[0].shape))
+            try:
+                results = self.model_manager.predict_clips(torch.stack(clips, out=stacked))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            finally:
+                for clip in clips:
+                    pool.release(clip)
+                pool.release(stacked)
+
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+    def predict(self, video_path: str, cache_key=None):
+        """Preprocess on the calling thread, then wait for the batched forward"""
+        shortcut = self.model_manager.prefilter(video_path)
+        if shortcut is not None:
+            return shortcut
+
+        start = time.perf_counter()
+        info = {}
+        frames = self.model_manager.preprocessor.extract_frames(video_path, info, content_key=cache_key)
+        # Whole clips are batched here, so only cached face boxes are reused
+        info.pop("frame_keys", None)
+        try:
+            hashes, match = self.model_manager.near_duplicate(frames, info["frames_real"])
+        except Exception:
+            self.model_manager.preprocessor.clips.release(frames)
+            raise
+        if match is not None and match["reused"]:
+            self.model_manager.preprocessor.clips.release(frames)
+            return dict(self.model_manager.duplicate_result(match), **info)
+
+        result = self.submit(frames).result()
+        self.model_manager.remember(cache_key, hashes, result)
+        self.model_manager.observe_full_pass(time.perf_counter() - start)
+        if match is not None:
+            result["near_duplicate"] = self.model_manager.describe_match(match)
+        return dict(result, **info)
+
+    def predict_images(self, images):
+        """Decode and preprocess a frame set on the calling thread, then wait for the batched forward"""
+        from backend import decode_images
+
+        frames = decode_images(images)
+        clip, count = self.model_manager.preprocessor.clip_from_frames(frames)
+        result = self.submit(clip).result()
+        result["frames_analyzed"] = count
+        return result
+
+    def allowed_path(self, path: str) -> str:
+        """The resolved path if it lies under one of path_roots, else PermissionError"""
+        resolved = os.path.realpath(path)
+        for root in self.path_roots:
+            if os.path.commonpath([resolved, root]) == root:
+                return resolved
+        raise PermissionError(f"Path is outside the daemon's allowed directories: {path}")
+
+    def _handle(self, opcode: int, meta: dict, blob: bytes):
+        if opcode == OP_PING:
+            return OP_PONG, {
+                "device": str(self.model_manager.device),
+                "model_loaded": self.model_manager.model is not None,
+                "threshold": self.model_manager.threshold,
+                "max_batch_size": self.max_batch_size,
+            }
+
+        if opcode == OP_PREDICT_PATH:
+            return OP_RESULT, self.predict(self.allowed_path(meta["path"]), meta.get("cache_key"))
+
+        if opcode == OP_PREDICT_BYTES:
+            tmp_path = None
+            try:
+                with tempfile.NamedTemporaryFile(delete=False, suffix=meta.get("suffix", "")) as tmp:
+                    tmp.write(blob)
+                    tmp_path = tmp.name
+                return OP_RESULT, self.predict(tmp_path)
+            finally:
+                if tmp_path and os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+
+        if opcode == OP_PREDICT_IMAGES:
+            # Blob is the encoded images back to back, meta carries their sizes
+            images, offset = [], 0
+            for size in meta["sizes"]:
+                images.append(blob[offset:offset + size])
+                offset += size
+            return OP_RESULT, self.predict_images(images)
+
+        raise ProtocolError(f"Unknown opcode: {opcode:#x}")
+
+    def _make_handler(self):
+        daemon = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        opcode, meta, blob = recv_message(self.request)
+                    except (ConnectionError, ProtocolError):
+                        return
+
+                    try:
+                        reply_op, reply = daemon._handle(opcode, meta, blob)
+                    except Exception as e:
+                        reply_op, reply = OP_ERROR, {"type": type(e).__name__, "detail": str(e)}
+
+                    try:
+                        send_message(self.request, reply_op, reply)
+                    except OSError:
+                        return
+
+        return Handler
+
+    def serve_forever(self):
+        """Bind the socket and serve until interrupted"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        threading.Thread(target=self._batch_loop, daemon=True).start()
+
+        # Restrict the socket before it starts listening, so no connection predates the chmod
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, self._make_handler(),
+                                                              bind_and_activate=False)
+        self._server.daemon_threads = True
+        try:
+            self._server.server_bind()
+            os.chmod(self.socket_path, self.socket_mode)
+            self._server.server_activate()
+        except BaseException:
+            self._server.server_close()
+            raise
+        print(f"✅ Inference daemon listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+class RemoteModelManager:
+    """
+    Drop-in replacement for ModelManager that forwards work to an InferenceDaemon
+    Keeps one persistent connection per calling thread
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, timeout=300.0, status_seconds=5.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        # Pings answering status() are reused for this long
+        self.status_seconds = status_seconds
+        self._local = threading.local()
+        self._status = None
+        self._status_at = None
+
+    def _connection(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _reset(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = None
+
+    def _call(self, opcode: int, meta=None, blob: bytes = b""):
+        # A stale pooled connection gets one retry on a fresh socket
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                send_message(sock, opcode, meta, blob)
+                reply_op, reply, _ = recv_message(sock)
+                break
+            except (ConnectionError, BrokenPipeError, ProtocolError):
+                self._reset()
+                if attempt:
+                    raise
+            except OSError:
+                self._reset()
+                raise
+
+        if reply_op == OP_ERROR:
+            if reply.get("type") == "ValueError":
+                raise ValueError(reply.get("detail"))
+            if reply.get("type") == "PermissionError":
+                raise PermissionError(reply.get("detail"))
+            raise RuntimeError(f"{reply.get('type')}: {reply.get('detail')}")
+        return reply
+
+    def ping(self):
+        """Return daemon status, or None when it is unreachable"""
+        try:
+            return self._call(OP_PING)
+        except OSError:
+            return None
+
+    def status(self, refresh: bool = False):
+        """
+        Daemon status from the last ping, pinging again once it is older than
+        status_seconds (or with refresh); None while the daemon is unreachable
+        Blocks on the socket when it pings, so call it off the event loop
+        """
+        now = time.monotonic()
+        if refresh or self._status_at is None or now - self._status_at >= self.status_seconds:
+            self._status = self.ping()
+            self._status_at = now
+        return self._status
+
+    def model_loaded(self, refresh: bool = False) -> bool:
+        """True when the daemon is reachable and has a model loaded (see status)"""
+        status = self.status(refresh)
+        return bool(status and status.get("model_loaded"))
+
+    def predict(self, video_path: str, cache_key=None):
+        """
+        Score a video the daemon can read from the shared filesystem
+        cache_key (the content hash) lets the daemon reuse its probed frame index
+        """
+        return self._call(OP_PREDICT_PATH, {"path": os.path.abspath(video_path), "cache_key": cache_key})
+
+    def predict_bytes(self, data: bytes, suffix: str = ".mp4"):
+        """Score a video by shipping its bytes to the daemon"""
+        return self._call(OP_PREDICT_BYTES, {"suffix": suffix}, data)
+
+    def predict_images(self, images):
+        """Score encoded still images / extracted frames as one frame set"""
+        return self._call(OP_PREDICT_IMAGES, {"sizes": [len(i) for i in images]}, b"".join(images))
+
+
+# ============================================================================
+# MAIN ENTRY POINT
+# ============================================================================
+
+def main():
+    import argparse
+
+    from backend import (
+        ModelManager, MODEL_PATH, MODEL_ARCH, THRESHOLD, CASCADE_ENABLED, CASCADE_OPTIONS,
+        WARMUP_BATCH_SIZES, WARMUP_ITERATIONS, BATCH_MANIFEST_ROOT, probe_device
+    )
+
+    parser = argparse.ArgumentParser(description="Deepfake detection inference daemon")
+    parser.add_argument("--socket", default=os.getenv("INFERENCE_SOCKET", DEFAULT_SOCKET_PATH))
+    parser.add_argument("--max-batch-size", type=int, default=int(os.getenv("INFERENCE_MAX_BATCH", "8")))
+    parser.add_argument("--max-wait-ms", type=float, default=float(os.getenv("INFERENCE_MAX_WAIT_MS", "5")))
+    parser.add_argument("--socket-mode", type=lambda mode: int(mode, 8),
+                        default=os.getenv("INFERENCE_SOCKET_MODE", "600"),
+                        help="Octal permissions of the socket (e.g. 660 to let the API's group connect)")
+    args = parser.parse_args()
+
+    device = probe_device()
+    model_manager = ModelManager(MODEL_PATH, device=device, threshold=THRESHOLD, architecture=MODEL_ARCH,
+                                 cascade=CASCADE_ENABLED and CASCADE_OPTIONS)
+    # Warm up at the batch sizes the daemon coalesces requests into, before accepting connections
+    if WARMUP_BATCH_SIZES:
+        model_manager.warmup(sorted(set(WARMUP_BATCH_SIZES) | {args.max_batch_size}), WARMUP_ITERATIONS)
+    daemon = InferenceDaemon(
+        model_manager,
+        socket_path=args.socket,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        socket_mode=args.socket_mode,
+        # Uploads are spooled to the temp dir; batch manifests point under their own root
+        path_roots=[tempfile.gettempdir()] + ([BATCH_MANIFEST_ROOT] if BATCH_MANIFEST_ROOT else [])
+    )
+    print(f"   Device: {device}")
+    print(f"   Max batch size: {args.max_batch_size}, max wait: {args.max_wait_ms} ms")
+
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        print("Inference daemon stopped")
+
+
+if __name__ == "__main__":
+    main()
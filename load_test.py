@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+"""
+Load Test Script
+Drives the API with a mix of /predict, /predict/batch and /health requests
+on synthetic videos, sweeping closed-loop concurrency or open-loop arrival
+rates. Reports throughput, latency percentiles, error rates and the server's
+CPU / RSS over time, as JSON that can be compared between versions
+
+    python load_test.py --concurrency 1 2 4 8 --duration 30 --json v1.json
+    python load_test.py --mode open --rates 0.5 1 2 4 --json v2.json --baseline v1.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import httpx
+import numpy as np
+
+
+ROOT = Path(__file__).resolve().parent
+KINDS = ["predict", "batch", "health"]
+
+# The server under test should run the model on every request: no per-client
+# quotas, no result cache or near-duplicate reuse, audit log in a temp dir.
+# Virtual users share an address, so they are told apart by X-Client-ID
+SERVER_ENV = {
+    "INTERACTIVE_RATE": "0",
+    "BULK_RATE": "0",
+    "TRUST_CLIENT_ID": "1",
+    "RESULT_CACHE_SIZE": "0",
+    "FINGERPRINT_MODE": "off",
+}
+
+
+# ============================================================================
+# SYNTHETIC CORPUS
+# ============================================================================
+
+def make_video(path: Path, portrait, seed: int, num_frames: int, width: int, height: int, fps: int = 25):
+    """A portrait drifting over a noisy background (so face detection has work to do)"""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    rng = np.random.default_rng(seed)
+    background = cv2.resize(rng.integers(0, 255, (8, 8, 3), dtype=np.uint8), (width, height),
+                            interpolation=cv2.INTER_CUBIC)
+    if portrait is not None:
+        scale = 0.6 * height / portrait.shape[0]
+        portrait = cv2.resize(portrait, (int(portrait.shape[1] * scale), int(portrait.shape[0] * scale)))
+        portrait = portrait[:, :width // 2]
+
+    for i in range(num_frames):
+        frame = background.copy()
+        if portrait is not None:
+            ph, pw = portrait.shape[:2]
+            x = (width - pw) // 2 + int(width * 0.1 * np.sin(i / 10 + seed))
+            y = (height - ph) // 2
+            frame[y:y + ph, x:x + pw] = portrait
+        writer.write(frame)
+    writer.release()
+    return path.read_bytes()
+
+
+def make_corpus(count: int, num_frames: int, width: int, height: int, portraits: Path):
+    images = [cv2.imread(str(p)) for p in sorted(portraits.glob("*")) if p.suffix.lower() in {".jpg", ".jpeg", ".png"}]
+    images = [image for image in images if image is not None] or [None]
+    with tempfile.TemporaryDirectory() as tmp:
+        return [make_video(Path(tmp) / f"load_{i}.mp4", images[i % len(images)], i, num_frames, width, height)
+                for i in range(count)]
+
+
+# ============================================================================
+# RESOURCE SAMPLING
+# ============================================================================
+
+class ProcessSampler:
+    """
+    Samples CPU % and RSS of a process and its children from /proc every
+    interval seconds (Linux only; elsewhere the timeline stays empty)
+    """
+
+    def __init__(self, pid: int, interval: float = 1.0):
+        self.pid = pid
+        self.interval = interval
+        self.ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self.page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _tree(self):
+        """pid plus its descendants (uvicorn --workers children)"""
+        parents = {}
+        for entry in Path("/proc").iterdir():
+            if entry.name.isdigit():
+                try:
+                    fields = (entry / "stat").read_text().rsplit(")", 1)[1].split()
+                    parents.setdefault(int(fields[1]), []).append(int(entry.name))
+                except (OSError, IndexError):
+                    continue
+        pids, stack = [], [self.pid]
+        while stack:
+            pid = stack.pop()
+            pids.append(pid)
+            stack.extend(parents.get(pid, []))
+        return pids
+
+    def _read(self):
+        """(cpu seconds, rss bytes) summed over the process tree"""
+        cpu, rss = 0.0, 0
+        for pid in self._tree():
+            try:
+                fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+                # utime and stime are fields 14 and 15 of stat (12 and 13 after the command name)
+                cpu += (int(fields[11]) + int(fields[12])) / self.ticks
+                rss += int(Path(f"/proc/{pid}/statm").read_text().split()[1]) * self.page_size
+            except (OSError, IndexError):
+                continue
+        return cpu, rss
+
+    def _run(self):
+        last_cpu, _ = self._read()
+        last = time.monotonic()
+        while not self._stop.wait(self.interval):
+            cpu, rss = self._read()
+            now = time.monotonic()
+            self.samples.append({
+                "t": now,
+                "cpu_percent": 100 * (cpu - last_cpu) / (now - last),
+                "rss_mb": rss / 2 ** 20,
+            })
+            last_cpu, last = cpu, now
+
+    def start(self):
+        if Path(f"/proc/{self.pid}/stat").exists():
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def window(self, start: float, end: float):
+        """Samples taken between two time.monotonic() instants, with t relative to start"""
+        return [dict(s, t=round(s["t"] - start, 2)) for s in self.samples if start <= s["t"] <= end]
+
+
+# ============================================================================
+# TARGETS
+# ============================================================================
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def server_env(overrides):
+    env = dict(SERVER_ENV, AUDIT_LOG_DIR=tempfile.mkdtemp(prefix="load_test_audit_"))
+    for item in overrides:
+        key, _, value = item.partition("=")
+        env[key] = value
+    return env
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            # /ready only answers 200 once the model is loaded and warmed up
+            response = await client.get("/ready")
+            if response.status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise SystemExit(f"❌ Server not ready after {timeout:.0f}s")
+
+
+class Target:
+    """The server under test: a uvicorn subprocess, the app in-process, or an existing URL"""
+
+    def __init__(self, args):
+        self.args = args
+        self.process = None
+        self.app = None
+        self.pid = args.pid
+
+    async def __aenter__(self):
+        args = self.args
+        if args.target == "spawn":
+            port = free_port()
+            env = dict(os.environ, **server_env(args.server_env))
+            self.process = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "backend:app", "--host", "127.0.0.1", "--port", str(port),
+                 "--workers", str(args.workers), "--log-level", "warning"],
+                cwd=ROOT, env=env
+            )
+            self.pid = self.process.pid
+            transport, base_url = httpx.AsyncHTTPTransport(), f"http://127.0.0.1:{port}"
+        elif args.target == "inprocess":
+            # Configuration is read at import, so set it before importing the app
+            os.environ.update(server_env(args.server_env))
+            sys.path.insert(0, str(ROOT))
+            from backend import app
+            self.app = app
+            await app.router.startup()
+            self.pid = os.getpid()
+            transport, base_url = httpx.ASGITransport(app=app), "http://load-test"
+        else:
+            transport, base_url = httpx.AsyncHTTPTransport(), args.url
+
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        self.client = httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout, limits=limits)
+        await wait_ready(self.client, args.startup_timeout)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+        if self.app is not None:
+            await self.app.router.shutdown()
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+# ============================================================================
+# TRAFFIC
+# ============================================================================
+
+class Traffic:
+    """Builds and sends one request of a randomly drawn kind, recording its outcome"""
+
+    def __init__(self, client, corpus, mix, batch_size: int, unique: bool, seed: int = 0):
+        self.client = client
+        self.corpus = corpus
+        self.kinds, self.weights = zip(*mix.items())
+        self.batch_size = batch_size
+        self.unique = unique
+        self.rng = random.Random(seed)
+        self.records = []
+
+    def payload(self):
+        data = self.rng.choice(self.corpus)
+        # Trailing bytes after the last MP4 box are ignored by decoders but change the content hash
+        return data + os.urandom(16) if self.unique else data
+
+    async def send(self, user: int, measure_after: float):
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        headers = {"X-Client-ID": f"load-{user}"}
+        start = time.monotonic()
+        status, error, videos = None, None, 0
+        try:
+            if kind == "predict":
+                response = await self.client.post("/predict", headers=headers,
+                                                  files={"file": ("load.mp4", self.payload(), "video/mp4")})
+            elif kind == "batch":
+                files = [("files", (f"load_{i}.mp4", self.payload(), "video/mp4")) for i in range(self.batch_size)]
+                response = await self.client.post("/predict/batch", headers=headers, files=files)
+            else:
+                response = await self.client.get("/health", headers=headers)
+            status = response.status_code
+            videos = {"predict": 1, "batch": self.batch_size}.get(kind, 0)
+            if kind == "batch" and status == 200:
+                failed = sum(1 for item in response.json()["predictions"] if item.get("error"))
+                if failed:
+                    error = f"{failed} batch items failed"
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+
+        end = time.monotonic()
+        if start >= measure_after:
+            self.records.append({"kind": kind, "start": start, "end": end, "latency": end - start,
+                                 "status": status, "ok": status == 200 and error is None, "error": error,
+                                 "videos": videos})
+
+
+async def closed_loop(traffic: Traffic, concurrency: int, warmup: float, duration: float):
+    """concurrency users, each sending its next request as soon as the previous one returns"""
+    measure_after = time.monotonic() + warmup
+    stop = measure_after + duration
+
+    async def user(n):
+        while time.monotonic() < stop:
+            await traffic.send(n, measure_after)
+
+    await asyncio.gather(*(user(n) for n in range(concurrency)))
+    return measure_after, stop
+
+
+async def open_loop(traffic: Traffic, rate: float, warmup: float, duration: float, max_outstanding: int):
+    """Poisson arrivals at rate/s regardless of completions (the way independent clients behave)"""
+    measure_after = time.monotonic() + warmup
+    stop = measure_after + duration
+    rng = random.Random(1)
+    tasks = set()
+    skipped = 0
+    n = 0
+    while True:
+        await asyncio.sleep(rng.expovariate(rate))
+        if time.monotonic() >= stop:
+            break
+        tasks = {t for t in tasks if not t.done()}
+        if len(tasks) >= max_outstanding:
+            # The client itself is saturated; count it instead of queueing without bound
+            skipped += time.monotonic() >= measure_after
+            continue
+        tasks.add(asyncio.create_task(traffic.send(n, measure_after)))
+        n += 1
+    await asyncio.gather(*tasks)
+    return measure_after, stop, skipped
+
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+def latency_summary(latencies):
+    if not latencies:
+        return None
+    values = np.array(latencies)
+    return {
+        "count": len(values),
+        "mean": float(values.mean()),
+        **{f"p{q}": float(np.percentile(values, q)) for q in (50, 90, 95, 99)},
+        "max": float(values.max()),
+    }
+
+
+def summarize(records, start: float, end: float, samples):
+    """Throughput over the measurement window, latency of successful requests, errors by status"""
+    span = max(end - start, 1e-9)
+    ok = [r for r in records if r["ok"]]
+    statuses = {}
+    for r in records:
+        label = str(r["status"]) if r["error"] is None else (r["error"] if r["status"] is None else f"{r['status']} ({r['error']})")
+        statuses[label] = statuses.get(label, 0) + 1
+
+    per_kind = {}
+    for kind in KINDS:
+        rows = [r for r in records if r["kind"] == kind]
+        if rows:
+            per_kind[kind] = {
+                "requests": len(rows),
+                "errors": sum(not r["ok"] for r in rows),
+                "throughput": sum(r["ok"] for r in rows) / span,
+                "latency": latency_summary([r["latency"] for r in rows if r["ok"]]),
+            }
+
+    cpu = [s["cpu_percent"] for s in samples]
+    rss = [s["rss_mb"] for s in samples]
+    return {
+        "requests": len(records),
+        "completed": len(ok),
+        "errors": len(records) - len(ok),
+        "error_rate": (len(records) - len(ok)) / len(records) if records else 0.0,
+        "rejected_429": sum(r["status"] == 429 for r in records),
+        "throughput": len(ok) / span,
+        "videos_per_second": sum(r["videos"] for r in ok) / span,
+        "latency": latency_summary([r["latency"] for r in ok]),
+        "statuses": statuses,
+        "by_kind": per_kind,
+        "resources": {
+            "cpu_percent_mean": statistics.mean(cpu) if cpu else None,
+            "cpu_percent_max": max(cpu) if cpu else None,
+            "rss_mb_max": max(rss) if rss else None,
+            "timeline": samples,
+        },
+    }
+
+
+def print_step(label, step):
+    latency = step["latency"] or {}
+    resources = step["resources"]
+    cpu = f"{resources['cpu_percent_mean']:>5.0f}%" if resources["cpu_percent_mean"] is not None else "     -"
+    rss = f"{resources['rss_mb_max']:>6.0f}" if resources["rss_mb_max"] is not None else "     -"
+    print(f"   {label:<10} {step['throughput']:>7.2f} {step['videos_per_second']:>8.2f} {latency.get('p50', float('nan')) * 1000:>8.0f} "
+          f"{latency.get('p95', float('nan')) * 1000:>8.0f} {latency.get('p99', float('nan')) * 1000:>8.0f} "
+          f"{step['error_rate']:>6.1%} {cpu} {rss}")
+
+
+def change(new, before):
+    return f"{(new - before) / before:+.1%}" if before else "-"
+
+
+def compare(steps, baseline_path):
+    """Throughput and p95 change per sweep level against an earlier run"""
+    baseline = {s["level"]: s for s in json.loads(Path(baseline_path).read_text())["steps"]}
+    print(f"\n🔁 Against {baseline_path}")
+    print(f"   {'level':<10} {'req/s':>16} {'p95 ms':>18} {'errors':>14}")
+    for step in steps:
+        old = baseline.get(step["level"])
+        if old is None:
+            continue
+        new_p95 = (step["latency"] or {}).get("p95")
+        old_p95 = (old["latency"] or {}).get("p95")
+        p95 = f"{old_p95 * 1000:.0f}→{new_p95 * 1000:.0f} {change(new_p95, old_p95)}" if new_p95 and old_p95 else "-"
+        print(f"   {step['label']:<10} {old['throughput']:>6.2f}→{step['throughput']:<5.2f} "
+              f"{change(step['throughput'], old['throughput']):>5} {p95:>18} "
+              f"{old['error_rate']:>5.1%}→{step['error_rate']:.1%}")
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    import torch
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "cuda": torch.cuda.is_available(),
+        "cpus": os.cpu_count(),
+        "platform": platform.platform(),
+    }
+
+
+def parse_mix(text: str):
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in KINDS:
+            raise SystemExit(f"❌ Unknown request kind '{kind}'. Allowed: {', '.join(KINDS)}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+async def run(args):
+    mix = parse_mix(args.mix)
+    levels = args.rates if args.mode == "open" else args.concurrency
+
+    print("🚀 Load Test")
+    print("=" * 50)
+    print(f"   Target: {args.target}{' ' + args.url if args.target == 'url' else ''}")
+    print(f"   Mode: {args.mode}-loop, {'rates' if args.mode == 'open' else 'concurrency'} {levels}")
+    print(f"   Mix: {', '.join(f'{k} {w:g}' for k, w in mix.items())} (batches of {args.batch_size})")
+    print(f"   Steps: {args.warmup:g}s warm-up + {args.duration:g}s measured")
+
+    corpus = make_corpus(args.videos, args.frames, args.width, args.height, args.portraits)
+    print(f"   Corpus: {len(corpus)} synthetic videos, {args.frames} frames at {args.width}x{args.height}")
+
+    steps = []
+    async with Target(args) as target:
+        sampler = ProcessSampler(target.pid, args.sample_interval) if target.pid else None
+        if sampler is not None:
+            sampler.start()
+        else:
+            print("⚠️ No server pid (pass --pid for an external server); CPU/RSS not sampled")
+
+        print(f"\n   {'level':<10} {'req/s':>7} {'videos/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6} {'CPU':>6} {'RSS MB':>6}")
+        for level in levels:
+            traffic = Traffic(target.client, corpus, mix, args.batch_size, not args.no_unique, seed=len(steps))
+            skipped = 0
+            if args.mode == "open":
+                start, end, skipped = await open_loop(traffic, level, args.warmup, args.duration, args.max_outstanding)
+                label = f"{level:g}/s"
+            else:
+                start, end = await closed_loop(traffic, int(level), args.warmup, args.duration)
+                label = f"c={int(level)}"
+            # Requests still running at the end of the window count towards it
+            end = max([end] + [r["end"] for r in traffic.records])
+            samples = sampler.window(start, end) if sampler is not None else []
+            step = dict(mode=args.mode, level=level, label=label, client_skipped=skipped,
+                        **summarize(traffic.records, start, end, samples))
+            steps.append(step)
+            print_step(label, step)
+
+        if sampler is not None:
+            sampler.stop()
+
+    best = max(steps, key=lambda s: s["throughput"])
+    print(f"\n📊 Peak throughput {best['throughput']:.2f} req/s ({best['videos_per_second']:.2f} videos/s) at {best['label']}")
+    errors = [s for s in steps if s["error_rate"] > args.max_error_rate]
+    if errors:
+        print(f"⚠️ Error rate above {args.max_error_rate:.0%} from {errors[0]['label']} "
+              f"({', '.join(f'{k}: {v}' for k, v in errors[0]['statuses'].items())})")
+
+    if args.baseline:
+        compare(steps, args.baseline)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "config": {k: str(v) for k, v in vars(args).items()},
+                "environment": environment(),
+                "steps": steps,
+            }, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API and report its throughput / latency curve")
+    parser.add_argument("--target", choices=["spawn", "inprocess", "url"], default="spawn",
+                        help="spawn: uvicorn subprocess; inprocess: ASGI client in this process; url: running server")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--pid", type=int, help="Process to sample CPU / RSS from with --target url")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --target spawn")
+    parser.add_argument("--server-env", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="Extra server configuration for spawn / inprocess (e.g. ADMISSION_SLOTS=4)")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--rates", type=float, nargs="+", default=[0.5, 1, 2, 4], help="Open-loop requests/sec")
+    parser.add_argument("--max-outstanding", type=int, default=256, help="Open-loop cap on requests in flight")
+    parser.add_argument("--mix", default="predict=8,batch=1,health=1", help="Relative weights per request kind")
+    parser.add_argument("--batch-size", type=int, default=4, help="Videos per /predict/batch request")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds per step")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before each step")
+    parser.add_argument("--videos", type=int, default=8, help="Synthetic videos in the corpus")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--portraits", type=Path, default=ROOT / "public",
+                        help="Faces pasted into the synthetic videos")
+    parser.add_argument("--no-unique", action="store_true",
+                        help="Send identical bytes for repeated videos (lets the server's caches hit)")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--startup-timeout", type=float, default=300)
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between CPU / RSS samples")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Flag steps above this error rate")
+    parser.add_argument("--baseline", help="Earlier --json output to compare against")
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
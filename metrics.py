@@ -0,0 +1,86 @@
+"""
+In-process metrics registry
+Thread-safe counters, gauges and timing summaries exposed by the /metrics endpoint
+"""
+
+import threading
+from collections import deque
+
+
+# Recent observations kept per timing summary for percentiles
+RECENT_OBSERVATIONS = 1024
+
+
+def _percentile(ordered, q: float) -> float:
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def _key(name: str, labels: dict) -> str:
+    if not labels:
+        return name
+    inner = ",".join(f"{k}={labels[k]}" for k in sorted(labels))
+    return f"{name}{{{inner}}}"
+
+
+class Metrics:
+    """Minimal metrics store, keyed by name plus optional labels"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._timings = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Increment a monotonically increasing counter"""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        """Record the current value of a gauge"""
+        key = _key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Add one observation to a timing summary"""
+        key = _key(name, labels)
+        with self._lock:
+            summary = self._timings.get(key)
+            if summary is None:
+                summary = self._timings[key] = {
+                    "count": 0, "sum": 0.0, "max": 0.0, "recent": deque(maxlen=RECENT_OBSERVATIONS)
+                }
+            summary["count"] += 1
+            summary["recent"].append(seconds)
+            summary["sum"] += seconds
+            summary["max"] = max(summary["max"], seconds)
+
+    def snapshot(self):
+        """
+        Return a JSON-serializable copy of all metrics
+        Timing percentiles (p50/p95/p99) cover the most recent observations
+        """
+        with self._lock:
+            timings = {}
+            for key, summary in self._timings.items():
+                ordered = sorted(summary["recent"])
+                timings[key] = {
+                    "count": summary["count"],
+                    "sum": summary["sum"],
+                    "max": summary["max"],
+                    "mean": summary["sum"] / summary["count"],
+                    "p50": _percentile(ordered, 0.50),
+                    "p95": _percentile(ordered, 0.95),
+                    "p99": _percentile(ordered, 0.99),
+                }
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": timings,
+            }
+
+
+# Process-wide registry
+metrics = Metrics()
@@ -0,0 +1,222 @@
+"""
+Model architectures
+ResNet50 + BiLSTM detector, its parallel temporal heads and the distilled
+lightweight students. Kept apart from backend.py so training scripts can
+build models without importing the API
+"""
+
+import torch
+import torch.nn as nn
+
+
+# ============================================================================
+# TEMPORAL HEADS
+# ============================================================================
+
+class AttentionPooling(nn.Module):
+    """Softmax-weighted average of (B, T, D) features over time"""
+
+    def __init__(self, dim):
+        super().__init__()
+        self.score = nn.Linear(dim, 1)
+
+    def forward(self, feats):
+        weights = torch.softmax(self.score(feats), dim=1)  # (B, T, 1)
+        return (weights * feats).sum(dim=1)
+
+
+class TemporalConvPooling(nn.Module):
+    """Two 1D convolutions over time (kernel 3), then mean + max pooling"""
+
+    def __init__(self, dim, hidden=256):
+        super().__init__()
+        self.conv = nn.Sequential(
+            nn.Conv1d(dim, hidden, kernel_size=3, padding=1),
+            nn.ReLU(inplace=True),
+            nn.Conv1d(hidden, hidden, kernel_size=3, padding=1),
+            nn.ReLU(inplace=True)
+        )
+
+    def forward(self, feats):
+        out = self.conv(feats.transpose(1, 2))  # (B, hidden, T)
+        return torch.cat([out.mean(dim=2), out.amax(dim=2)], dim=1)
+
+
+class StatPooling(nn.Module):
+    """Parameter-free mean or max over time"""
+
+    def __init__(self, mode="mean"):
+        super().__init__()
+        self.mode = mode
+
+    def forward(self, feats):
+        return feats.mean(dim=1) if self.mode == "mean" else feats.amax(dim=1)
+
+
+# Temporal heads over per-frame trunk features; all but bilstm run every frame in parallel
+TEMPORAL_HEADS = ["bilstm", "attention", "tconv", "mean", "max"]
+
+
+# ============================================================================
+# DETECTORS
+# ============================================================================
+
+class ResNet50BiLSTM(nn.Module):
+    """
+    ResNet50 feature extractor + BiLSTM temporal model for deepfake detection
+    Note: No sigmoid in forward pass when using BCEWithLogitsLoss during training
+    temporal_head swaps the BiLSTM for a parallel pooling head (TEMPORAL_HEADS)
+    """
+
+    # Trunk output width and the layer Grad-CAM reads (its output is cnn[:-1])
+    feature_dim = 2048
+    cam_layer = "resnet50.layer4"
+
+    def __init__(self, hidden=256, widths=None, temporal_head="bilstm", pretrained=True):
+        super().__init__()
+        # ResNet50 as feature extractor
+        # widths: per-bottleneck (conv1, conv2) channel counts of a pruned
+        # checkpoint (see prune_model.py); its weights come from the checkpoint
+        # pretrained=False skips the ImageNet download when a checkpoint's
+        # weights are loaded over the trunk anyway
+        from torchvision import models
+
+        weights = models.ResNet50_Weights.IMAGENET1K_V2 if pretrained and widths is None else None
+        base = models.resnet50(weights=weights)
+        self.cnn = nn.Sequential(*list(base.children())[:-1])
+        if widths is not None:
+            resize_bottlenecks(self.bottlenecks(), widths)
+
+        self.build_temporal(temporal_head, hidden)
+
+    def build_temporal(self, temporal_head, hidden):
+        """Temporal model + classification head over feature_dim-wide frame features"""
+        self.temporal_head = temporal_head
+        self.lstm = None
+        self.pool = None
+
+        if temporal_head == "bilstm":
+            # BiLSTM for temporal modeling
+            self.lstm = nn.LSTM(self.feature_dim, hidden, batch_first=True, bidirectional=True)
+            pooled_dim = hidden * 2
+        elif temporal_head == "attention":
+            self.pool = AttentionPooling(self.feature_dim)
+            pooled_dim = self.feature_dim
+        elif temporal_head == "tconv":
+            self.pool = TemporalConvPooling(self.feature_dim, hidden)
+            pooled_dim = hidden * 2
+        elif temporal_head in ("mean", "max"):
+            self.pool = StatPooling(temporal_head)
+            pooled_dim = self.feature_dim
+        else:
+            raise ValueError(f"Unknown temporal head '{temporal_head}'. Choose from: {', '.join(TEMPORAL_HEADS)}")
+
+        # Classification head (no sigmoid - applied separately)
+        self.head = nn.Sequential(
+            nn.Linear(pooled_dim, 128),
+            nn.ReLU(inplace=True),
+            nn.Dropout(0.5),
+            nn.Linear(128, 1)
+        )
+
+    def forward(self, x):
+        # x shape: (batch, num_frames, 3, 224, 224)
+        B, T, C, H, W = x.shape
+
+        # Extract features for each frame
+        feats = self.extract_features(x.view(B * T, C, H, W))  # (B*T, 2048)
+        feats = feats.view(B, T, -1)  # (B, T, 2048)
+
+        out, _ = self.classify_features(feats)
+        return out
+
+    def bottlenecks(self):
+        """The 16 ResNet50 bottleneck blocks (layer1..layer4) in order"""
+        return [block for layer in self.cnn[4:8] for block in layer]
+
+    def extract_features(self, x, keep_activations=False):
+        """
+        Run the ResNet50 trunk on (N, 3, H, W) frames, returns (N, 2048)
+        With keep_activations also returns the last stage's (N, 2048, 7, 7) maps
+        """
+        activations = self.cnn[:-1](x)
+        feats = self.cnn[-1](activations).flatten(1)
+        return (feats, activations) if keep_activations else feats
+
+    def classify_features(self, feats, state=None):
+        """
+        BiLSTM + head over (B, T, feature_dim) trunk features
+        state is an optional (h0, c0) pair; returns (logits, (h_n, c_n))
+        Pooling heads have no recurrent state and return (logits, None)
+        """
+        if self.lstm is None:
+            return self.head(self.pool(feats)), None
+
+        # Temporal modeling with BiLSTM
+        lstm_out, state = self.lstm(feats, state)
+
+        # Use last hidden state for classification
+        return self.head(lstm_out[:, -1, :]), state
+
+
+def resize_bottlenecks(blocks, widths):
+    """
+    Rebuild bottleneck blocks with narrower inner convolutions
+    widths holds one (conv1_out, conv2_out) pair per block; block inputs and
+    outputs keep their width, so residual connections are unchanged
+    """
+    if len(widths) != len(blocks):
+        raise ValueError(f"Expected {len(blocks)} bottleneck widths, got {len(widths)}")
+
+    for block, (mid1, mid2) in zip(blocks, widths):
+        block.conv1 = nn.Conv2d(block.conv1.in_channels, mid1, kernel_size=1, bias=False)
+        block.bn1 = nn.BatchNorm2d(mid1)
+        block.conv2 = nn.Conv2d(mid1, mid2, kernel_size=3, stride=block.conv2.stride, padding=1, bias=False)
+        block.bn2 = nn.BatchNorm2d(mid2)
+        block.conv3 = nn.Conv2d(mid2, block.conv3.out_channels, kernel_size=1, bias=False)
+
+
+class StudentBiLSTM(ResNet50BiLSTM):
+    """
+    Lightweight trunk + the same BiLSTM head, distilled from ResNet50BiLSTM
+    (see distill_student.py). Trunks: MobileNetV3-Large (~0.22 GFLOPs/frame)
+    and EfficientNet-B0 (~0.39 GFLOPs/frame) vs ~4.1 for ResNet50
+    """
+
+    # torchvision builder, pretrained weights enum and member, feature width
+    # (names, so torchvision is only imported when a model is built)
+    TRUNKS = {
+        "mobilenet_v3": ("mobilenet_v3_large", "MobileNet_V3_Large_Weights.IMAGENET1K_V2", 960),
+        "efficientnet_b0": ("efficientnet_b0", "EfficientNet_B0_Weights.IMAGENET1K_V1", 1280),
+    }
+
+    def __init__(self, trunk="mobilenet_v3", hidden=256, pretrained=False, temporal_head="bilstm"):
+        nn.Module.__init__(self)
+        if trunk not in self.TRUNKS:
+            raise ValueError(f"Unknown student trunk '{trunk}'. Choose from: {', '.join(self.TRUNKS)}")
+        from torchvision import models
+
+        build, weights, self.feature_dim = self.TRUNKS[trunk]
+        self.cam_layer = f"{trunk}.features"
+        enum, member = weights.split(".")
+
+        # Convolutional features + global average pool, same layout as the ResNet50 trunk
+        base = getattr(models, build)(weights=getattr(getattr(models, enum), member) if pretrained else None)
+        self.cnn = nn.Sequential(base.features, base.avgpool)
+
+        self.build_temporal(temporal_head, hidden)
+
+
+MODEL_ARCHITECTURES = ["resnet50"] + list(StudentBiLSTM.TRUNKS)
+
+
+def build_model(architecture="resnet50", **config):
+    """
+    Instantiate a registered architecture; config holds extra constructor
+    arguments (checkpoints store both under 'architecture' / 'model_config')
+    """
+    if architecture == "resnet50":
+        return ResNet50BiLSTM(**config)
+    if architecture in StudentBiLSTM.TRUNKS:
+        return StudentBiLSTM(trunk=architecture, **config)
+    raise ValueError(f"Unknown model architecture '{architecture}'. Choose from: {', '.join(MODEL_ARCHITECTURES)}")
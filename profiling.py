@@ -0,0 +1,176 @@
+"""
+On-demand request profiling
+A capture is armed for the next N requests and/or a time window. Each
+profiled request gets a torch.profiler CPU op trace (Chrome trace format)
+and the collapsed Python stacks of a sampling profiler running on the
+request's thread, which covers decode and face detection. Only one request
+is profiled at a time; while nothing is armed the hooks cost one attribute
+check
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+
+from metrics import metrics
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed rate into collapsed-stack counts"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{Path(code.co_filename).stem}.{code.co_name}")
+                frame = frame.f_back
+            # Collapsed format lists frames root first
+            self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: Path):
+        """One 'frame;frame;frame count' line per distinct stack (flamegraph.pl / speedscope input)"""
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common()))
+
+
+class RequestProfiler:
+    """
+    Arms and runs profiling captures; captures land in directory as one
+    folder per request with torch_trace.json, torch_ops.txt and
+    python.collapsed
+    """
+
+    def __init__(self, directory="profiles", sample_hz=200):
+        self.directory = Path(directory)
+        self.sample_hz = sample_hz
+        self.armed = False
+
+        self._lock = threading.Lock()
+        # Held for the duration of a profiled request (torch.profiler is process-wide)
+        self._busy = threading.Lock()
+        self._active_thread = None
+        self._remaining = 0
+        self._deadline = None
+        self._options = {}
+        self.captures = []
+
+    def arm(self, requests: int = 0, seconds: float = 0, torch_ops: bool = True, python_stacks: bool = True):
+        """Profile the next `requests` requests and/or every request for `seconds` (whichever ends first)"""
+        if requests <= 0 and seconds <= 0:
+            raise ValueError("Give a number of requests and/or a time window")
+        with self._lock:
+            self._remaining = requests if requests > 0 else None
+            self._deadline = time.monotonic() + seconds if seconds > 0 else None
+            self._options = {"torch_ops": torch_ops, "python_stacks": python_stacks}
+            self.armed = True
+        print(f"✅ Profiling armed: {requests or 'unlimited'} requests, {seconds or 'no'} second window")
+        return self.status()
+
+    def disarm(self):
+        with self._lock:
+            self.armed = False
+            self._remaining = 0
+            self._deadline = None
+        return self.status()
+
+    def _claim(self) -> bool:
+        """Take one profiling slot if a capture is armed, still open and no request is being profiled"""
+        with self._lock:
+            if self._deadline is not None and time.monotonic() >= self._deadline:
+                self.armed = False
+            if not self.armed or not self._busy.acquire(blocking=False):
+                return False
+            if self._remaining is not None:
+                self._remaining -= 1
+                if self._remaining <= 0:
+                    self.armed = False
+            return True
+
+    @contextmanager
+    def capture(self, label: str):
+        """Profile the enclosed work if a capture is armed; otherwise do nothing"""
+        if not self.armed or not self._claim():
+            yield
+            return
+
+        options = dict(self._options)
+        folder = self.directory / f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{label}"
+        start = time.perf_counter()
+        profiler = None
+        sampler = None
+        try:
+            folder.mkdir(parents=True, exist_ok=True)
+            self._active_thread = threading.get_ident()
+            if options["torch_ops"]:
+                import torch.profiler
+                profiler = torch.profiler.profile(activities=[torch.profiler.ProfilerActivity.CPU])
+            if options["python_stacks"]:
+                sampler = StackSampler(threading.get_ident(), 1.0 / self.sample_hz)
+            with profiler or nullcontext(), sampler or nullcontext():
+                yield
+        finally:
+            self._active_thread = None
+            seconds = time.perf_counter() - start
+            try:
+                files = self._write(folder, profiler, sampler)
+                self.captures.append({"label": label, "path": str(folder), "seconds": seconds, "files": files})
+                metrics.inc("profile_captures_total")
+                print(f"📈 Profile of {label} ({seconds * 1000:.0f} ms) written to {folder}")
+            except Exception as e:
+                print(f"⚠️ Writing profile failed: {e}")
+            finally:
+                self._busy.release()
+
+    def _write(self, folder: Path, profiler, sampler):
+        files = []
+        if profiler is not None:
+            profiler.export_chrome_trace(str(folder / "torch_trace.json"))
+            (folder / "torch_ops.txt").write_text(
+                profiler.key_averages().table(sort_by="self_cpu_time_total", row_limit=40))
+            files += ["torch_trace.json", "torch_ops.txt"]
+        if sampler is not None:
+            sampler.write(folder / "python.collapsed")
+            files.append("python.collapsed")
+        return files
+
+    def stage(self, name: str):
+        """Label a stage in the torch trace of the request being profiled (no-op otherwise)"""
+        if self._active_thread is not None and self._active_thread == threading.get_ident():
+            import torch.profiler
+            return torch.profiler.record_function(name)
+        return nullcontext()
+
+    def status(self):
+        with self._lock:
+            return {
+                "armed": self.armed,
+                "remaining_requests": self._remaining if self.armed else 0,
+                "remaining_seconds": max(self._deadline - time.monotonic(), 0)
+                if self.armed and self._deadline is not None else None,
+                "directory": str(self.directory.resolve()),
+                "captures": self.captures[-20:],
+            }
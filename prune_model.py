@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Channel Pruning Script
+Removes the least active inner channels of every ResNet50 bottleneck (ranked
+on a calibration set), fine-tunes briefly against the original model, and
+writes dense, physically smaller checkpoints that ModelManager loads as-is
+
+    python prune_model.py --model model_epoch_30.pth --frames-dir /content/frames \\
+        --metadata metadata.json --levels 0.25 0.5
+"""
+
+import argparse
+import copy
+from pathlib import Path
+
+import torch
+import torch.optim as optim
+
+from models import resize_bottlenecks
+from training import (
+    compare_models, list_videos, load_checkpoint, load_labels, make_loader, print_report,
+    save_checkpoint, split_names, teacher_logits, train_epoch, write_report
+)
+
+
+@torch.no_grad()
+def channel_importance(model, loader, device):
+    """Mean post-ReLU activation of each bottleneck's bn1 / bn2 channels over the loader"""
+    sums = {}
+    count = [0]
+    hooks = []
+
+    def hook(key):
+        def record(module, inputs, output):
+            batch_mean = output.clamp(min=0).mean(dim=(0, 2, 3))
+            sums[key] = sums.get(key, 0) + batch_mean
+        return record
+
+    for i, block in enumerate(model.bottlenecks()):
+        hooks.append(block.bn1.register_forward_hook(hook((i, 1))))
+        hooks.append(block.bn2.register_forward_hook(hook((i, 2))))
+
+    model.eval()
+    try:
+        for clips, _, _ in loader:
+            model(clips.to(device))
+            count[0] += 1
+    finally:
+        for h in hooks:
+            h.remove()
+
+    return {key: value / max(count[0], 1) for key, value in sums.items()}
+
+
+def keep_count(channels: int, ratio: float, multiple: int = 8) -> int:
+    """Channels kept at a pruning ratio, rounded to a multiple of 8 for efficient kernels"""
+    kept = int(round(channels * (1 - ratio) / multiple)) * multiple
+    return min(max(kept, multiple), channels)
+
+
+def _slice_bn(bn, source, keep):
+    bn.weight.data.copy_(source.weight.data[keep])
+    bn.bias.data.copy_(source.bias.data[keep])
+    bn.running_mean.copy_(source.running_mean[keep])
+    bn.running_var.copy_(source.running_var[keep])
+
+
+@torch.no_grad()
+def prune(model, importance, ratio: float):
+    """Dense copy of model with the top channels of each bottleneck kept; returns (model, widths)"""
+    pruned = copy.deepcopy(model)
+    widths = []
+
+    for i, (block, original) in enumerate(zip(pruned.bottlenecks(), model.bottlenecks())):
+        keep1 = importance[(i, 1)].topk(keep_count(original.conv1.out_channels, ratio)).indices.sort().values
+        keep2 = importance[(i, 2)].topk(keep_count(original.conv2.out_channels, ratio)).indices.sort().values
+        widths.append([len(keep1), len(keep2)])
+
+        resize_bottlenecks([block], [(len(keep1), len(keep2))])
+        block.conv1.weight.copy_(original.conv1.weight[keep1])
+        _slice_bn(block.bn1, original.bn1, keep1)
+        block.conv2.weight.copy_(original.conv2.weight[keep2][:, keep1])
+        _slice_bn(block.bn2, original.bn2, keep2)
+        block.conv3.weight.copy_(original.conv3.weight[:, keep2])
+
+    # Rebuilt BatchNorm layers start in training mode
+    pruned.train(model.training)
+    return pruned.to(next(model.parameters()).device), widths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Channel-prune ResNet50BiLSTM into smaller dense models")
+    parser.add_argument("--model", default="model_epoch_30.pth")
+    parser.add_argument("--frames-dir", required=True, help="Face crops as written by the training notebook")
+    parser.add_argument("--metadata", help="DFDC metadata.json with REAL/FAKE labels (optional)")
+    parser.add_argument("--levels", type=float, nargs="+", default=[0.25, 0.5],
+                        help="Share of inner bottleneck channels removed per level")
+    parser.add_argument("--calibration-videos", type=int, default=64, help="Training videos used to rank channels")
+    parser.add_argument("--epochs", type=int, default=2, help="Fine-tune epochs per level (0 skips)")
+    parser.add_argument("--lr", type=float, default=5e-5)
+    parser.add_argument("--temperature", type=float, default=2.0)
+    parser.add_argument("--alpha", type=float, default=0.7, help="Weight of matching the original model vs labels")
+    parser.add_argument("--val-fraction", type=float, default=0.2)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--device", default="cuda")
+    parser.add_argument("--output-dir", type=Path, default=Path("pruned"))
+    parser.add_argument("--json", metavar="PATH", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    device = torch.device(args.device if torch.cuda.is_available() else "cpu")
+    model, architecture, config = load_checkpoint(args.model, device=device)
+    if architecture != "resnet50":
+        raise SystemExit(f"❌ Channel pruning needs a resnet50 checkpoint, got {architecture}")
+
+    labels = load_labels(args.metadata)
+    names = list_videos(args.frames_dir)
+    if not names:
+        raise SystemExit(f"❌ No cached face crops found in {args.frames_dir}")
+    train_names, val_names = split_names(names, args.val_fraction)
+
+    print("🚀 Channel Pruning")
+    print("=" * 50)
+    print(f"   Model: {args.model}")
+    print(f"   Levels: {', '.join(f'{level:.0%}' for level in args.levels)}")
+    print(f"   Videos: {len(train_names)} train, {len(val_names)} validation, {len(labels)} labelled")
+
+    # The original model's logits are the fine-tune targets and the agreement reference
+    soft_targets = teacher_logits(args.model, args.frames_dir, names, device, args.batch_size, args.workers)
+    train_targets = soft_targets[:len(train_names)]
+    val_targets = soft_targets[len(train_names):].numpy()
+
+    calibration = make_loader(args.frames_dir, train_names[:args.calibration_videos],
+                              batch_size=args.batch_size, workers=args.workers)
+    print(f"\n📏 Ranking channels on {len(calibration.dataset)} calibration videos")
+    importance = channel_importance(model, calibration, device)
+
+    train_loader = make_loader(args.frames_dir, train_names, labels, augment=True,
+                               batch_size=args.batch_size, workers=args.workers, shuffle=True)
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    entries = [(args.model, model, architecture)]
+    for level in args.levels:
+        pruned, widths = prune(model, importance, level)
+        opt = optim.Adam(pruned.parameters(), lr=args.lr)
+        for epoch in range(1, args.epochs + 1):
+            loss = train_epoch(pruned, train_loader, opt, train_targets, device, args.temperature, args.alpha,
+                               desc=f"{level:.0%} pruned, epoch {epoch}")
+            print(f"   {level:.0%} pruned, epoch {epoch}: Train Loss={loss:.4f}")
+
+        path = args.output_dir / f"{Path(args.model).stem}_pruned{round(level * 100)}.pth"
+        save_checkpoint(path, pruned, "resnet50", dict(config, widths=widths),
+                        source=str(args.model), pruning_level=level)
+
+        # Reload so the report measures exactly what ModelManager will serve
+        reloaded, _, _ = load_checkpoint(path, device=device)
+        entries.append((path, reloaded, "resnet50"))
+        print(f"✅ Saved {path}")
+
+    val_loader = make_loader(args.frames_dir, val_names, labels, batch_size=args.batch_size, workers=args.workers)
+    rows = compare_models(entries, val_loader, device, reference=val_targets)
+    for row, level in zip(rows, [0.0] + args.levels):
+        row["pruning_level"] = level
+    print_report(rows)
+
+    base = rows[0]
+    print("\n💡 Change versus the original model:")
+    for row in rows[1:]:
+        accuracy_change = (f"{(row['accuracy'] - base['accuracy']) * 100:+.1f} pts"
+                           if row["accuracy"] is not None else "n/a (no labels)")
+        print(f"   {row['pruning_level']:>4.0%} pruned: params {row['parameters'] / base['parameters']:.0%}, "
+              f"FLOPs {row['gflops_per_clip'] / base['gflops_per_clip']:.0%}, "
+              f"latency {row['latency_ms'] / base['latency_ms']:.0%}, accuracy {accuracy_change}")
+
+    if args.json:
+        write_report(args.json, args, rows)
+
+
+if __name__ == "__main__":
+    main()
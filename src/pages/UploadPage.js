@@ -61,6 +61,11 @@ const UploadPage = () => {
       // Debug: Log the raw backend response
       console.log('Raw backend response:', data);
 
+      // The cascade abstains when no face is found; that is not a REAL verdict
+      if (data.prediction === 'ABSTAIN') {
+        throw new Error('No face could be detected in this video, so it was not analyzed');
+      }
+
       // Map backend response (PredictionResponse) to UI schema
       // Backend fields: video_name, prediction ("FAKE"|"REAL"), confidence (0..1), is_fake (bool), frames_analyzed
       const mapped = [{
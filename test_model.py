@@ -14,7 +14,8 @@ from pathlib import Path
 sys.path.append('.')
 
 try:
-    from backend import ModelManager, ResNet50BiLSTM
+    from backend import ModelManager
+    from models import ResNet50BiLSTM
     print("✅ Successfully imported backend modules")
 except ImportError as e:
     print(f"❌ Failed to import backend modules: {e}")
@@ -61,20 +62,21 @@ def test_different_thresholds(model_path):
     print(f"\n🎯 Testing different thresholds for: {model_path}")
     
     try:
-        # Test with different thresholds
+        # Score once; thresholds only change the decision, not the logit
         thresholds = [0.3, 0.4, 0.5, 0.6, 0.7]
-        
+        model_manager = ModelManager(model_path, device='cpu')
+        dummy_frames = torch.randn(1, 12, 3, 224, 224)
+
+        with torch.no_grad():
+            output = model_manager.model(dummy_frames)
+
         for threshold in thresholds:
-            model_manager = ModelManager(model_path, device='cpu', threshold=threshold)
-            dummy_frames = torch.randn(1, 12, 3, 224, 224)
-            
-            with torch.no_grad():
-                output = model_manager.model(dummy_frames)
-                confidence = torch.sigmoid(output).item()
-                prediction = "FAKE" if confidence > threshold else "REAL"
-                
-            print(f"   Threshold {threshold}: confidence={confidence:.4f} → {prediction}")
-            
+            model_manager.threshold = threshold
+            result = model_manager.format_result(output.item())
+            print(f"   Threshold {threshold}: confidence={result['confidence']:.4f} → {result['prediction']}")
+
+        print("   For thresholds measured on labelled videos, run evaluate_model.py")
+
     except Exception as e:
         print(f"❌ Threshold test failed: {e}")
 
@@ -0,0 +1,76 @@
+"""
+Shared pytest setup
+The backend reads its configuration from the environment at import time, so
+the defaults here are set before any test module imports it: the small
+MobileNetV3 student (no pretrained download), no face detector, CPU, no audit
+log and a private profile directory
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("MODEL_PATH", os.path.join(tempfile.gettempdir(), "deepfake-tests-missing.pth"))
+os.environ.setdefault("MODEL_ARCH", "mobilenet_v3")
+os.environ.setdefault("FACE_DETECTOR", "none")
+os.environ.setdefault("STARTUP_MODE", "blocking")
+os.environ.setdefault("AUDIT_LOG_DIR", "")
+os.environ.setdefault("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "deepfake-tests-profiles"))
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+
+def write_video(path, frames):
+    """Write BGR uint8 frames to an mp4 at 25 fps; returns the path as a string"""
+    height, width = frames[0].shape[:2]
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 25, (width, height))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+    return str(path)
+
+
+def synthetic_frames(count=24, width=160, height=120, seed=0, edit=None):
+    """
+    A textured background with a drifting face-like ellipse; edit(frame, i)
+    can alter each frame afterwards (e.g. to fake a manipulated region)
+    """
+    rng = np.random.default_rng(seed)
+    background = rng.integers(0, 255, (height // 8, width // 8, 3), dtype=np.uint8)
+    background = cv2.resize(background, (width, height), interpolation=cv2.INTER_LINEAR)
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        centre = (width // 2 + i % 8 - 4, height // 2)
+        cv2.ellipse(frame, centre, (width // 6, height // 4), 0, 0, 360, (150, 170, 200), -1)
+        cv2.circle(frame, (centre[0] - width // 16, centre[1] - height // 12), 4, (40, 40, 40), -1)
+        cv2.circle(frame, (centre[0] + width // 16, centre[1] - height // 12), 4, (40, 40, 40), -1)
+        if edit is not None:
+            edit(frame, i)
+        frames.append(frame)
+    return frames
+
+
+@pytest.fixture
+def video(tmp_path):
+    """Factory writing a synthetic video under tmp_path: video(name, **synthetic_frames options)"""
+    def make(name="clip.mp4", **options):
+        return write_video(tmp_path / name, synthetic_frames(**options))
+    return make
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """In-process ModelManager on CPU with an untrained (seeded) student model"""
+    import torch
+    import backend
+
+    torch.manual_seed(0)
+    return backend.ModelManager(str(tmp_path / "model.pth"), device="cpu", architecture="mobilenet_v3")
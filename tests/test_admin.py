@@ -0,0 +1,30 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import backend
+from audit import AuditLog
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    log = AuditLog(tmp_path, batch_size=1, flush_seconds=0.01)
+    log.start()
+    monkeypatch.setattr(backend, "audit_log", log)
+    yield TestClient(backend.app)
+    log.close()
+
+
+@pytest.mark.parametrize("path", ["/audit/recent", "/audit/stats", "/admin/profile"])
+def test_admin_endpoints_are_disabled_without_a_token(client, monkeypatch, path):
+    monkeypatch.setattr(backend, "ADMIN_TOKEN", "")
+
+    assert client.get(path).status_code == 403
+
+
+@pytest.mark.parametrize("path", ["/audit/recent", "/audit/stats", "/admin/profile"])
+def test_admin_endpoints_check_the_token(client, monkeypatch, path):
+    monkeypatch.setattr(backend, "ADMIN_TOKEN", "secret")
+
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers={"X-Admin-Token": "wrong"}).status_code == 401
+    assert client.get(path, headers={"X-Admin-Token": "secret"}).status_code == 200
@@ -0,0 +1,205 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backend
+from admission import AdmissionController, AdmissionRejected, PriorityClass, TokenBucket
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate=2.0, burst=2)
+
+    assert bucket.take() == bucket.take() == 0.0
+    assert bucket.take() == pytest.approx(0.5, abs=0.01)
+    # Asking never takes tokens; half a second later one is back
+    assert bucket.wait_time() == pytest.approx(0.5, abs=0.01)
+    bucket.updated -= 0.5
+    assert bucket.take() == 0.0
+    # A request larger than the burst costs (and waits for) a full bucket
+    assert bucket.take(cost=10) == pytest.approx(1.0, abs=0.01)
+    assert TokenBucket(rate=0, burst=1).take(cost=1000) == 0.0
+
+
+def test_quota_is_per_client_and_class():
+    controller = AdmissionController(classes=[PriorityClass("interactive", rate=1.0, burst=1),
+                                              PriorityClass("bulk")], max_clients=2)
+
+    controller.check_quota("a", "interactive")
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.check_quota("a", "interactive")
+    assert rejected.value.reason == "quota" and 0 < rejected.value.retry_after <= 1
+    controller.check_quota("b", "interactive")
+    controller.check_quota("a", "bulk")
+    controller.check_quota("a", "bulk")
+
+    # Only max_clients buckets are kept, least recently used first out
+    assert len(controller._buckets) == 2 and ("interactive", "a") not in controller._buckets
+
+
+async def admission_order(controller, requests):
+    """Queue (client, priority) requests behind a held slot; returns the order they are admitted in"""
+    order = []
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.slot("holder", requests[0][1]):
+            await release.wait()
+
+    async def request(client, priority, i):
+        async with controller.slot(client, priority):
+            order.append(i)
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    tasks = [asyncio.create_task(request(client, priority, i)) for i, (client, priority) in enumerate(requests)]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(holder, *tasks)
+    return order
+
+
+def test_classes_share_slots_by_weight():
+    controller = AdmissionController(slots=1, classes=[PriorityClass("interactive", weight=4),
+                                                       PriorityClass("bulk", weight=1)])
+    requests = [("bulk-client", "bulk")] * 5 + [("ui-client", "interactive")] * 8
+
+    order = asyncio.run(admission_order(controller, requests))
+
+    # 4 interactive per bulk request while both classes are queued (the
+    # held slot was bulk's first turn)
+    classes = ["B" if i < 5 else "I" for i in order]
+    assert "".join(classes) == "IIIII" + "B" + "III" + "BBBB"
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_clients_within_a_class_take_turns():
+    controller = AdmissionController(slots=1, classes=[PriorityClass("bulk")])
+    requests = [("a", "bulk")] * 3 + [("b", "bulk")] * 2
+
+    assert asyncio.run(admission_order(controller, requests)) == [0, 3, 1, 4, 2]
+
+
+def test_full_queue_and_expired_wait_are_shed():
+    async def scenario():
+        controller = AdmissionController(slots=1, classes=[PriorityClass("bulk", max_queue=1, max_wait=0.05)])
+        errors = []
+        async with controller.slot("a", "bulk"):
+            waiting = asyncio.create_task(controller.slot("b", "bulk").__aenter__())
+            await asyncio.sleep(0)
+            try:
+                async with controller.slot("c", "bulk"):
+                    pass
+            except AdmissionRejected as e:
+                errors.append(e.reason)
+            try:
+                await waiting
+            except AdmissionRejected as e:
+                errors.append(e.reason)
+        return errors, controller.stats()
+
+    errors, stats = asyncio.run(scenario())
+
+    assert errors == ["queue_full", "timeout"]
+    assert stats["queued"] == {"bulk": 0} and stats["in_flight"] == 0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        controller = AdmissionController(slots=1, classes=[PriorityClass("bulk")])
+        async with controller.slot("a", "bulk"):
+            waiting = asyncio.create_task(controller.slot("b", "bulk").__aenter__())
+            await asyncio.sleep(0)
+            waiting.cancel()
+            await asyncio.gather(waiting, return_exceptions=True)
+            queued = controller.stats()["queued"]["bulk"]
+        return queued, controller.stats()
+
+    queued, stats = asyncio.run(scenario())
+
+    assert queued == 0 and stats["in_flight"] == 0
+
+
+def test_cancelled_admission_leaves_the_service_estimate_alone():
+    async def scenario():
+        controller = AdmissionController(slots=1, classes=[PriorityClass("bulk")])
+        async with controller.slot("a", "bulk"):
+            waiting = asyncio.create_task(controller.slot("b", "bulk").__aenter__())
+            await asyncio.sleep(0.05)
+        measured = controller.service_seconds
+        # Admitted on release, cancelled before it could run anything
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        return controller, measured
+
+    controller, measured = asyncio.run(scenario())
+
+    assert controller.in_flight == 0
+    assert measured >= 0.05 and controller.service_seconds == measured
+
+
+def test_cancelled_request_is_charged_its_real_run_time(monkeypatch):
+    controller = AdmissionController(slots=1, classes=[PriorityClass("interactive")])
+    monkeypatch.setattr(backend, "admission", controller)
+
+    async def scenario():
+        call = asyncio.create_task(backend.admitted_call(("a", "interactive"), time.sleep, 0.2))
+        await asyncio.sleep(0.05)
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+    # The worker thread cannot be interrupted, so the slot is held (and timed) until it finishes
+    assert controller.in_flight == 0 and controller.service_seconds >= 0.2
+
+
+@pytest.fixture
+def client(manager, monkeypatch):
+    monkeypatch.setattr(backend, "model_manager", manager)
+    monkeypatch.setattr(backend, "result_cache", backend.ResultCache(16))
+    controller = AdmissionController(classes=[PriorityClass("interactive", rate=0.1, burst=1),
+                                              PriorityClass("bulk", rate=0.1, burst=1)])
+    monkeypatch.setattr(backend, "admission", controller)
+    return TestClient(backend.app)
+
+
+def upload(client, path, **headers):
+    with open(path, "rb") as f:
+        return client.post("/predict", files={"file": ("clip.mp4", f, "video/mp4")}, headers=headers)
+
+
+def test_exhausted_quota_answers_429_with_retry_after(client, video):
+    first, second = video("first.mp4"), video("second.mp4", seed=1)
+
+    assert upload(client, first).status_code == 200
+    # A cached result costs no quota
+    assert upload(client, first).json()["cached"] is True
+    response = upload(client, second)
+
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["Retry-After"]) <= 10
+
+
+def test_client_ids_are_trusted_only_when_configured(client, video, monkeypatch):
+    first, second = video("first.mp4"), video("second.mp4", seed=1)
+    assert upload(client, first, **{"X-Client-ID": "a"}).status_code == 200
+
+    # Without TRUST_CLIENT_ID a fresh id does not buy a fresh quota
+    assert upload(client, second, **{"X-Client-ID": "b"}).status_code == 429
+
+    monkeypatch.setattr(backend, "TRUST_CLIENT_ID", True)
+    assert upload(client, second, **{"X-Client-ID": "b"}).status_code == 200
+
+
+def test_priority_header_can_only_lower_the_class(client, video):
+    first, second = video("first.mp4"), video("second.mp4", seed=1)
+
+    # Marked bulk, the upload draws on the bulk quota and leaves the interactive one
+    assert upload(client, first, **{"X-Priority": "bulk"}).status_code == 200
+    assert upload(client, second, **{"X-Priority": "BULK"}).status_code == 429
+    assert upload(client, second).status_code == 200
+
+    request = type("Request", (), {"headers": {"x-priority": "interactive"}, "client": None})()
+    assert backend.client_ticket(request, "bulk") == ("anonymous", "bulk")
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+from audit import AuditLog
+
+
+def entry(i, **fields):
+    return dict({
+        "endpoint": "/predict", "content_hash": f"h{i}", "client": "c", "prediction": "FAKE" if i % 2 else "REAL",
+        "confidence": 0.5 + i / 100, "is_fake": i % 2, "cached": 0, "short_circuited": 0,
+        "request_seconds": 0.1 * (i + 1), "timings": {"model_seconds": 0.05}, "ts": 1000.0 + i,
+    }, **fields)
+
+
+def filled(tmp_path, count, **options):
+    log = AuditLog(tmp_path, batch_size=4, flush_seconds=0.01, **options)
+    log.start()
+    for i in range(count):
+        log.record(entry(i))
+    # close() flushes everything queued
+    log.close()
+    return log
+
+
+def test_records_round_trip_newest_first(tmp_path):
+    log = filled(tmp_path, 3)
+
+    rows = log.recent()
+    assert [r["content_hash"] for r in rows] == ["h2", "h1", "h0"]
+    assert rows[0]["timings"] == {"model_seconds": 0.05} and rows[0]["details"] is None
+    assert log.recent(prediction="FAKE", limit=5)[0]["content_hash"] == "h1"
+    assert [r["content_hash"] for r in log.recent(since=1001.5)] == ["h2"]
+
+
+def test_active_file_rotates_by_rows_and_queries_span_segments(tmp_path):
+    log = filled(tmp_path, 12, rotate_rows=4)
+
+    assert log.stats()["segments"] == 3 and log.written == 12
+    rows = log.recent(limit=100)
+    assert [r["content_hash"] for r in rows] == [f"h{i}" for i in reversed(range(12))]
+    assert log.aggregate()["all"]["count"] == 12
+
+
+def test_old_segments_are_pruned(tmp_path):
+    log = filled(tmp_path, 12, rotate_rows=4, max_segments=1)
+
+    assert log.stats()["segments"] == 1
+    assert [r["content_hash"] for r in log.recent(limit=100)] == ["h11", "h10", "h9", "h8"]
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    log = AuditLog(tmp_path, queue_size=1)
+
+    start = time.perf_counter()
+    assert log.record(entry(0)) and not log.record(entry(1))
+    assert time.perf_counter() - start < 0.1
+    assert log.dropped == 1
+
+
+def test_aggregate_groups_rates_and_latency(tmp_path):
+    log = AuditLog(tmp_path, flush_seconds=0.01)
+    log.start()
+    for i in range(4):
+        log.record(entry(i))
+    log.record(entry(4, endpoint="/predict/image", cached=1))
+    log.close()
+
+    stats = log.aggregate(group_by="endpoint")
+    assert stats["/predict"]["count"] == 4 and stats["/predict"]["fake_rate"] == 0.5
+    assert stats["/predict"]["request_seconds"]["p50"] == pytest.approx(0.25)
+    # Latency percentiles only cover uncached requests
+    assert stats["/predict/image"]["cached_rate"] == 1.0 and stats["/predict/image"]["request_seconds"] is None
+
+    with pytest.raises(ValueError):
+        log.aggregate(group_by="content_hash")
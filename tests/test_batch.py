@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backend
+from backend import parse_manifest
+
+
+@pytest.fixture
+def root(tmp_path, monkeypatch, video):
+    directory = tmp_path / "root"
+    (directory / "sub").mkdir(parents=True)
+    os.replace(video("a.mp4", count=24, seed=1), directory / "sub" / "a.mp4")
+    os.replace(video("b.mp4", count=24, seed=2), directory / "b.mp4")
+    (tmp_path / "outside.mp4").write_bytes(b"x")
+    monkeypatch.setattr(backend, "BATCH_MANIFEST_ROOT", str(directory))
+    return directory
+
+
+def test_manifests_resolve_inside_the_root_only(root):
+    from_lines = parse_manifest("# comment\nsub/a.mp4\n\n../outside.mp4\nmissing.mp4\n")
+    from_json = parse_manifest(json.dumps(["b.mp4", "/etc/passwd"]))
+
+    assert [(name, error) for name, _, error in from_lines] == [
+        ("sub/a.mp4", None), ("../outside.mp4", "Path is outside the manifest root"), ("missing.mp4", "File not found")]
+    assert from_lines[0][1] == str(root / "sub" / "a.mp4")
+    assert [error for _, _, error in from_json] == [None, "Path is outside the manifest root"]
+
+
+@pytest.fixture
+def client(manager, monkeypatch):
+    monkeypatch.setattr(backend, "model_manager", manager)
+    monkeypatch.setattr(backend, "result_cache", backend.ResultCache(16))
+    return TestClient(backend.app)
+
+
+def test_batch_scores_each_video_and_reuses_the_cache(client, video):
+    with open(video(count=24), "rb") as f:
+        data = f.read()
+
+    response = client.post("/predict/batch", files=[("files", ("one.mp4", data)), ("files", ("two.mp4", data)),
+                                                    ("files", ("bad.mp4", b"not a video"))])
+
+    predictions = response.json()["predictions"]
+    assert response.status_code == 200 and len(predictions) == 3
+    assert predictions[0]["error"] is None and predictions[1]["cached"]
+    assert predictions[2]["error"]
+    assert client.post("/predict/batch", files=[("files", (f"{i}.mp4", data)) for i in range(11)]).status_code == 400
+
+
+def test_stream_mixes_uploads_and_manifest_entries(client, root, video, monkeypatch):
+    spooled = []
+    spool = backend.spool_multipart
+
+    async def recording(request):
+        uploads, fields = await spool(request)
+        spooled.extend(path for _, path in uploads)
+        return uploads, fields
+
+    monkeypatch.setattr(backend, "spool_multipart", recording)
+    with open(video(count=24), "rb") as f:
+        data = f.read()
+
+    response = client.post("/predict/batch/stream",
+                           files=[("files", ("up.mp4", data)), ("files", ("broken.mp4", b"zzz"))],
+                           data={"manifest": "sub/a.mp4\n../outside.mp4"})
+
+    assert response.status_code == 200 and response.headers["content-type"] == "application/x-ndjson"
+    lines = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda line: line["index"])
+    assert [line["video_name"] for line in lines] == ["up.mp4", "broken.mp4", "sub/a.mp4", "../outside.mp4"]
+    assert [line["error"] is None for line in lines] == [True, False, True, False]
+    # Uploads are spooled to disk and removed once scored
+    assert len(spooled) == 2 and not any(os.path.exists(path) for path in spooled)
+
+
+def test_stream_needs_input_and_a_manifest_root(client, monkeypatch):
+    assert client.post("/predict/batch/stream").status_code == 400
+    monkeypatch.setattr(backend, "BATCH_MANIFEST_ROOT", None)
+    assert client.post("/predict/batch/stream", data={"manifest": "a.mp4"}).status_code == 403
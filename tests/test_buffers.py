@@ -0,0 +1,103 @@
+import threading
+import time
+
+import numpy as np
+import torch
+
+from backend import VideoPreprocessor
+from buffers import BufferPool, MemoryBudget
+
+
+def test_released_buffers_are_handed_out_again():
+    pool = BufferPool("test")
+
+    first = pool.acquire((2, 3))
+    pool.release(first)
+    again = pool.acquire((2, 3))
+    other = pool.acquire((2, 3), torch.float16)
+
+    assert again is first and other is not first
+    assert pool.stats()["hits"] == 1 and pool.stats()["misses"] == 2
+    assert pool.stats()["in_use_bytes"] == 2 * 3 * 4 + 2 * 3 * 2
+    pool.release(again)
+    pool.release(other)
+    pool.release(None)
+    assert pool.stats()["in_use_bytes"] == 0 and pool.stats()["idle_bytes"] == 36
+
+
+def test_only_whole_writable_buffers_are_pooled():
+    pool = BufferPool("scratch", kind="numpy")
+    frame = np.zeros((4, 4, 3), np.uint8)
+
+    pool.release(frame[:2])
+    readonly = np.zeros(8, np.uint8)
+    readonly.flags.writeable = False
+    pool.release(readonly)
+    assert pool.stats()["idle_bytes"] == 0
+
+    # A decoder's own frame is adopted and reused
+    pool.release(frame)
+    assert pool.acquire((4, 4, 3), np.uint8) is frame
+
+    tensors = BufferPool("clips")
+    tensors.release(torch.zeros(4, 4).t())
+    tensors.release(torch.zeros(4, requires_grad=True))
+    assert tensors.stats()["idle_bytes"] == 0
+
+
+def test_idle_bytes_are_capped_least_recent_shape_first():
+    pool = BufferPool("capped", kind="numpy", max_bytes=100)
+    old, new = pool.acquire((60,), np.uint8), pool.acquire((40,), np.uint8)
+    pool.release(old)
+    pool.release(new)
+    pool.release(np.zeros(30, np.uint8))
+
+    assert pool.stats()["idle_bytes"] == 70
+    assert pool.acquire((60,), np.uint8) is not old
+    assert pool.acquire((40,), np.uint8) is new
+    # Larger than the whole cap: never kept
+    pool.release(np.zeros(200, np.uint8))
+    assert pool.stats()["peak_bytes"] == 130
+
+
+def test_budget_blocks_until_the_reservation_fits():
+    budget = MemoryBudget(100)
+    events = []
+
+    def second():
+        with budget.reserve(60):
+            events.append("second")
+
+    with budget.reserve(60):
+        thread = threading.Thread(target=second)
+        thread.start()
+        time.sleep(0.1)
+        events.append("first done")
+    thread.join(5)
+
+    assert events == ["first done", "second"]
+    assert budget.stats() == {"limit_bytes": 100, "used_bytes": 0, "peak_bytes": 60}
+
+
+def test_oversized_reservation_runs_alone_and_zero_is_unlimited():
+    budget = MemoryBudget(100)
+    with budget.reserve(10 ** 9):
+        assert budget.used == 100
+
+    unlimited = MemoryBudget(0)
+    with unlimited.reserve(10 ** 9), unlimited.reserve(10 ** 9):
+        assert unlimited.used == 2 * 10 ** 9
+
+
+def test_preprocessing_reserves_and_recycles(video):
+    budget = MemoryBudget(64 << 20)
+    preprocessor = VideoPreprocessor("cpu", face_detector="none", memory_budget=budget)
+    path = video()
+
+    for _ in range(2):
+        clip = preprocessor.extract_frames(path)
+        preprocessor.clips.release(clip)
+
+    assert budget.stats()["used_bytes"] == 0
+    assert 0 < budget.stats()["peak_bytes"] <= 64 << 20
+    assert preprocessor.clips.stats()["hits"] >= 1
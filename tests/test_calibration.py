@@ -0,0 +1,134 @@
+import math
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import backend
+from backend import ModelManager
+from calibration import (
+    Calibration, calibration_path, confusion_at, evaluate, expected_calibration_error, operating_thresholds,
+    pr_curve, roc_curve, sigmoid
+)
+
+
+@pytest.fixture
+def scored():
+    """Labels and overlapping, partly tied scores"""
+    rng = np.random.default_rng(0)
+    labels = rng.integers(0, 2, 400)
+    scores = np.round(sigmoid(rng.normal(labels * 1.5 - 0.75, 1.0)), 2)
+    return labels, scores
+
+
+def test_auc_is_the_pairwise_ranking_probability(scored):
+    labels, scores = scored
+    positives, negatives = scores[labels == 1], scores[labels == 0]
+    pairs = (positives[:, None] > negatives[None, :]) + 0.5 * (positives[:, None] == negatives[None, :])
+
+    fpr, tpr, thresholds, auc = roc_curve(labels, scores)
+
+    assert auc == pytest.approx(pairs.mean())
+    assert (fpr[0], tpr[0], fpr[-1], tpr[-1]) == (0, 0, 1, 1)
+    assert thresholds[0] == np.inf and np.all(np.diff(thresholds) < 0)
+    assert roc_curve([0, 0, 1, 1], [0.1, 0.2, 0.8, 0.9])[3] == 1.0
+    assert roc_curve([1, 1, 0, 0], [0.1, 0.2, 0.8, 0.9])[3] == 0.0
+
+
+def test_average_precision_matches_a_threshold_sweep(scored):
+    labels, scores = scored
+    expected, previous_recall = 0.0, 0.0
+    for threshold in np.unique(scores)[::-1]:
+        predicted = scores >= threshold
+        precision = (predicted & (labels == 1)).sum() / predicted.sum()
+        recall = (predicted & (labels == 1)).sum() / (labels == 1).sum()
+        expected += (recall - previous_recall) * precision
+        previous_recall = recall
+
+    assert pr_curve(labels, scores)[3] == pytest.approx(expected)
+
+
+def test_calibration_error():
+    assert expected_calibration_error([0, 0, 0, 0], [1.0, 1.0, 1.0, 1.0]) == 1.0
+    # Each bin's mean confidence equals its accuracy
+    assert expected_calibration_error([0, 1, 1, 1], [0.75, 0.75, 0.75, 0.75]) == pytest.approx(0.0)
+    assert expected_calibration_error([], []) == 0.0
+
+
+def test_operating_thresholds_are_optimal_cutoffs(scored):
+    labels, scores = scored
+    thresholds = operating_thresholds(labels, scores)
+    # Every rule predicts FAKE for prob > threshold, as ModelManager does
+    sweep = [confusion_at(labels, scores, t) for t in np.r_[np.unique(scores) - 1e-9, 1.0]]
+
+    youden = confusion_at(labels, scores, thresholds["youden"])
+    assert youden["tpr"] - youden["fpr"] == pytest.approx(max(r["tpr"] - r["fpr"] for r in sweep))
+    assert confusion_at(labels, scores, thresholds["f1"])["f1"] == pytest.approx(max(r["f1"] for r in sweep))
+    assert confusion_at(labels, scores, thresholds["accuracy"])["accuracy"] == max(r["accuracy"] for r in sweep)
+
+    bounded = confusion_at(labels, scores, thresholds["fpr@0.05"])
+    assert bounded["fpr"] <= 0.05
+    assert bounded["tpr"] == max(r["tpr"] for r in sweep if r["fpr"] <= 0.05)
+    assert confusion_at(labels, scores, thresholds["tpr@0.95"])["tpr"] >= 0.95
+
+    with pytest.raises(ValueError, match="Unknown operating point"):
+        operating_thresholds(labels, scores, ["precision@0.9"])
+
+
+def test_fits_recover_the_scaling_of_overconfident_logits():
+    rng = np.random.default_rng(1)
+    true_logits = rng.normal(0.0, 2.0, 20000)
+    labels = rng.random(20000) < sigmoid(true_logits)
+
+    temperature = Calibration.fit(3.0 * true_logits, labels, "temperature")
+    platt = Calibration.fit(3.0 * true_logits + 1.0, labels, "platt")
+
+    assert temperature.temperature == pytest.approx(3.0, rel=0.05) and temperature.b == 0.0
+    assert platt.a == pytest.approx(1 / 3, rel=0.05) and platt.b == pytest.approx(-1 / 3, abs=0.05)
+    raw = evaluate(labels, sigmoid(3.0 * true_logits))
+    calibrated = evaluate(labels, temperature.probabilities(3.0 * true_logits))
+    assert calibrated["ece"] < raw["ece"] and calibrated["log_loss"] < raw["log_loss"]
+    assert calibrated["roc_auc"] == pytest.approx(raw["roc_auc"])
+
+
+def test_fit_stays_finite_on_separable_scores():
+    calibration = Calibration.fit([-3.0, -2.0, 2.0, 3.0], [0, 0, 1, 1], "platt")
+    assert math.isfinite(calibration.a) and math.isfinite(calibration.b)
+    with pytest.raises(ValueError, match="Unknown calibration method"):
+        Calibration.fit([0.0], [1], "isotonic")
+
+
+def test_calibration_round_trips_next_to_the_checkpoint(tmp_path):
+    path = calibration_path(tmp_path / "model_epoch_30.pth")
+    Calibration("platt", 0.5, -0.2, threshold=0.6, operating_point="youden", metrics={"ece": 0.01}).save(path)
+
+    loaded = Calibration.load(path)
+
+    assert path.name == "model_epoch_30.calibration.json"
+    assert loaded.to_dict() == {"method": "platt", "a": 0.5, "b": -0.2, "temperature": 2.0, "threshold": 0.6,
+                                "operating_point": "youden", "metrics": {"ece": 0.01}}
+
+
+def test_model_manager_applies_the_calibration_and_its_threshold(tmp_path, monkeypatch):
+    model_path = tmp_path / "model.pth"
+    Calibration("platt", 0.5, 1.0, threshold=0.7).save(calibration_path(model_path))
+
+    manager = ModelManager(str(model_path), device="cpu", architecture="mobilenet_v3")
+    result = manager.format_result(1.0)
+
+    assert manager.threshold == 0.7
+    assert result["raw_score"] == 1.0
+    assert result["confidence"] == pytest.approx(sigmoid(1.5))
+    assert result["prediction"] == "FAKE"
+    # An explicit threshold wins over the calibration's
+    assert ModelManager(str(model_path), device="cpu", threshold=0.9,
+                        architecture="mobilenet_v3").format_result(1.0)["prediction"] == "REAL"
+
+    # CALIBRATION_PATH points elsewhere; a missing file means raw scores at 0.5
+    monkeypatch.setattr(backend, "CALIBRATION_PATH", str(tmp_path / "missing.json"))
+    uncalibrated = ModelManager(str(model_path), device="cpu", architecture="mobilenet_v3")
+    assert uncalibrated.calibration is None and uncalibrated.threshold == 0.5
+
+    monkeypatch.setattr(backend, "model_manager", manager)
+    info = TestClient(backend.app).get("/info").json()
+    assert info["calibration"]["threshold"] == 0.7
@@ -0,0 +1,80 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import backend
+from backend import PrefilterCascade
+from face_detectors import FaceDetector
+
+
+class FixedDetector(FaceDetector):
+    """Reports one face of the given probability in every frame (none with prob None)"""
+
+    name = "fixed"
+
+    def __init__(self, prob=None):
+        self.prob = prob
+        self.calls = []
+
+    def detect(self, frames):
+        self.calls.append([frame.shape for frame in frames])
+        if self.prob is None:
+            return [self._empty() for _ in frames]
+        return [self._largest_first([[10, 10, 60, 60]], [self.prob]) for _ in frames]
+
+
+@pytest.fixture
+def cascaded(manager, monkeypatch):
+    def use(prob):
+        detector = FixedDetector(prob)
+        monkeypatch.setattr(manager.preprocessor, "detector", detector)
+        monkeypatch.setattr(manager.preprocessor, "face_detection_enabled", True)
+        manager.cascade = PrefilterCascade(manager.preprocessor, probe_frames=4, probe_size=80)
+        return detector
+    return use
+
+
+def test_faceless_videos_abstain(manager, cascaded, video):
+    detector = cascaded(None)
+
+    result = manager.predict(video(count=48))
+
+    assert result["prediction"] == "ABSTAIN" and result["short_circuited"]
+    assert result["is_fake"] is None and result["confidence"] is None
+    assert result["cascade_reason"] == "no_face"
+    # Only the probe frames were looked at, downscaled to probe_size
+    assert detector.calls == [[(60, 80, 3)] * 4]
+
+
+def test_weak_detections_do_not_count_as_faces(manager, cascaded, video):
+    cascaded(0.5)
+
+    assert manager.predict(video(count=48))["prediction"] == "ABSTAIN"
+
+
+def test_videos_with_a_face_escalate_to_the_model(manager, cascaded, video):
+    cascaded(0.99)
+
+    result = manager.predict(video(count=48))
+
+    assert result["prediction"] in ("REAL", "FAKE") and not result.get("short_circuited")
+    assert result["frames_analyzed"] == 12
+
+
+def test_without_a_detector_every_video_escalates(manager, video):
+    manager.cascade = PrefilterCascade(manager.preprocessor)
+
+    assert manager.prefilter(video(count=48)) is None
+
+
+def test_predict_endpoint_returns_the_abstention(manager, cascaded, video, monkeypatch):
+    cascaded(None)
+    monkeypatch.setattr(backend, "model_manager", manager)
+    monkeypatch.setattr(backend, "result_cache", backend.ResultCache(16))
+    client = TestClient(backend.app)
+
+    with open(video(count=48), "rb") as f:
+        response = client.post("/predict", files={"file": ("clip.mp4", f, "video/mp4")})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["prediction"] == "ABSTAIN" and body["is_fake"] is None and body["confidence"] is None
@@ -0,0 +1,99 @@
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+import decoders
+from conftest import write_video
+from decoders import DECODERS, DecoderSelector, available_decoders, load_preferences, probe_video
+
+INDICES = [0, 5, 17, 30, 47]
+
+
+@pytest.fixture
+def numbered(tmp_path):
+    """48 flat frames whose grey level encodes their index"""
+    frames = [np.full((64, 96, 3), 5 * i, np.uint8) for i in range(48)]
+    return write_video(tmp_path / "numbered.mp4", frames)
+
+
+def positions(path, frames):
+    """Position of every returned frame in a plain sequential decode of the video"""
+    cap = cv2.VideoCapture(path)
+    reference = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        reference.append(float(frame.mean()))
+    cap.release()
+    return [int(np.argmin(np.abs(np.array(reference) - frame.mean()))) for _, frame in frames]
+
+
+@pytest.mark.parametrize("name", available_decoders())
+@pytest.mark.parametrize("indexed", [False, True])
+def test_every_decoder_returns_the_requested_frames(numbered, name, indexed):
+    index = probe_video(numbered) if indexed else None
+    with DECODERS[name](numbered) as decoder:
+        frames = list(decoder.read(INDICES, index))
+
+    assert [i for i, _ in frames] == INDICES
+    assert positions(numbered, frames) == INDICES
+    assert all(frame.shape == (64, 96, 3) and frame.dtype == np.uint8 for _, frame in frames)
+
+
+@pytest.mark.parametrize("name", available_decoders())
+def test_reads_stop_at_the_end_of_the_video(numbered, name):
+    with DECODERS[name](numbered) as decoder:
+        assert [i for i, _ in decoder.read([40, 47, 60, 90], probe_video(numbered))] == [40, 47]
+
+
+@pytest.mark.parametrize("name", available_decoders())
+def test_unreadable_files_raise_value_error(tmp_path, name):
+    broken = tmp_path / "broken.mp4"
+    broken.write_bytes(b"not a video")
+
+    with pytest.raises(ValueError):
+        DECODERS[name](str(broken))
+
+
+def test_selector_rejects_unknown_and_missing_decoders(monkeypatch):
+    with pytest.raises(ValueError, match="Unknown decoder"):
+        DecoderSelector("gstreamer")
+    monkeypatch.setattr(decoders.DecordDecoder, "available", classmethod(lambda cls: False))
+    with pytest.raises(ValueError, match="not installed"):
+        DecoderSelector("decord")
+
+
+def test_selector_orders_by_container_and_keeps_opencv_last(monkeypatch):
+    monkeypatch.setattr(decoders, "available_decoders", lambda: ["opencv", "pyav"])
+    selector = DecoderSelector(preferences={".avi": ["decord", "pyav", "opencv"], "default": ["pyav"]})
+
+    assert selector.candidates("clip.AVI") == ["pyav", "opencv"]
+    assert selector.candidates("clip.flv") == ["pyav", "opencv"]
+    assert DecoderSelector("opencv").candidates("clip.mp4") == ["opencv"]
+
+
+def test_selector_falls_back_when_a_decoder_refuses_the_file(numbered, monkeypatch):
+    class Refusing(decoders.VideoDecoder):
+        name = "refusing"
+
+        def __init__(self, path, threads=0):
+            raise ValueError("unsupported")
+
+    monkeypatch.setitem(DECODERS, "refusing", Refusing)
+    selector = DecoderSelector(preferences={".mp4": ["refusing", "opencv"], "default": ["opencv"]})
+    selector.available.add("refusing")
+
+    with selector.open(numbered) as decoder:
+        assert decoder.name == "opencv"
+
+
+def test_preferences_file_overrides_the_defaults(tmp_path):
+    path = tmp_path / "preferences.json"
+    path.write_text(json.dumps({".mp4": ["opencv"]}))
+
+    preferences = load_preferences(str(path))
+    assert preferences[".mp4"] == ["opencv"]
+    assert preferences[".mov"] == decoders.DEFAULT_PREFERENCES[".mov"]
@@ -0,0 +1,62 @@
+import base64
+
+import cv2
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import backend
+
+
+@pytest.fixture
+def client(manager, monkeypatch):
+    monkeypatch.setattr(backend, "model_manager", manager)
+    monkeypatch.setattr(backend, "result_cache", backend.ResultCache(16))
+    return TestClient(backend.app)
+
+
+def upload(path, name="clip.mp4"):
+    with open(path, "rb") as f:
+        return {"file": (name, f.read(), "video/mp4")}
+
+
+def test_prediction_ids_explain_without_rerunning_the_trunk(client, manager, video, monkeypatch):
+    files = upload(video(count=48))
+    predicted = client.post("/predict", files=files).json()
+    assert predicted["prediction_id"]
+
+    monkeypatch.setattr(manager.model, "extract_features", None)
+    response = client.get(f"/explain/{predicted['prediction_id']}")
+
+    assert response.status_code == 200
+    explanation = response.json()
+    assert explanation["method"] == "grad-cam" and len(explanation["frames"]) == 12
+    assert explanation["confidence"] == pytest.approx(predicted["confidence"], abs=1e-5)
+    heatmap = cv2.imdecode(np.frombuffer(base64.b64decode(explanation["frames"][0]["heatmap_png"]), np.uint8),
+                           cv2.IMREAD_UNCHANGED)
+    assert heatmap.shape == (backend.HEATMAP_SIZE, backend.HEATMAP_SIZE) and heatmap.dtype == np.uint8
+    assert max(frame["intensity"] for frame in explanation["frames"]) in (0.0, 1.0)
+    # Cache hits keep pointing at the same activations
+    assert client.post("/predict", files=files).json()["prediction_id"] == predicted["prediction_id"]
+
+
+def test_unknown_ids_are_404(client):
+    assert client.get("/explain/nope").status_code == 404
+
+
+def test_posting_a_video_recomputes_expired_activations(client, manager, video):
+    files = upload(video(count=48))
+    predicted = client.post("/predict", files=files).json()
+    manager.activations = backend.TTLCache(300, 32)
+
+    response = client.post("/explain", files=files)
+
+    assert response.status_code == 200 and response.json()["prediction_id"] == predicted["prediction_id"]
+    assert client.get(f"/explain/{predicted['prediction_id']}").status_code == 200
+
+
+def test_without_the_activation_cache_explanations_are_off(client, manager, video):
+    manager.activations = None
+
+    assert client.post("/predict", files=upload(video(count=48))).json().get("prediction_id") is None
+    assert client.get("/explain/anything").status_code == 501
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from backend import VideoPreprocessor
+from face_detectors import FACE_DETECTORS, FaceDetector, available_detectors, create_detector
+
+BLANK = np.full((120, 160, 3), 128, np.uint8)
+
+
+def test_boxes_come_largest_first():
+    boxes, probs = FaceDetector._largest_first([[0, 0, 10, 10], [0, 0, 30, 30], [0, 0, 20, 20]], [0.1, 0.3, 0.2])
+
+    assert boxes.dtype == np.float32 and boxes[:, 2].tolist() == [30, 20, 10]
+    assert probs.tolist() == pytest.approx([0.3, 0.2, 0.1])
+    assert FaceDetector._largest_first([], [])[0].shape == (0, 4)
+
+
+@pytest.mark.parametrize("name", [name for name in available_detectors() if name != "yunet"])
+def test_detectors_return_one_result_per_frame(name):
+    detector = create_detector(name)
+
+    results = detector.detect([BLANK, BLANK[:60, :80].copy()])
+
+    assert len(results) == 2
+    for boxes, probs in results:
+        assert boxes.shape == (len(probs), 4)
+    assert detector.detect([]) == []
+
+
+def test_unknown_detectors_are_rejected():
+    with pytest.raises(ValueError, match="Unknown face detector"):
+        create_detector("retinaface")
+
+
+def test_yunet_needs_its_model_file(tmp_path):
+    assert not FACE_DETECTORS["yunet"].available(model_path=str(tmp_path / "missing.onnx"))
+    with pytest.raises(ValueError, match="YuNet model not found"):
+        create_detector("yunet", model_path=str(tmp_path / "missing.onnx"))
+
+
+def test_preprocessor_falls_back_to_no_detection(tmp_path):
+    p = VideoPreprocessor(device="cpu", face_detector="yunet",
+                          detector_options={"model_path": str(tmp_path / "missing.onnx")})
+
+    assert p.detector.name == "none" and not p.face_detection_enabled
@@ -0,0 +1,161 @@
+import numpy as np
+import pytest
+import torch
+
+import backend
+from fingerprints import FingerprintIndex, frame_hashes, hamming
+
+
+def clip(seed, frames=6):
+    torch.manual_seed(seed)
+    return torch.rand(frames, 3, 224, 224)
+
+
+def test_hashes_are_256_bits_per_frame():
+    hashes = frame_hashes(clip(0))
+    assert hashes.shape == (6, 4) and hashes.dtype == np.uint64
+
+
+def test_hash_survives_brightness_and_noise_but_not_new_content():
+    frames = clip(0)
+    hashes = frame_hashes(frames)
+    brighter = frame_hashes(frames * 0.8 + 0.1 + torch.randn_like(frames) * 0.01)
+    other = frame_hashes(clip(1))
+
+    assert hamming(hashes, brighter).diagonal().max() <= 8
+    assert hamming(hashes, other).diagonal().min() > 64
+
+
+def test_lookup_finds_near_duplicate_and_reports_similarity():
+    index = FingerprintIndex(max_entries=10)
+    hashes = frame_hashes(clip(0))
+    index.add("a", hashes, 1.5)
+    index.add("b", frame_hashes(clip(1)), -2.0)
+
+    match = index.lookup(hashes.copy())
+    assert match["key"] == "a" and match["raw_score"] == 1.5
+    assert match["similarity"] == 1.0 and match["frames_matched"] == 6 and match["distance"] == 0
+    assert index.lookup(frame_hashes(clip(2))) is None
+
+
+def flip_bits(hashes, count, seed=0):
+    """Copies of hashes with `count` bits flipped per frame, spread over all 16 bands"""
+    rng = np.random.default_rng(seed)
+    bits = np.unpackbits(hashes.astype(">u8").view(np.uint8), axis=1)
+    for row in bits:
+        # Bit i of every band first, so no band matches exactly
+        offsets = rng.permutation(16)[np.arange(count) // 16]
+        row[np.arange(count) % 16 * 16 + offsets] ^= 1
+    return np.packbits(bits, axis=1).view(">u8").astype(np.uint64)
+
+
+@pytest.mark.parametrize("distance", [20, 26, 30, 31])
+def test_frames_far_beyond_one_band_are_still_found(distance):
+    index = FingerprintIndex()
+    hashes = frame_hashes(clip(0))
+    index.add("a", hashes, 0.0)
+    # Every frame of the query differs from its original by `distance` bits, in every band
+    query = flip_bits(hashes, distance, seed=distance)
+    assert (hamming(hashes, query).diagonal() == distance).all()
+
+    match = index.lookup(query)
+    assert match["key"] == "a" and match["similarity"] == 1.0 and match["distance"] == distance
+    assert index.lookup(flip_bits(hashes, 40)) is None
+
+
+def test_band_layout_is_validated():
+    with pytest.raises(ValueError, match="bands"):
+        FingerprintIndex(bands=5)
+    with pytest.raises(ValueError, match="probes"):
+        FingerprintIndex(bands=4, max_distance=32)
+    assert FingerprintIndex(bands=32, max_distance=63).lookup(frame_hashes(clip(0))) is None
+    # Two flipped bits per band reach 47 bits
+    index = FingerprintIndex(max_distance=47)
+    index.add("a", frame_hashes(clip(0)), 0.0)
+    assert index.lookup(flip_bits(frame_hashes(clip(0)), 47))["distance"] == 47
+
+
+def test_partial_overlap_respects_min_similarity():
+    index = FingerprintIndex()
+    hashes = frame_hashes(clip(0))
+    index.add("a", hashes, 0.0)
+    # Two of six frames shared
+    mixed = np.concatenate([hashes[:2], frame_hashes(clip(3, frames=4))])
+
+    assert index.lookup(mixed, min_similarity=0.5) is None
+    assert index.lookup(mixed, min_similarity=0.3)["frames_matched"] == 2
+
+
+def test_oldest_entries_are_evicted():
+    index = FingerprintIndex(max_entries=2)
+    for seed in range(3):
+        index.add(str(seed), frame_hashes(clip(seed)), 0.0)
+
+    assert len(index) == 2
+    assert index.lookup(frame_hashes(clip(0))) is None
+    assert index.lookup(frame_hashes(clip(2)))["key"] == "2"
+
+
+def test_index_persists_per_namespace(tmp_path):
+    path = tmp_path / "index.jsonl"
+    FingerprintIndex(path=path, namespace="m1").add("a", frame_hashes(clip(0)), 0.5)
+
+    assert FingerprintIndex(path=path, namespace="m1").lookup(frame_hashes(clip(0)))["key"] == "a"
+    # Another model's verdicts are never reused
+    assert FingerprintIndex(path=path, namespace="m2").lookup(frame_hashes(clip(0))) is None
+
+
+def test_replay_compacts_the_file(tmp_path):
+    path = tmp_path / "index.jsonl"
+    index = FingerprintIndex(max_entries=2, path=path)
+    for seed in range(4):
+        index.add(str(seed), frame_hashes(clip(seed)), 0.0)
+
+    replayed = FingerprintIndex(max_entries=2, path=path)
+    assert len(replayed) == 2 and len(path.read_text().splitlines()) == 2
+
+
+# ----------------------------------------------------------------------------
+# Near-duplicates in ModelManager.predict
+# ----------------------------------------------------------------------------
+
+def manipulate(frame, i):
+    """Repaint the lower face, as a face swap or lip-sync edit would"""
+    h, w = frame.shape[:2]
+    frame[h // 2 + 4:h // 2 + 16, w // 2 - 12:w // 2 + 12] = (60, 60, 160)
+
+
+def test_default_mode_is_prior():
+    assert backend.FINGERPRINT_MODE == "prior"
+
+
+def test_manipulated_derivative_is_scored_not_short_circuited(manager, video):
+    original = manager.predict(video("original.mp4"), "original")
+    derivative = manager.predict(video("derivative.mp4", edit=manipulate), "derivative")
+
+    assert "near_duplicate" not in original
+    match = derivative["near_duplicate"]
+    assert match["prediction_id"] == "original" and not match["reused"]
+    assert not derivative.get("short_circuited")
+    # The model ran, and the derivative is indexed under its own verdict
+    assert "model_seconds" in derivative["timings"]
+    assert len(manager.fingerprints) == 2
+
+
+def test_reuse_is_opt_in_and_never_used_without_activations(manager, video, monkeypatch):
+    manager.predict(video("original.mp4"), "original")
+    derivative = video("derivative.mp4", edit=manipulate)
+
+    monkeypatch.setattr(backend, "FINGERPRINT_MODE", "reuse")
+    reused = manager.predict(derivative, "derivative")
+    assert reused.get("short_circuited") and reused["cascade_reason"] == "near_duplicate"
+
+    # Explanations need the video's own activations
+    scored = manager.predict(derivative, "derivative", allow_reuse=False)
+    assert not scored.get("short_circuited")
+
+
+def test_unknown_mode_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(backend, "FINGERPRINT_MODE", "resue")
+    with pytest.raises(ValueError, match="FINGERPRINT_MODE"):
+        backend.ModelManager(str(tmp_path / "model.pth"), device="cpu", architecture="mobilenet_v3")
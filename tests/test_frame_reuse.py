@@ -0,0 +1,94 @@
+import cv2
+import numpy as np
+import pytest
+import torch
+
+from backend import FrameCache, ModelManager, frame_digest
+from conftest import synthetic_frames
+
+
+def write_mjpeg(path, frames):
+    """Intra-only MJPEG, so a frame encodes to the same packet wherever it sits, as in a stream-copied edit"""
+    height, width = frames[0].shape[:2]
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 25, (width, height))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+    return str(path)
+
+
+def numbered(frame, i):
+    """Make every frame distinct"""
+    frame[-6:] = i * 7 % 256
+
+
+@pytest.fixture
+def edits(tmp_path):
+    """An original clip, a copy with its first 16 frames cut, and one with a 24-frame intro"""
+    frames = synthetic_frames(96, edit=numbered)
+    intro = synthetic_frames(24, seed=1, edit=numbered)
+    return {
+        "original": write_mjpeg(tmp_path / "original.avi", frames),
+        "trimmed": write_mjpeg(tmp_path / "trimmed.avi", frames[16:]),
+        "intro": write_mjpeg(tmp_path / "intro.avi", intro + frames),
+    }
+
+
+def scored(manager, path):
+    """predict() plus the trunk features the temporal head was given"""
+    seen = []
+    classify = manager.model.classify_features
+    manager.model.classify_features = lambda feats, state=None: seen.append(feats) or classify(feats, state)
+    try:
+        return manager.predict(path), seen[0]
+    finally:
+        del manager.model.classify_features
+
+
+def fresh_manager(tmp_path):
+    torch.manual_seed(0)
+    return ModelManager(str(tmp_path / "model.pth"), device="cpu", architecture="mobilenet_v3")
+
+
+@pytest.mark.parametrize("copy", ["trimmed", "intro"])
+def test_edited_reupload_reuses_frames_and_matches_a_fresh_pass(manager, edits, copy, tmp_path):
+    first = manager.predict(edits["original"])
+    assert first["frames_reused"] == 0 and first["frame_reuse_ratio"] == 0.0
+
+    reused, feats = scored(manager, edits[copy])
+    fresh, fresh_feats = scored(fresh_manager(tmp_path), edits[copy])
+
+    assert reused["frames_reused"] > 0 and reused["frame_reuse_ratio"] == reused["frames_reused"] / 12
+    assert fresh["frames_reused"] == 0
+    assert reused["prediction"] == fresh["prediction"]
+    assert reused["raw_score"] == pytest.approx(fresh["raw_score"], abs=1e-5)
+    torch.testing.assert_close(feats, fresh_feats)
+
+
+def test_key_collisions_never_reuse_another_frame(manager, edits, tmp_path):
+    # Every frame shares one lookup key; only the exact digest tells them apart
+    manager.preprocessor.frame_key = lambda proxy, shape: "same"
+    manager.predict(edits["original"])
+
+    reused, feats = scored(manager, edits["trimmed"])
+    _, fresh_feats = scored(fresh_manager(tmp_path), edits["trimmed"])
+
+    torch.testing.assert_close(feats, fresh_feats)
+    assert reused["frames_reused"] <= 1
+
+
+def test_cache_confirms_digests_and_stays_within_its_budget():
+    frames = [np.full((8, 8, 3), value, np.uint8) for value in range(3)]
+    cache = FrameCache(max_bytes=2 * (256 + 4096))
+
+    cache.update("k", frame_digest(frames[0]), features=torch.zeros(1024))
+    assert cache.get("k", frames[0])["features"].shape == (1024,)
+    assert cache.get("k", frames[1]) is None and cache.get("missing", frames[0]) is None
+
+    # Another frame under the same key replaces the entry
+    cache.update("k", frame_digest(frames[1]), box=None, prob=0.0)
+    assert "features" not in cache.get("k", digest=frame_digest(frames[1]))
+
+    for i, frame in enumerate(frames):
+        cache.update(str(i), frame_digest(frame), features=torch.zeros(1024))
+    assert cache.bytes <= cache.max_bytes and cache.get("0", frames[0]) is None
@@ -0,0 +1,81 @@
+import cv2
+import numpy as np
+
+import backend
+from backend import VideoPreprocessor
+from face_detectors import FaceDetector
+
+
+def preprocessor(candidates):
+    return VideoPreprocessor(device="cpu", face_detector="none", frame_candidates=candidates)
+
+
+def test_one_candidate_keeps_the_training_positions(video):
+    p = preprocessor(1)
+    path = video(count=48)
+    info = {}
+    p.clips.release(p.extract_frames(path, info))
+
+    assert info["frame_indices"] == p.sample_indices(48)
+
+
+def test_candidates_stay_in_their_slot(video):
+    p = preprocessor(3)
+    info = {}
+    # Blur every other frame so the sharp neighbours win
+    p.clips.release(p.extract_frames(video(count=48, edit=lambda f, i: i % 2 and cv2.blur(f, (9, 9), dst=f)), info))
+
+    step = 48 // p.num_frames
+    assert len(info["frame_indices"]) == p.num_frames
+    assert all(slot * step <= i < (slot + 1) * step for slot, i in enumerate(info["frame_indices"]))
+    assert all(i % 2 == 0 for i in info["frame_indices"])
+
+
+class MarkerDetector(FaceDetector):
+    """Finds the synthetic face in frames that carry a white corner marker"""
+
+    name = "marker"
+
+    def detect(self, frames):
+        return [self._largest_first([[53, 30, 107, 90]], [0.99]) if frame[4:12, 4:12].mean() > 200
+                else self._empty() for frame in frames]
+
+
+def test_sharp_faces_win_their_slot_through_extract_frames(video):
+    def edit(frame, i):
+        # Every 4-frame slot: faceless, blurred face, then two sharp faces, so
+        # any three candidates of a slot include a sharp face
+        if i % 4:
+            frame[:16, :16] = 255
+        if i % 4 == 1:
+            cv2.blur(frame, (9, 9), dst=frame)
+
+    path = video(count=48, edit=edit)
+    chosen = {}
+    for candidates in (1, 3):
+        p = preprocessor(candidates)
+        p.detector, p.face_detection_enabled = MarkerDetector(), True
+        info = {}
+        p.clips.release(p.extract_frames(path, info))
+        chosen[candidates] = info["frame_indices"]
+
+    assert all(i % 4 == 0 for i in chosen[1])
+    assert [i // 4 for i in chosen[3]] == list(range(12)) and all(i % 4 >= 2 for i in chosen[3])
+
+
+def test_selection_is_on_by_default():
+    assert backend.FRAME_CANDIDATES == 3
+
+
+def test_quality_prefers_faces_then_probability_size_and_sharpness():
+    p = preprocessor(3)
+    rng = np.random.default_rng(0)
+    sharp = rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+    blurred = cv2.GaussianBlur(sharp, (15, 15), 5)
+    small, large = np.array([40, 30, 80, 70.0]), np.array([20, 10, 140, 110.0])
+
+    quality = p.frame_quality([sharp, blurred, sharp, sharp, sharp], [1.0] * 5,
+                              [None, small, small, small, large], [0.0, 0.9, 0.9, 0.5, 0.9])
+    # Faceless < blurred face < sharp face; lower probability ranks lower; a larger face ranks higher
+    assert quality[0] < quality[1] < quality[2] < quality[4]
+    assert quality[3] < quality[2]
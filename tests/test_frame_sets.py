@@ -0,0 +1,97 @@
+import io
+import zipfile
+
+import cv2
+import pytest
+from fastapi.testclient import TestClient
+
+import backend
+from backend import read_frame_set
+from conftest import synthetic_frames
+
+
+def png(frame):
+    return cv2.imencode(".png", frame)[1].tobytes()
+
+
+def archive(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as z:
+        for name, data in members:
+            z.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_zip_members_are_read_in_name_order():
+    images = [png(frame) for frame in synthetic_frames(3)]
+    data = archive([("b.png", images[1]), ("__MACOSX/a.png", b"junk"), ("c.png", images[2]),
+                    ("notes.txt", b"skip"), ("a.png", images[0])])
+
+    assert read_frame_set([("set.zip", data)]) == images
+
+
+def test_large_sets_are_sampled_before_reading():
+    images = [f"frame {i}".encode() for i in range(24)]
+
+    frames = read_frame_set([(f"{i:02d}.jpg", data) for i, data in enumerate(images)], limit=12)
+
+    assert frames == images[::2]
+
+
+@pytest.mark.parametrize("uploads, message", [
+    ([("clip.mp4", b"x")], "Unsupported file type"),
+    ([("set.zip", b"not a zip")], "Invalid zip archive"),
+    ([("set.zip", archive([("notes.txt", b"x")]))], "No image frames"),
+])
+def test_bad_frame_sets_are_rejected(uploads, message):
+    with pytest.raises(ValueError, match=message):
+        read_frame_set(uploads)
+
+
+def test_caps_apply_to_declared_sizes_before_decompressing(monkeypatch):
+    monkeypatch.setattr(backend, "MAX_FRAME_MB", 0.01)
+    # Highly compressible: tiny in the archive, over the per-frame cap once inflated
+    with pytest.raises(ValueError, match="over 0.01 MB"):
+        read_frame_set([("set.zip", archive([("a.png", b"\0" * 20000)]))])
+
+    monkeypatch.setattr(backend, "MAX_FRAME_MB", 20)
+    monkeypatch.setattr(backend, "MAX_FRAME_SET_MB", 0.01)
+    with pytest.raises(ValueError, match="uncompressed"):
+        read_frame_set([("a.png", b"\0" * 6000), ("b.png", b"\0" * 6000)])
+
+    monkeypatch.setattr(backend, "MAX_FRAMES_PER_REQUEST", 2)
+    with pytest.raises(ValueError, match="Maximum 2 frames"):
+        read_frame_set([(f"{i}.png", b"x") for i in range(3)])
+
+
+@pytest.fixture
+def client(manager, monkeypatch):
+    monkeypatch.setattr(backend, "model_manager", manager)
+    monkeypatch.setattr(backend, "result_cache", backend.ResultCache(16))
+    return TestClient(backend.app)
+
+
+def test_image_endpoint(client):
+    image = png(synthetic_frames(1)[0])
+
+    response = client.post("/predict/image", files={"file": ("face.png", image, "image/png")})
+    assert response.status_code == 200
+    assert response.json()["frames_analyzed"] == 1 and response.json()["video_name"] == "face.png"
+
+    assert client.post("/predict/image", files={"file": ("face.gif", image)}).status_code == 400
+    assert client.post("/predict/image", files={"file": ("face.png", b"garbage")}).status_code == 400
+    # Identical bytes come from the result cache
+    assert client.post("/predict/image", files={"file": ("again.png", image)}).json()["cached"]
+
+
+def test_frames_endpoint_takes_images_or_a_zip(client):
+    images = [png(frame) for frame in synthetic_frames(20)]
+
+    response = client.post("/predict/frames", files=[("files", (f"{i:02d}.png", data)) for i, data in enumerate(images)])
+    assert response.status_code == 200 and response.json()["frames_analyzed"] == 12
+
+    zipped = archive([(f"{i:02d}.png", data) for i, data in enumerate(images[:5])])
+    response = client.post("/predict/frames", files={"files": ("set.zip", zipped)})
+    assert response.status_code == 200 and response.json()["frames_analyzed"] == 5
+
+    assert client.post("/predict/frames", files={"files": ("set.zip", b"nope")}).status_code == 400
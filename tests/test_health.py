@@ -0,0 +1,87 @@
+import asyncio
+import json
+import subprocess
+import sys
+import textwrap
+
+from fastapi.testclient import TestClient
+
+import backend
+from conftest import ROOT
+
+
+class SlowDaemon:
+    """Stands in for InferenceClient: model_loaded() blocks like a socket ping"""
+
+    def __init__(self, loaded=True):
+        self.loaded = loaded
+        self.on_loop = []
+
+    def model_loaded(self):
+        try:
+            asyncio.get_running_loop()
+            self.on_loop.append(True)
+        except RuntimeError:
+            self.on_loop.append(False)
+        return self.loaded
+
+
+def set_stage(monkeypatch, stage, error=None):
+    monkeypatch.setitem(backend.startup, "stage", stage)
+    monkeypatch.setitem(backend.startup, "error", error)
+
+
+def test_live_fails_only_when_loading_failed(monkeypatch):
+    client = TestClient(backend.app)
+
+    set_stage(monkeypatch, "loading")
+    assert client.get("/live").status_code == 200
+    set_stage(monkeypatch, "failed", "no weights")
+    response = client.get("/live")
+    assert response.status_code == 503 and response.json()["error"] == "no weights"
+
+
+def test_ready_needs_the_ready_stage_and_a_model(monkeypatch, manager):
+    client = TestClient(backend.app)
+    monkeypatch.setattr(backend, "model_manager", manager)
+
+    set_stage(monkeypatch, "warming")
+    assert client.get("/ready").status_code == 503
+    set_stage(monkeypatch, "ready")
+    assert client.get("/ready").json()["ready"] is True
+    monkeypatch.setattr(backend, "model_manager", None)
+    assert client.get("/ready").status_code == 503
+    assert client.get("/health").json()["status"] == "unhealthy"
+
+
+def test_daemon_ping_runs_off_the_event_loop(monkeypatch):
+    client = TestClient(backend.app)
+    daemon = SlowDaemon(loaded=False)
+    monkeypatch.setattr(backend, "model_manager", daemon)
+    set_stage(monkeypatch, "ready")
+
+    assert client.get("/ready").status_code == 503
+    assert client.get("/health").json()["model_loaded"] is False
+    daemon.loaded = True
+    assert client.get("/ready").status_code == 200
+    # Every ping ran in the worker pool, never on the event loop
+    assert daemon.on_loop == [False, False, False]
+
+
+def test_importing_the_app_leaves_torch_to_the_loader():
+    script = textwrap.dedent("""
+        import json, sys
+        import backend
+        from fastapi.testclient import TestClient
+
+        before = sorted(m for m in ("torch", "cv2", "torchvision") if m in sys.modules)
+        health = TestClient(backend.app).get("/health").json()
+        backend.load_model_manager()
+        print(json.dumps({"before": before, "device": health["device"], "stage": backend.startup["stage"],
+                          "after": "torch" in sys.modules, "probed": backend.DEVICE}))
+    """)
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    report = json.loads(output.stdout.strip().splitlines()[-1])
+
+    assert report["before"] == [] and report["device"] == "pending"
+    assert report["stage"] == "ready" and report["after"] and report["probed"] == "cpu"
@@ -0,0 +1,122 @@
+import os
+import socket
+import struct
+import tempfile
+import threading
+import time
+
+import cv2
+import pytest
+
+from conftest import synthetic_frames
+from inference_ipc import (HEADER, MAX_BLOB_BYTES, OP_PING, OP_RESULT, InferenceDaemon, ProtocolError,
+                           RemoteModelManager, recv_message, send_message)
+
+
+def test_messages_round_trip_with_a_blob():
+    a, b = socket.socketpair()
+    with a, b:
+        send_message(a, OP_RESULT, {"score": 0.5}, b"\x00payload")
+        assert recv_message(b) == (OP_RESULT, {"score": 0.5}, b"\x00payload")
+        send_message(a, OP_PING)
+        assert recv_message(b) == (OP_PING, {}, b"")
+
+
+def test_bad_headers_and_oversized_frames_are_rejected():
+    a, b = socket.socketpair()
+    with a, b:
+        a.sendall(HEADER.pack(b"XX", 1, OP_PING, 0, 0))
+        with pytest.raises(ProtocolError):
+            recv_message(b)
+        a.sendall(HEADER.pack(b"DF", 1, OP_PING, 1 << 30, 0))
+        with pytest.raises(ProtocolError):
+            recv_message(b)
+        a.sendall(HEADER.pack(b"DF", 1, OP_PING, 0, MAX_BLOB_BYTES + 1))
+        with pytest.raises(ProtocolError):
+            recv_message(b)
+        a.sendall(struct.pack("!2s", b"DF"))
+        a.close()
+        with pytest.raises(ConnectionError):
+            recv_message(b)
+
+
+@pytest.fixture
+def daemon(manager):
+    # Unix socket paths are limited to ~100 bytes, so not under tmp_path
+    directory = tempfile.mkdtemp(prefix="df-ipc-")
+    path = os.path.join(directory, "s.sock")
+    daemon = InferenceDaemon(manager, socket_path=path, max_wait_ms=50)
+    threading.Thread(target=daemon.serve_forever, daemon=True).start()
+    for _ in range(100):
+        if os.path.exists(path):
+            break
+        time.sleep(0.05)
+    yield daemon
+    daemon.shutdown()
+
+
+def test_client_scores_through_the_daemon(daemon, manager, video):
+    client = RemoteModelManager(daemon.socket_path)
+    path = video(count=48)
+
+    assert client.model_loaded() and client.ping()["max_batch_size"] == 8
+    remote = client.predict(path)
+    assert remote["frames_real"] == 12
+    assert remote["raw_score"] == pytest.approx(manager.predict(path)["raw_score"], abs=1e-5)
+    with open(path, "rb") as f:
+        assert client.predict_bytes(f.read())["prediction"] == remote["prediction"]
+
+    images = [cv2.imencode(".png", frame)[1].tobytes() for frame in synthetic_frames(3)]
+    assert client.predict_images(images)["frames_analyzed"] == 3
+
+
+def test_concurrent_requests_all_go_through_the_batcher(daemon, video):
+    batches = []
+    predict_clips = daemon.model_manager.predict_clips
+    daemon.model_manager.predict_clips = lambda clips: batches.append(len(clips)) or predict_clips(clips)
+    path = video(count=48)
+    client = RemoteModelManager(daemon.socket_path)
+
+    threads = [threading.Thread(target=client.predict, args=(path,)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(batches) == 3
+
+
+def test_errors_are_raised_on_the_client(daemon, tmp_path):
+    client = RemoteModelManager(daemon.socket_path)
+    broken = tmp_path / "broken.mp4"
+    broken.write_bytes(b"not a video")
+
+    with pytest.raises((ValueError, RuntimeError)):
+        client.predict(str(broken))
+    # The connection survives an error reply
+    assert client.ping() is not None
+
+
+def test_unreachable_daemon_reports_not_loaded(tmp_path):
+    client = RemoteModelManager(str(tmp_path / "missing.sock"))
+
+    assert client.ping() is None and not client.model_loaded()
+
+
+def test_socket_is_owner_only(daemon):
+    assert os.stat(daemon.socket_path).st_mode & 0o777 == 0o600
+
+
+def test_paths_outside_the_allowed_roots_are_refused(daemon, tmp_path):
+    client = RemoteModelManager(daemon.socket_path)
+    # tmp_path is under the temp dir; a symlink there cannot lead the daemon out of it
+    escape = tmp_path / "escape.mp4"
+    escape.symlink_to("/etc/passwd")
+
+    for path in ("/etc/passwd", str(escape), os.path.join(tempfile.gettempdir(), "..", "etc", "passwd")):
+        with pytest.raises(PermissionError):
+            client.predict(path)
+
+    daemon.path_roots = [os.path.realpath(tmp_path / "spool")]
+    with pytest.raises(PermissionError):
+        client.predict(str(tmp_path / "spool-sibling" / "clip.mp4"))
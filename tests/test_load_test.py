@@ -0,0 +1,59 @@
+import asyncio
+
+import httpx
+import pytest
+
+import backend
+import load_test
+from load_test import Traffic, latency_summary, make_corpus, parse_mix, summarize
+
+
+def test_mix_weights_default_to_one():
+    assert parse_mix("predict=3,health") == {"predict": 3.0, "health": 1.0}
+    with pytest.raises(SystemExit):
+        parse_mix("predict,upload=2")
+
+
+def record(kind, status, latency, error=None, videos=1):
+    return {"kind": kind, "start": 0.0, "end": latency, "latency": latency, "status": status,
+            "ok": status == 200 and error is None, "error": error, "videos": videos}
+
+
+def test_summary_counts_only_successes_as_throughput():
+    records = [record("predict", 200, 0.1 * (i + 1)) for i in range(10)]
+    records += [record("batch", 200, 2.0, videos=4), record("batch", 200, 2.0, "1 batch items failed", 4),
+                record("predict", 429, 0.01), record("health", None, 5.0, "ReadTimeout", 0)]
+    samples = [{"cpu_percent": 50.0, "rss_mb": 900.0}, {"cpu_percent": 150.0, "rss_mb": 1000.0}]
+
+    summary = summarize(records, 0.0, 10.0, samples)
+
+    assert (summary["requests"], summary["completed"], summary["errors"]) == (14, 11, 3)
+    assert summary["throughput"] == pytest.approx(1.1)
+    assert summary["videos_per_second"] == pytest.approx(1.4)
+    assert summary["rejected_429"] == 1
+    assert summary["statuses"] == {"200": 11, "200 (1 batch items failed)": 1, "429": 1, "ReadTimeout": 1}
+    assert summary["by_kind"]["predict"]["latency"]["p50"] == pytest.approx(0.55)
+    assert summary["by_kind"]["health"]["latency"] is None
+    assert summary["resources"]["cpu_percent_mean"] == 100.0 and summary["resources"]["rss_mb_max"] == 1000.0
+    assert latency_summary([]) is None
+
+
+def test_traffic_drives_the_app(manager, monkeypatch):
+    monkeypatch.setattr(backend, "model_manager", manager)
+    monkeypatch.setattr(backend, "result_cache", backend.ResultCache(16))
+    corpus = make_corpus(2, num_frames=12, width=160, height=120, portraits=load_test.ROOT / "missing")
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=backend.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=60) as client:
+            traffic = Traffic(client, corpus, {"predict": 1, "batch": 1, "health": 1}, batch_size=2, unique=True)
+            for n in range(9):
+                await traffic.send(n, measure_after=0.0)
+            return traffic.records
+
+    records = asyncio.run(scenario())
+
+    assert len(records) == 9 and all(r["ok"] for r in records)
+    assert {r["kind"] for r in records} == {"predict", "batch", "health"}
+    # Unique payloads are all distinct content, so every video was scored and cached
+    assert len(backend.result_cache._entries) == sum(r["videos"] for r in records)
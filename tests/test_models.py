@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+import torch
+
+from backend import ModelManager
+from models import MODEL_ARCHITECTURES, StudentBiLSTM, build_model
+from training import agreement, load_checkpoint, print_report, save_checkpoint
+
+
+@pytest.mark.parametrize("architecture", MODEL_ARCHITECTURES)
+def test_architectures_share_the_trunk_and_head_interface(architecture):
+    torch.manual_seed(0)
+    model = build_model(architecture, pretrained=False).eval()
+    clips = torch.randn(2, 3, 3, 64, 64)
+
+    with torch.no_grad():
+        feats = model.extract_features(clips.view(6, 3, 64, 64))
+        logits, state = model.classify_features(feats.view(2, 3, -1))
+        direct = model(clips)
+
+    assert feats.shape == (6, model.feature_dim)
+    assert logits.shape == direct.shape == (2, 1)
+    assert torch.allclose(logits, direct, atol=1e-5)
+    # The BiLSTM hands back (h_n, c_n) so streams can carry it across windows
+    assert state[0].shape == (2, 2, 256)
+
+
+def test_student_trunks_are_much_smaller_than_resnet50():
+    sizes = {name: sum(p.numel() for p in build_model(name, pretrained=False).cnn.parameters())
+             for name in MODEL_ARCHITECTURES}
+    assert sizes["mobilenet_v3"] < sizes["efficientnet_b0"] < sizes["resnet50"] / 4
+
+
+def test_unknown_architectures_are_rejected():
+    with pytest.raises(ValueError, match="Unknown model architecture"):
+        build_model("vgg16")
+    with pytest.raises(ValueError, match="Unknown student trunk"):
+        StudentBiLSTM(trunk="vgg16")
+
+
+def test_checkpoints_name_their_architecture(tmp_path):
+    torch.manual_seed(0)
+    student = build_model("efficientnet_b0").eval()
+    path = tmp_path / "student.pth"
+    save_checkpoint(path, student, "efficientnet_b0", teacher="teacher.pth")
+    clips = torch.randn(1, 12, 3, 64, 64)
+    with torch.no_grad():
+        expected = student(clips)
+
+    loaded, architecture, _ = load_checkpoint(path)
+    # ModelManager's own default is resnet50; the checkpoint overrides it
+    manager = ModelManager(str(path), device="cpu", architecture="resnet50")
+
+    assert architecture == manager.architecture == "efficientnet_b0"
+    with torch.no_grad():
+        assert torch.allclose(loaded(clips), expected, atol=1e-5)
+        assert torch.allclose(manager.model(clips), expected, atol=1e-5)
+
+
+def test_agreement_and_report_handle_an_empty_set(capsys):
+    assert agreement(np.array([1.0, -2.0, 0.5]), np.array([2.0, 1.0, 0.1])) == pytest.approx(2 / 3)
+    assert agreement(np.array([]), np.array([])) is None
+
+    print_report([{
+        "model": "student.pth", "architecture": "mobilenet_v3", "parameters": 4.2e6, "gflops_per_clip": 2.7,
+        "latency_ms": 30.0, "clips_per_second": 33.3, "accuracy": None, "agreement": None,
+    }])
+    assert "student.pth" in capsys.readouterr().out
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+import torch
+
+import backend
+from backend import box_iou, link_tracks
+from face_detectors import FaceDetector
+
+LEFT = [10, 10, 70, 70]
+RIGHT = [90, 10, 150, 70]
+TINY = [75, 90, 90, 108]
+FLICKER = [10, 75, 50, 115]
+
+
+class ScriptedDetector(FaceDetector):
+    """Two steady faces, a 15x18 one, and one seen in every fourth frame only"""
+
+    name = "scripted"
+
+    def __init__(self, empty=False):
+        self.empty = empty
+        self.frames = 0
+
+    def detect(self, frames):
+        out = []
+        for _ in frames:
+            boxes = [] if self.empty else [LEFT, RIGHT, TINY] + ([FLICKER] if self.frames % 4 == 0 else [])
+            out.append(self._largest_first(boxes, [0.99] * len(boxes)))
+            self.frames += 1
+        return out
+
+
+def test_box_iou():
+    assert box_iou([0, 0, 10, 10], [0, 0, 10, 10]) == 1.0
+    assert box_iou([0, 0, 10, 10], [5, 0, 15, 10]) == pytest.approx(1 / 3)
+    assert box_iou([0, 0, 10, 10], [10, 0, 20, 10]) == 0.0
+
+
+def test_link_tracks_follows_overlap_and_bridges_gaps():
+    faces = [
+        (0, np.array(LEFT), 0.9), (0, np.array(RIGHT), 0.9),
+        (1, np.array([12, 10, 72, 70]), 0.9),
+        (2, np.array([92, 12, 152, 72]), 0.9), (2, np.array([14, 10, 74, 70]), 0.9),
+    ]
+
+    # The right face is missing from frame 1 and picks its track up again in frame 2
+    assert link_tracks(faces, 0.3) == [[0, 2, 4], [1, 3]]
+    assert len(link_tracks(faces, 0.99)) == 5
+
+
+@pytest.fixture
+def scripted(manager, monkeypatch):
+    detector = ScriptedDetector()
+    monkeypatch.setattr(manager.preprocessor, "detector", detector)
+    return detector
+
+
+def test_small_and_short_lived_faces_are_not_tracked(manager, scripted, video):
+    result = manager.predict_faces(video(count=48))
+
+    faces = result["faces"]
+    assert faces["tracks"] == 2
+    assert sorted(tuple(score["box"]) for score in faces["scores"]) == [tuple(LEFT), tuple(RIGHT)]
+    assert all(score["frames_analyzed"] == 12 for score in faces["scores"])
+
+
+def test_other_faces_need_the_stricter_threshold(manager, scripted, video, monkeypatch):
+    path = video(count=48)
+    logits = []
+    monkeypatch.setattr(manager.model, "classify_features", lambda feats: (torch.tensor(logits), None))
+
+    # Primary real, second face at 0.88: over 0.5 but under MULTI_FACE_THRESHOLD
+    logits[:] = [[-3.0], [2.0]]
+    faces = manager.predict_faces(path)
+    assert faces["prediction"] == "REAL" and faces["faces"]["fake_tracks"] == 0
+    assert [score["threshold"] for score in faces["faces"]["scores"]] == [0.5, backend.MULTI_FACE_THRESHOLD]
+
+    logits[:] = [[-3.0], [3.0]]
+    faces = manager.predict_faces(path)
+    assert faces["prediction"] == "FAKE" and faces["faces"]["worst_track"] == 1
+    assert faces["raw_score"] == 3.0
+
+    logits[:] = [[0.5], [2.0]]
+    faces = manager.predict_faces(path)
+    assert faces["is_fake"] and faces["faces"]["worst_track"] == 0
+
+
+def test_no_track_falls_back_to_the_same_decode(manager, video, monkeypatch):
+    monkeypatch.setattr(manager.preprocessor, "detector", ScriptedDetector(empty=True))
+    path = video(count=48)
+    opened = []
+    open_decoder = manager.preprocessor.decoders.open
+    monkeypatch.setattr(manager.preprocessor.decoders, "open", lambda p: opened.append(p) or open_decoder(p))
+
+    result = manager.predict_faces(path)
+
+    assert result["faces"]["tracks"] == 0 and len(opened) == 1
+    assert result["frames_real"] == 12
+    manager.cascade = manager.fingerprints = None
+    assert result["raw_score"] == pytest.approx(manager.predict(path)["raw_score"], abs=1e-6)
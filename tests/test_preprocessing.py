@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+import torch
+
+from backend import VideoPreprocessor
+from face_detectors import FaceDetector
+
+
+class ProxyDetector(FaceDetector):
+    """Finds one face at a fixed place of whatever (proxy) frame it is given"""
+
+    name = "proxy"
+
+    def __init__(self):
+        self.shapes = []
+
+    def detect(self, frames):
+        self.shapes.extend(frame.shape for frame in frames)
+        return [self._largest_first([[frame.shape[1] / 4, frame.shape[0] / 4,
+                                      frame.shape[1] / 2, frame.shape[0] / 2]], [0.99]) for frame in frames]
+
+
+def preprocessor(detect_size, **options):
+    p = VideoPreprocessor(device="cpu", face_detector="none", detect_size=detect_size, **options)
+    p.detector = ProxyDetector()
+    return p
+
+
+def frame(width, height, seed=0):
+    return np.random.default_rng(seed).integers(0, 255, (height, width, 3), dtype=np.uint8)
+
+
+def test_downscale_bounds_the_longest_side():
+    p = preprocessor(320)
+
+    proxy, scale = p.downscale(frame(1280, 720))
+    assert proxy.shape == (180, 320, 3) and scale == 0.25
+    small = frame(200, 100)
+    assert p.downscale(small) == (small, 1.0)
+    assert preprocessor(0).downscale(frame(1280, 720))[1] == 1.0
+
+
+def test_faces_are_found_on_the_proxy_and_boxed_at_full_resolution():
+    p = preprocessor(320)
+
+    frames = [frame(1280, 720)]
+    proxies, scales, boxes, probs = p.locate_faces(frames)
+    p.release_proxies(frames, proxies)
+
+    assert p.detector.shapes == [(180, 320, 3)]
+    np.testing.assert_allclose(boxes[0], [320, 180, 640, 360])
+    assert probs == [pytest.approx(0.99)]
+
+
+def test_crops_match_detection_at_full_resolution():
+    full = frame(1280, 720, seed=1)
+    downscaled = preprocessor(320).process_frames([full])[0]
+    direct = preprocessor(0).process_frames([full])[0]
+
+    # The box is the same region either way, so the crop is taken from the same pixels
+    assert downscaled.shape == (3, 224, 224)
+    assert torch.equal(downscaled, direct)
+
+
+def test_proxies_are_recycled():
+    p = preprocessor(320)
+    frames = [frame(1280, 720, seed=i) for i in range(3)]
+
+    p.process_frames(frames)
+    p.process_frames(frames)
+
+    assert p.scratch.stats()["hits"] >= 3
+
+
+def test_working_set_grows_with_resolution():
+    p = preprocessor(640)
+
+    assert p.working_set_bytes(3840, 2160) > p.working_set_bytes(1280, 720) > 0
@@ -0,0 +1,159 @@
+from fractions import Fraction
+
+import av
+import numpy as np
+import pytest
+
+from backend import VideoPreprocessor
+from conftest import write_video
+from decoders import DECODERS, VideoIndex, probe_video
+
+
+def encode(path, frames, rate=25, pts_ms=None, rotation=0):
+    """Encode BGR frames with PyAV; pts_ms gives per-frame timestamps (VFR), rotation a display matrix"""
+    with av.open(str(path), "w") as container:
+        stream = container.add_stream("mpeg4", rate=rate)
+        stream.height, stream.width = frames[0].shape[:2]
+        stream.pix_fmt = "yuv420p"
+        if pts_ms is not None:
+            stream.codec_context.time_base = Fraction(1, 1000)
+        if rotation:
+            stream.set_display_rotation(rotation)
+        for i, array in enumerate(frames):
+            frame = av.VideoFrame.from_ndarray(array, format="bgr24")
+            if pts_ms is not None:
+                frame.pts, frame.time_base = pts_ms[i], Fraction(1, 1000)
+            for packet in stream.encode(frame):
+                container.mux(packet)
+        for packet in stream.encode():
+            container.mux(packet)
+    return str(path)
+
+
+@pytest.fixture
+def numbered(tmp_path):
+    frames = [np.full((64, 96, 3), 5 * i, np.uint8) for i in range(48)]
+    return write_video(tmp_path / "numbered.mp4", frames)
+
+
+def test_exact_index_of_a_constant_rate_video(numbered):
+    index = probe_video(numbered)
+
+    assert index.exact and not index.variable_rate
+    assert (index.frame_count, index.width, index.height, index.rotation) == (48, 96, 64, 0)
+    assert index.fps == pytest.approx(25.0)
+    assert index.duration == pytest.approx(48 / 25)
+    assert index.keyframes[0] == 0
+    assert [index.position_at(i / 25) for i in (0, 7, 47)] == [0, 7, 47]
+    # Between two frames the later one is presented
+    assert index.position_at(7.5 / 25) == 8
+    assert index.keyframe_before(30) == max(k for k in index.keyframes if k <= 30)
+
+
+def test_variable_frame_rate_positions_follow_timestamps(tmp_path):
+    # 15 frames 40 ms apart, then 15 frames 80 ms apart
+    stamps = [40 * i for i in range(15)] + [560 + 80 * i for i in range(1, 16)]
+    path = encode(tmp_path / "vfr.mp4", [np.full((64, 96, 3), 8 * i, np.uint8) for i in range(30)], pts_ms=stamps)
+
+    index = probe_video(path)
+
+    assert index.exact and index.variable_rate
+    assert index.frame_count == 30
+    assert index.pts[:2] == pytest.approx([0.0, 0.04])
+    # A constant-rate guess (frame_count / duration) would land elsewhere in the slow half
+    assert index.position_at(1.2) == 22
+    assert index.position_at(1.2) != round(1.2 * index.frame_count / index.duration)
+
+
+def test_display_rotation_is_read_and_applied(tmp_path):
+    frame = np.zeros((64, 96, 3), np.uint8)
+    frame[:16, :24] = 255
+    path = encode(tmp_path / "rotated.mp4", [frame] * 6, rate=10, rotation=90)
+
+    index = probe_video(path)
+    assert index.rotation == 90
+    assert (index.width, index.height) == (96, 64)
+
+    with DECODERS["pyav"](path) as decoder:
+        (_, upright), = decoder.read([0], index)
+    # Displayed upright the stored landscape frame turns portrait
+    assert upright.shape[:2] == (96, 64)
+
+
+def test_packet_limit_falls_back_to_the_header_estimate(numbered):
+    index = probe_video(numbered, max_packets=10)
+
+    assert not index.exact
+    assert index.frame_count == 48
+    assert index.fps == pytest.approx(25.0)
+    assert list(index.keyframes) == [0]
+    assert probe_video(numbered, max_packets=48).exact
+
+
+def test_unreadable_file_has_no_index(tmp_path):
+    path = tmp_path / "broken.mp4"
+    path.write_bytes(b"not a video")
+    assert probe_video(str(path)) is None
+
+
+def test_index_summary_reports_its_fields():
+    index = VideoIndex([0.0, 0.1, 0.25], [0], 10.0, 0.35, rotation=270, width=8, height=6)
+    assert index.summary() == {
+        "frame_count": 3, "keyframes": 1, "fps": 10.0, "duration": 0.35, "variable_rate": True,
+        "rotation": 270, "width": 8, "height": 6, "exact": True,
+    }
+    assert index.keyframe_before(2) == 0
+
+
+def test_sample_indices_spacing_and_offset():
+    preprocessor = VideoPreprocessor("cpu", num_frames=4, face_detector="none")
+
+    assert preprocessor.sample_indices(48) == [0, 12, 24, 36]
+    assert preprocessor.sample_indices(48, 0.5) == [6, 18, 30, 42]
+    # Shorter than num_frames: consecutive frames, the decoder stops at the end
+    assert preprocessor.sample_indices(3) == [0, 1, 2, 3]
+
+
+def test_packet_checksums_survive_a_stream_copied_trim(numbered, tmp_path):
+    trimmed = tmp_path / "trimmed.mp4"
+    with av.open(numbered) as source, av.open(str(trimmed), "w") as target:
+        stream = source.streams.video[0]
+        copy = target.add_stream_from_template(stream)
+        keyframes = 0
+        for packet in source.demux(stream):
+            keyframes += bool(packet.is_keyframe)
+            # Cut at the second keyframe, as a stream-copying editor would
+            if packet.dts is not None and keyframes >= 2:
+                packet.stream = copy
+                target.mux(packet)
+
+    original, cut = probe_video(numbered).packet_crcs, probe_video(str(trimmed)).packet_crcs
+
+    assert len(original) == 48 and 0 < len(cut) < 48
+    assert (cut == original[-len(cut):]).all()
+    assert probe_video(numbered, max_packets=10).packet_crcs is None
+
+
+def test_index_cache_is_keyed_by_content(numbered, monkeypatch):
+    probes = []
+    monkeypatch.setattr("decoders.probe_video", lambda *args: probes.append(args) or probe_video(*args))
+    preprocessor = VideoPreprocessor("cpu", face_detector="none")
+
+    first = preprocessor.video_index(numbered, "key")
+    assert preprocessor.video_index(numbered, "key") is first
+    preprocessor.video_index(numbered)
+    assert len(probes) == 2
+
+    uncached = VideoPreprocessor("cpu", face_detector="none", index_cache_size=0)
+    uncached.video_index(numbered, "key")
+    uncached.video_index(numbered, "key")
+    assert len(probes) == 4
+
+
+def test_probe_packet_limit_keeps_frame_positions(numbered):
+    """VIDEO_PROBE_MAX_PACKETS only changes how the frame count is found"""
+    exact, estimated = {}, {}
+    VideoPreprocessor("cpu", face_detector="none").extract_frames(numbered, exact)
+    VideoPreprocessor("cpu", face_detector="none", probe_max_packets=10).extract_frames(numbered, estimated)
+
+    assert estimated["frame_indices"] == exact["frame_indices"] == list(range(0, 48, 4))
@@ -0,0 +1,107 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import torch
+from fastapi.testclient import TestClient
+
+import backend
+from profiling import RequestProfiler
+
+
+def work():
+    torch.randn(64, 64) @ torch.randn(64, 64)
+    time.sleep(0.05)
+
+
+def test_arming_needs_a_request_count_or_window(tmp_path):
+    profiler = RequestProfiler(tmp_path)
+    with pytest.raises(ValueError):
+        profiler.arm()
+
+    status = profiler.arm(requests=2)
+    assert status["armed"] and status["remaining_requests"] == 2 and status["remaining_seconds"] is None
+    assert not profiler.disarm()["armed"]
+
+
+def test_capture_writes_traces_for_the_armed_requests_only(tmp_path):
+    profiler = RequestProfiler(tmp_path, sample_hz=1000)
+    profiler.arm(requests=1)
+
+    for label in ("first", "second"):
+        with profiler.capture(label):
+            with profiler.stage("matmul"):
+                work()
+
+    capture, = profiler.captures
+    folder = Path(capture["path"])
+    assert capture["label"] == "first" and not profiler.armed
+    assert sorted(p.name for p in folder.iterdir()) == ["python.collapsed", "torch_ops.txt", "torch_trace.json"]
+    assert "matmul" in (folder / "torch_trace.json").read_text()
+    # Collapsed stacks end in this test's frames with a sample count
+    stack, count = (folder / "python.collapsed").read_text().splitlines()[0].rsplit(" ", 1)
+    assert stack.endswith("test_profiling.work") and int(count) > 0
+
+
+def test_capture_options_and_window(tmp_path):
+    profiler = RequestProfiler(tmp_path)
+    profiler.arm(seconds=0.2, torch_ops=False)
+    with profiler.capture("stacks"):
+        work()
+    time.sleep(0.2)
+    with profiler.capture("late"):
+        work()
+
+    assert [c["files"] for c in profiler.captures] == [["python.collapsed"]]
+    assert not profiler.status()["armed"]
+
+
+def test_one_request_is_profiled_at_a_time(tmp_path):
+    profiler = RequestProfiler(tmp_path)
+    profiler.arm(requests=5, python_stacks=False)
+    inside = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        with profiler.capture("slow"):
+            inside.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=slow)
+    thread.start()
+    inside.wait(5)
+    with profiler.capture("concurrent"):
+        # The stage belongs to the other thread's capture, so it is a no-op here
+        with profiler.stage("ignored"):
+            pass
+    release.set()
+    thread.join(5)
+
+    assert [c["label"] for c in profiler.captures] == ["slow"]
+    assert profiler.status()["remaining_requests"] == 4
+
+
+@pytest.fixture
+def client(manager, tmp_path, monkeypatch):
+    monkeypatch.setattr(backend, "model_manager", manager)
+    monkeypatch.setattr(backend, "result_cache", backend.ResultCache(16))
+    monkeypatch.setattr(backend, "request_profiler", RequestProfiler(tmp_path / "profiles"))
+    monkeypatch.setattr(backend, "ADMIN_TOKEN", "secret")
+    return TestClient(backend.app, headers={"X-Admin-Token": "secret"})
+
+
+def test_profile_endpoints_capture_a_prediction(client, video):
+    assert client.post("/admin/profile").status_code == 400
+    assert client.post("/admin/profile", params={"requests": 1, "torch_ops": False}).json()["armed"]
+
+    with open(video(), "rb") as f:
+        assert client.post("/predict", files={"file": ("clip.mp4", f, "video/mp4")}).status_code == 200
+
+    status = client.get("/admin/profile").json()
+    assert not status["armed"]
+    assert [c["files"] for c in status["captures"]] == [["python.collapsed"]]
+    assert "backend.predict" in Path(status["captures"][0]["path"], "python.collapsed").read_text()
+
+    client.post("/admin/profile", params={"seconds": 60})
+    assert not client.delete("/admin/profile").json()["armed"]
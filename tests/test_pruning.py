@@ -0,0 +1,75 @@
+import pytest
+import torch
+
+from backend import ModelManager
+from models import ResNet50BiLSTM
+from prune_model import channel_importance, keep_count, prune
+from training import save_checkpoint
+
+
+@pytest.fixture(scope="module")
+def resnet():
+    torch.manual_seed(0)
+    return ResNet50BiLSTM(pretrained=False).eval()
+
+
+@pytest.fixture(scope="module")
+def importance(resnet):
+    torch.manual_seed(1)
+    loader = [(torch.randn(1, 2, 3, 64, 64), torch.zeros(1), ["clip"]) for _ in range(2)]
+    return channel_importance(resnet, loader, "cpu")
+
+
+def test_keep_count_rounds_to_multiples_of_eight():
+    assert keep_count(64, 0.0) == 64
+    assert keep_count(64, 0.5) == 32
+    assert keep_count(100, 0.25) == 72
+    # Never below one group of 8 nor above the original width
+    assert keep_count(64, 0.99) == 8
+    assert keep_count(4, 0.5) == 4
+
+
+def test_importance_covers_every_bottleneck_channel(resnet, importance):
+    blocks = resnet.bottlenecks()
+    assert len(blocks) == 16
+    assert len(importance) == 32
+    assert importance[(0, 1)].shape == (blocks[0].conv1.out_channels,)
+    assert importance[(15, 2)].shape == (blocks[15].conv2.out_channels,)
+    assert all((value >= 0).all() for value in importance.values())
+
+
+def test_pruning_nothing_keeps_the_outputs(resnet, importance):
+    pruned, widths = prune(resnet, importance, 0.0)
+    clips = torch.randn(1, 2, 3, 64, 64)
+
+    assert widths[0] == [64, 64]
+    with torch.no_grad():
+        assert torch.allclose(pruned(clips), resnet(clips), atol=1e-4)
+
+
+def test_pruning_keeps_the_most_active_channels(resnet, importance):
+    pruned, widths = prune(resnet, importance, 0.5)
+    block, original = pruned.bottlenecks()[0], resnet.bottlenecks()[0]
+    keep = importance[(0, 1)].topk(32).indices.sort().values
+
+    assert widths[0] == [32, 32] and widths[-1] == [256, 256]
+    assert torch.equal(block.conv1.weight, original.conv1.weight[keep])
+    # The residual path keeps its width and the source model is left intact
+    assert block.conv3.out_channels == original.conv3.out_channels == 256
+    assert original.conv1.out_channels == 64
+    assert not pruned.training
+    assert sum(p.numel() for p in pruned.parameters()) < sum(p.numel() for p in resnet.parameters())
+
+
+def test_pruned_checkpoint_loads_with_its_widths(resnet, importance, tmp_path):
+    pruned, widths = prune(resnet, importance, 0.25)
+    path = tmp_path / "pruned.pth"
+    save_checkpoint(path, pruned, "resnet50", {"hidden": 256, "widths": widths})
+    clips = torch.randn(1, 12, 3, 64, 64)
+
+    manager = ModelManager(str(path), device="cpu")
+
+    assert manager.architecture == "resnet50"
+    assert manager.model.bottlenecks()[0].conv1.out_channels == widths[0][0] == 48
+    with torch.no_grad():
+        assert torch.allclose(manager.model(clips), pruned(clips), atol=1e-4)
@@ -0,0 +1,106 @@
+import av
+import cv2
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import backend
+from backend import StreamScorer
+from conftest import synthetic_frames
+
+
+def test_windows_are_scored_as_they_fill(manager):
+    scorer = StreamScorer(manager, window=4, sample_every=2)
+    results = []
+    pending = []
+    # As the endpoint does: sample each incoming frame, score once a window fills
+    for frame in synthetic_frames(10):
+        if scorer.sample():
+            pending.append(frame)
+            if len(scorer.features) + len(pending) >= scorer.window:
+                results.append(scorer.add_frames(pending))
+                pending = []
+    # The trailing sampled frame is scored as a partial window at the end
+    results.append(scorer.flush(pending))
+
+    assert scorer.frames_received == 10 and scorer.summary()["frames_scored"] == 5
+    assert [r["window"] for r in results] == [1, 2]
+    assert [r["frames_analyzed"] for r in results] == [4, 1]
+    assert results[0]["type"] == "score" and scorer.flush() is None
+
+
+def test_forward_state_is_carried_and_backward_state_reset(manager):
+    scorer = StreamScorer(manager, window=4)
+    if not hasattr(manager.model, "lstm"):
+        pytest.skip("pooling heads carry no state")
+
+    for frame in synthetic_frames(4):
+        scorer.sample()
+    scorer.add_frames(synthetic_frames(4))
+
+    h, c = scorer.state
+    assert h[0].abs().sum() > 0 and h[1].abs().sum() == 0 and c[1].abs().sum() == 0
+    assert StreamScorer(manager, window=4, carry_state=False).state is None
+
+
+@pytest.fixture
+def client(manager, monkeypatch):
+    monkeypatch.setattr(backend, "model_manager", manager)
+    return TestClient(backend.app)
+
+
+def png(frame):
+    return cv2.imencode(".png", frame)[1].tobytes()
+
+
+def test_frames_mode_pushes_a_score_per_window(client):
+    with client.websocket_connect("/predict/stream?window=4") as ws:
+        for frame in synthetic_frames(9):
+            ws.send_bytes(png(frame))
+        ws.send_bytes(b"not an image")
+        assert ws.receive_json() == {"type": "error", "detail": "Could not decode frame"}
+        ws.send_json({"type": "end"})
+        messages = [ws.receive_json() for _ in range(4)]
+
+    assert [m["type"] for m in messages] == ["score", "score", "score", "end"]
+    assert [m["frames_analyzed"] for m in messages[:3]] == [4, 4, 1]
+    assert messages[-1]["frames_received"] == 9 and messages[-1]["windows"] == 3
+
+
+def test_video_mode_decodes_chunks_while_they_arrive(client, tmp_path):
+    path = tmp_path / "live.ts"
+    with av.open(str(path), "w", format="mpegts") as container:
+        stream = container.add_stream("mpeg4", rate=25)
+        stream.width, stream.height, stream.pix_fmt = 160, 120, "yuv420p"
+        for frame in synthetic_frames(8):
+            container.mux(stream.encode(av.VideoFrame.from_ndarray(frame, format="bgr24")))
+        container.mux(stream.encode())
+    data = path.read_bytes()
+
+    with client.websocket_connect("/predict/stream?mode=video&window=4") as ws:
+        for start in range(0, len(data), 4096):
+            ws.send_bytes(data[start:start + 4096])
+        ws.send_json({"type": "end"})
+        messages = []
+        while not messages or messages[-1]["type"] != "end":
+            messages.append(ws.receive_json())
+
+    assert messages[-1]["frames_received"] == 8 and messages[-1]["errors"] == []
+    assert [m["frames_analyzed"] for m in messages[:-1]] == [4, 4]
+
+
+def test_oversized_messages_close_the_stream(client, monkeypatch):
+    monkeypatch.setattr(backend, "STREAM_MAX_MESSAGE_MB", 0.001)
+
+    with client.websocket_connect("/predict/stream") as ws:
+        ws.send_bytes(b"\0" * 2048)
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1009
+
+
+def test_unknown_modes_are_refused(client):
+    with client.websocket_connect("/predict/stream?mode=audio") as ws:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1003
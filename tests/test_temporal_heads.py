@@ -0,0 +1,76 @@
+from argparse import Namespace
+
+import pytest
+import torch
+
+from backend import ModelManager, StreamScorer
+from conftest import synthetic_frames
+from models import TEMPORAL_HEADS, build_model
+from train_temporal_heads import head_logits, train_head
+from training import save_checkpoint
+
+
+def student(head):
+    torch.manual_seed(0)
+    return build_model("mobilenet_v3", temporal_head=head).eval()
+
+
+@pytest.mark.parametrize("head", TEMPORAL_HEADS)
+def test_every_head_classifies_trunk_features(head):
+    model = student(head)
+    feats = torch.randn(2, 12, model.feature_dim)
+
+    with torch.no_grad():
+        logits, state = model.classify_features(feats)
+
+    assert logits.shape == (2, 1)
+    assert (state is None) == (head != "bilstm")
+
+
+@pytest.mark.parametrize("head", ["attention", "mean", "max"])
+def test_pooling_heads_ignore_frame_order(head):
+    model = student(head)
+    feats = torch.randn(1, 12, model.feature_dim)
+
+    with torch.no_grad():
+        shuffled = model.classify_features(feats[:, torch.randperm(12)])[0]
+        assert torch.allclose(model.classify_features(feats)[0], shuffled, atol=1e-5)
+
+
+def test_unknown_head_is_rejected():
+    with pytest.raises(ValueError, match="Unknown temporal head"):
+        build_model("mobilenet_v3", temporal_head="transformer")
+
+
+def test_training_updates_only_the_head():
+    model = student("attention")
+    trunk = {k: v.clone() for k, v in model.cnn.state_dict().items()}
+    head = model.head[0].weight.clone()
+    torch.manual_seed(1)
+    feats = (torch.randn(8, 2, 12, model.feature_dim), torch.randn(4, 2, 12, model.feature_dim))
+    labels = (torch.tensor([0.0, 1.0] * 4), torch.tensor([0.0, 1.0] * 2))
+    targets = (torch.randn(8), torch.randn(4))
+    args = Namespace(lr=1e-3, epochs=2, batch_size=4, temperature=2.0, alpha=0.7)
+
+    trained = train_head(model, feats, labels, targets, args, torch.device("cpu"))
+
+    assert not trained.training
+    assert not torch.equal(trained.head[0].weight, head)
+    assert all(torch.equal(v, trunk[k]) for k, v in trained.cnn.state_dict().items())
+    assert head_logits(trained, feats[1][:, 0]).shape == (4,)
+
+
+def test_head_checkpoint_serves_and_streams_without_state(tmp_path):
+    path = tmp_path / "attention.pth"
+    save_checkpoint(path, student("attention"), "mobilenet_v3", {"hidden": 256, "temporal_head": "attention"})
+
+    manager = ModelManager(str(path), device="cpu")
+    scorer = StreamScorer(manager, window=4)
+    for _ in range(4):
+        scorer.sample()
+    result = scorer.add_frames(synthetic_frames(4))
+
+    assert manager.model.temporal_head == "attention" and manager.model.lstm is None
+    assert result["frames_analyzed"] == 4
+    # Pooling heads are stateless, so every window stands alone
+    assert scorer.state is None
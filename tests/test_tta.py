@@ -0,0 +1,61 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import backend
+
+
+def test_variants_cover_every_offset_margin_and_flip(manager, video):
+    result = manager.predict_tta(video(count=48), "key", offsets=[0.0, 0.5], margins=[20, 40], flip=True)
+
+    variants = result["tta"]["scores"]
+    assert result["tta"]["variants"] == len(variants) == 8
+    assert {(v["offset"], v["margin"], v["flip"]) for v in variants} == \
+        {(o, m, f) for o in (0.0, 0.5) for m in (20, 40) for f in (False, True)}
+    assert result["frames_analyzed"] == 12
+
+
+def test_faceless_frames_run_the_trunk_once_per_frame_and_flip(manager, video, monkeypatch):
+    trunk_rows = []
+    batched_features = manager.batched_features
+
+    def counting(faces, chunk=0):
+        trunk_rows.append(len(faces))
+        return batched_features(faces, chunk)
+
+    monkeypatch.setattr(manager, "batched_features", counting)
+    info = manager.predict_tta(video(count=48), "key", offsets=[0.0, 0.5], margins=[20, 40, 60], flip=True)
+
+    # No detector: every margin gives the same full-frame crop, so only frames x flips are distinct
+    assert trunk_rows == [info["frames_real"] * 2]
+
+
+def test_short_video_collapses_duplicate_offsets(manager, video):
+    result = manager.predict_tta(video(count=6), "key", offsets=[0.0, 0.5], margins=[20], flip=False)
+    assert result["tta"]["variants"] == 1
+
+
+def test_tta_cost_follows_the_variant_count():
+    variants = len(backend.TTA_OFFSETS) * len(backend.TTA_MARGINS) * (2 if backend.TTA_FLIP else 1)
+    assert backend.TTA_COST == max(1.0, variants / 2)
+
+
+def test_out_of_range_offsets_fail_at_startup(tmp_path, monkeypatch):
+    monkeypatch.setattr(backend, "TTA_OFFSETS", [0.0, 1.0])
+    with pytest.raises(ValueError, match="TTA_OFFSETS"):
+        backend.ModelManager(str(tmp_path / "model.pth"), device="cpu", architecture="mobilenet_v3")
+
+
+def test_tta_requests_are_charged_by_cost(manager, video, monkeypatch):
+    charged = []
+    monkeypatch.setattr(backend, "model_manager", manager)
+    monkeypatch.setattr(backend, "result_cache", backend.ResultCache(16))
+    monkeypatch.setattr(backend, "check_quota", lambda ticket, cost=1: charged.append(cost))
+    client = TestClient(backend.app)
+    with open(video(count=24), "rb") as f:
+        content = f.read()
+
+    assert client.post("/predict?tta=true", files={"file": ("a.mp4", content, "video/mp4")}).status_code == 200
+    assert client.post("/predict", files={"file": ("a.mp4", content, "video/mp4")}).status_code == 200
+    # Repeats are cache hits and free
+    assert client.post("/predict?tta=true", files={"file": ("a.mp4", content, "video/mp4")}).json()["cached"]
+    assert charged == [backend.TTA_COST, 1.0]
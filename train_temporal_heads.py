@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Temporal Head Training & Benchmark Script
+Trains the parallel temporal heads (attention, temporal conv, mean/max
+pooling) on frozen trunk features of an existing checkpoint and compares
+their latency and accuracy with its BiLSTM
+
+Recipe: the trunk is run once per video (plus a horizontally flipped copy as
+augmentation) and its features cached; each head then trains on those
+features with labels plus the BiLSTM model's logits as soft targets, which
+takes seconds per epoch even on CPU
+
+    python train_temporal_heads.py --model model_epoch_30.pth --frames-dir /content/frames \\
+        --metadata metadata.json --heads attention tconv mean max
+"""
+
+import argparse
+import copy
+import statistics
+import time
+from pathlib import Path
+
+import torch
+import torch.optim as optim
+
+from models import TEMPORAL_HEADS, build_model
+from training import (
+    NUM_FRAMES, accuracy, agreement, count_parameters, distillation_loss, list_videos, load_checkpoint,
+    load_labels, make_loader, measure_latency, save_checkpoint, split_names, write_report
+)
+
+
+@torch.no_grad()
+def trunk_features(model, frames_dir, names, model_path, device, batch_size, workers):
+    """
+    (N, 2, T, D) trunk features per video (original and flipped), cached
+    next to the crops since the trunk is frozen
+    """
+    cache_path = Path(frames_dir) / f"features_{Path(model_path).stem}.pt"
+    cached = torch.load(cache_path) if cache_path.exists() else {}
+
+    missing = [n for n in names if n not in cached]
+    if missing:
+        print(f"🧮 Extracting trunk features for {len(missing)} videos")
+        model.eval()
+        loader = make_loader(frames_dir, missing, batch_size=batch_size, workers=workers)
+        for clips, _, idx in loader:
+            B, T = clips.shape[:2]
+            flat = clips.view(B * T, *clips.shape[2:]).to(device)
+            feats = torch.stack([
+                model.extract_features(flat).view(B, T, -1),
+                model.extract_features(flat.flip(-1)).view(B, T, -1),
+            ], dim=1).half().cpu()
+            for i, f in zip(idx.tolist(), feats):
+                cached[missing[i]] = f
+        torch.save(cached, cache_path)
+
+    return torch.stack([cached[n] for n in names]).float()
+
+
+@torch.no_grad()
+def head_logits(model, feats):
+    model.eval()
+    return model.classify_features(feats)[0].view(-1)
+
+
+def train_head(model, feats, labels, targets, args, device):
+    """Train the temporal head only; returns the best-validation copy"""
+    for p in model.cnn.parameters():
+        p.requires_grad_(False)
+    params = [p for p in model.parameters() if p.requires_grad]
+    opt = optim.AdamW(params, lr=args.lr, weight_decay=1e-4)
+
+    train_feats, val_feats = feats
+    train_labels, val_labels = labels
+    train_targets, val_targets = targets
+
+    best, best_state = -1.0, None
+    for epoch in range(1, args.epochs + 1):
+        model.train()
+        order = torch.randperm(len(train_feats))
+        total = 0.0
+        for start in range(0, len(order), args.batch_size):
+            idx = order[start:start + args.batch_size]
+            # Pick the original or flipped features per video
+            view = torch.randint(0, 2, (len(idx),))
+            batch = train_feats[idx, view].to(device)
+            logits = model.classify_features(batch)[0].view(-1)
+            loss = distillation_loss(logits, train_targets[idx].to(device), train_labels[idx].to(device),
+                                     args.temperature, args.alpha)
+            opt.zero_grad()
+            loss.backward()
+            opt.step()
+            total += loss.item() * len(idx)
+
+        logits = head_logits(model, val_feats[:, 0].to(device)).cpu().numpy()
+        val_acc = accuracy(logits, val_labels.numpy())
+        score = val_acc if val_acc is not None else agreement(logits, val_targets.numpy())
+        if score >= best:
+            best, best_state = score, copy.deepcopy(model.state_dict())
+        if epoch == args.epochs or epoch % max(args.epochs // 5, 1) == 0:
+            print(f"   {model.temporal_head:<9} epoch {epoch}: Train Loss={total / len(order):.4f} | Val score={score:.4f}")
+
+    model.load_state_dict(best_state)
+    return model.eval()
+
+
+@torch.no_grad()
+def benchmark(model, feats, device, repeats):
+    """Median head-only latency on one clip's features, and full-clip latency"""
+    clip_feats = feats[:1, 0].to(device)
+    model.eval()
+    model.classify_features(clip_feats)
+
+    timings = []
+    for _ in range(repeats * 10):
+        start = time.perf_counter()
+        model.classify_features(clip_feats)
+        if device.type == "cuda":
+            torch.cuda.synchronize()
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "head_latency_ms": statistics.median(timings) * 1000,
+        "clip_latency_ms": measure_latency(model, 1, repeats) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and benchmark parallel temporal heads")
+    parser.add_argument("--model", default="model_epoch_30.pth", help="BiLSTM checkpoint providing the trunk")
+    parser.add_argument("--frames-dir", required=True, help="Face crops as written by the training notebook")
+    parser.add_argument("--metadata", help="DFDC metadata.json with REAL/FAKE labels (optional)")
+    parser.add_argument("--heads", nargs="+", default=[h for h in TEMPORAL_HEADS if h != "bilstm"],
+                        choices=TEMPORAL_HEADS)
+    parser.add_argument("--epochs", type=int, default=30)
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--temperature", type=float, default=2.0)
+    parser.add_argument("--alpha", type=float, default=0.5, help="Weight of matching the BiLSTM vs labels")
+    parser.add_argument("--val-fraction", type=float, default=0.2)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--device", default="cuda")
+    parser.add_argument("--output-dir", type=Path, default=Path("heads"))
+    parser.add_argument("--json", metavar="PATH", help="Write the benchmark as JSON")
+    args = parser.parse_args()
+
+    device = torch.device(args.device if torch.cuda.is_available() else "cpu")
+    base, architecture, config = load_checkpoint(args.model, device=device)
+    if base.temporal_head != "bilstm":
+        print(f"⚠️ {args.model} already uses the {base.temporal_head} head; it is still the reference")
+
+    labels = load_labels(args.metadata)
+    names = list_videos(args.frames_dir)
+    if not names:
+        raise SystemExit(f"❌ No cached face crops found in {args.frames_dir}")
+    train_names, val_names = split_names(names, args.val_fraction)
+
+    print("🚀 Temporal Head Benchmark")
+    print("=" * 50)
+    print(f"   Trunk: {args.model} ({architecture}, frozen)")
+    print(f"   Heads: {', '.join(args.heads)}")
+    print(f"   Videos: {len(train_names)} train, {len(val_names)} validation, {len(labels)} labelled")
+
+    feats = trunk_features(base, args.frames_dir, names, args.model, device, args.batch_size, args.workers)
+    video_labels = torch.tensor([labels.get(n, -1.0) for n in names])
+    targets = head_logits(base, feats[:, 0].to(device)).cpu()
+
+    split = len(train_names)
+    feats_split = (feats[:split], feats[split:])
+    labels_split = (video_labels[:split], video_labels[split:])
+    targets_split = (targets[:split], targets[split:])
+    val_targets = targets[split:].numpy()
+
+    entries = [(f"{base.temporal_head} (current)", base)]
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    for head in args.heads:
+        # The trunk is copied from the base model, so no pretrained weights are fetched
+        model = build_model(architecture, pretrained=False, **dict(config, temporal_head=head)).to(device)
+        model.cnn.load_state_dict(base.cnn.state_dict())
+        model = train_head(model, feats_split, labels_split, targets_split, args, device)
+
+        path = args.output_dir / f"{Path(args.model).stem}_{head}.pth"
+        save_checkpoint(path, model, architecture, dict(config, temporal_head=head), source=str(args.model))
+        entries.append((head, model))
+
+    rows = []
+    print(f"\n   {'head':<17} {'head params':>11} {'head ms':>8} {'clip ms':>8} {'acc':>6} {'agree':>6}")
+    for name, model in entries:
+        logits = head_logits(model, feats_split[1][:, 0].to(device)).cpu().numpy()
+        row = {
+            "head": name,
+            "head_parameters": count_parameters(model) - count_parameters(model.cnn),
+            "accuracy": accuracy(logits, labels_split[1].numpy()),
+            "agreement": agreement(logits, val_targets),
+        }
+        row.update(benchmark(model, feats, device, args.repeats))
+        rows.append(row)
+
+        acc = f"{row['accuracy']:.1%}" if row["accuracy"] is not None else "-"
+        print(f"   {name:<17} {row['head_parameters'] / 1e6:>10.2f}M {row['head_latency_ms']:>8.2f} "
+              f"{row['clip_latency_ms']:>8.1f} {acc:>6} {row['agreement']:>6.1%}")
+
+    print(f"\n✅ Checkpoints in {args.output_dir} (serve with MODEL_PATH=...; {NUM_FRAMES} frames per clip)")
+    if args.json:
+        write_report(args.json, args, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Shared training / evaluation helpers for the model tooling scripts
+Reads the face-crop cache written by the training notebook
+(<frames_dir>/<video>/frame_0000.jpg ... with DFDC metadata.json labels)
+"""
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torchvision.transforms as T
+from PIL import Image
+from torch.utils.data import Dataset, DataLoader
+from tqdm import tqdm
+
+from models import build_model
+
+
+NUM_FRAMES = 12
+NORMALIZE = T.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225])
+
+
+# ============================================================================
+# DATA
+# ============================================================================
+
+def load_labels(metadata_path):
+    """DFDC metadata.json -> {video stem: 1.0 (FAKE) / 0.0 (REAL)}; {} without metadata"""
+    if not metadata_path:
+        return {}
+    with open(metadata_path) as f:
+        raw = json.load(f)
+    return {Path(k).stem: 1.0 if v["label"] == "FAKE" else 0.0 for k, v in raw.items()}
+
+
+def list_videos(frames_dir, num_frames=NUM_FRAMES):
+    """Video folders that hold a complete set of cached face crops"""
+    root = Path(frames_dir)
+    return sorted(
+        d.name for d in root.iterdir()
+        if d.is_dir() and all((d / f"frame_{i:04d}.jpg").exists() for i in range(num_frames))
+    )
+
+
+def split_names(names, val_fraction=0.2):
+    """First 80% train, last 20% validation, as in the training notebook"""
+    split = int(round((1 - val_fraction) * len(names)))
+    return names[:split], names[split:]
+
+
+class FrameDataset(Dataset):
+    """
+    Cached face crops of one video as a (T, 3, 224, 224) clip
+    Items are (clip, label, index); label is -1 for unlabelled videos
+    """
+
+    def __init__(self, root, names, labels=None, augment=False, num_frames=NUM_FRAMES):
+        self.root = Path(root)
+        self.names = list(names)
+        self.labels = labels or {}
+        self.num_frames = num_frames
+
+        if augment:
+            self.tf = T.Compose([
+                T.RandomHorizontalFlip(p=0.5),
+                T.ColorJitter(brightness=0.2, contrast=0.2, saturation=0.2, hue=0.1),
+                T.RandomRotation(degrees=5),
+                T.ToTensor(),
+                NORMALIZE
+            ])
+        else:
+            self.tf = T.Compose([T.ToTensor(), NORMALIZE])
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, idx):
+        name = self.names[idx]
+        folder = self.root / name
+        frames = [
+            self.tf(Image.open(folder / f"frame_{i:04d}.jpg").convert("RGB"))
+            for i in range(self.num_frames)
+        ]
+        label = self.labels.get(name, -1.0)
+        return torch.stack(frames), torch.tensor(label, dtype=torch.float32), idx
+
+
+def make_loader(root, names, labels=None, augment=False, batch_size=4, workers=2, shuffle=False):
+    dataset = FrameDataset(root, names, labels, augment)
+    return DataLoader(dataset, batch_size=batch_size, shuffle=shuffle, num_workers=workers)
+
+
+# ============================================================================
+# CHECKPOINTS
+# ============================================================================
+
+def load_checkpoint(path, architecture="resnet50", device="cpu"):
+    """Load any checkpoint ModelManager can serve; returns (model, architecture, model_config)"""
+    checkpoint = torch.load(path, map_location=device)
+
+    config = {"hidden": 256}
+    if isinstance(checkpoint, dict) and "architecture" in checkpoint:
+        architecture = checkpoint["architecture"]
+        config.update(checkpoint.get("model_config") or {})
+
+    state = checkpoint
+    if isinstance(checkpoint, dict):
+        state = checkpoint.get("model_state_dict") or checkpoint.get("state_dict") or checkpoint
+
+    model = build_model(architecture, pretrained=False, **config)
+    model.load_state_dict(state)
+    return model.to(device).eval(), architecture, config
+
+
+def save_checkpoint(path, model, architecture, model_config=None, **extra):
+    """Save in the format ModelManager.load_model reads back with its architecture"""
+    torch.save({
+        "architecture": architecture,
+        "model_config": model_config or {},
+        "model_state_dict": model.state_dict(),
+        **extra,
+    }, path)
+
+
+# ============================================================================
+# EVALUATION
+# ============================================================================
+
+@torch.no_grad()
+def predict_logits(model, loader, device="cpu"):
+    """Returns (logits, labels) as numpy arrays over the loader's videos"""
+    model.eval()
+    logits, labels = [], []
+    for clips, batch_labels, _ in loader:
+        logits.append(model(clips.to(device)).view(-1).float().cpu())
+        labels.append(batch_labels)
+    return torch.cat(logits).numpy(), torch.cat(labels).numpy()
+
+
+def accuracy(logits, labels, threshold=0.5):
+    """Accuracy over labelled videos (label >= 0); None when nothing is labelled"""
+    mask = labels >= 0
+    if not mask.any():
+        return None
+    predictions = 1.0 / (1.0 + np.exp(-logits[mask])) > threshold
+    return float((predictions == (labels[mask] > 0.5)).mean())
+
+
+def agreement(logits, reference_logits):
+    """Share of videos where two models give the same REAL/FAKE verdict"""
+    return float(((logits > 0) == (reference_logits > 0)).mean()) if len(logits) else None
+
+
+def count_parameters(model):
+    return sum(p.numel() for p in model.parameters())
+
+
+def flops_per_clip(model, num_frames=NUM_FRAMES, image_size=224):
+    """Forward FLOPs (multiply-add = 2) of one clip, via torch's FLOP counter"""
+    from torch.utils.flop_counter import FlopCounterMode
+
+    clip = torch.zeros(1, num_frames, 3, image_size, image_size, device=next(model.parameters()).device)
+    counter = FlopCounterMode(display=False)
+    with torch.no_grad(), counter:
+        model(clip)
+    return counter.get_total_flops()
+
+
+@torch.no_grad()
+def measure_latency(model, batch_size=1, repeats=5, num_frames=NUM_FRAMES, image_size=224):
+    """Median seconds per forward of a (batch_size, T, 3, H, W) batch, after one warm-up"""
+    device = next(model.parameters()).device
+    clips = torch.randn(batch_size, num_frames, 3, image_size, image_size, device=device)
+    model.eval()
+    model(clips)
+
+    timings = []
+    for _ in range(repeats):
+        if device.type == "cuda":
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        model(clips)
+        if device.type == "cuda":
+            torch.cuda.synchronize()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def model_costs(model, batch_size=8, repeats=5):
+    """Parameters, GFLOPs per clip, batch-1 latency and batched throughput"""
+    latency = measure_latency(model, 1, repeats)
+    batched = measure_latency(model, batch_size, repeats)
+    return {
+        "parameters": count_parameters(model),
+        "gflops_per_clip": flops_per_clip(model) / 1e9,
+        "latency_ms": latency * 1000,
+        "clips_per_second": batch_size / batched,
+    }
+
+
+def distillation_loss(student_logits, teacher_logits, labels, temperature=2.0, alpha=0.7):
+    """
+    alpha * T^2 * BCE(student / T, sigmoid(teacher / T)) + (1 - alpha) * BCE on
+    labelled videos (label >= 0); unlabelled batches use the soft term only
+    """
+    soft = nn.functional.binary_cross_entropy_with_logits(
+        student_logits / temperature, torch.sigmoid(teacher_logits / temperature)
+    ) * temperature ** 2
+
+    mask = labels >= 0
+    if not mask.any():
+        return soft
+    hard = nn.functional.binary_cross_entropy_with_logits(student_logits[mask], labels[mask])
+    return alpha * soft + (1 - alpha) * hard
+
+
+def train_epoch(model, loader, opt, soft_targets, device="cpu", temperature=2.0, alpha=0.7, desc="Training"):
+    """
+    One epoch of distillation_loss training; soft_targets holds the teacher
+    logit of every video in the loader's dataset. Returns the mean loss
+    """
+    model.train()
+    total = 0.0
+    for clips, labels, idx in tqdm(loader, desc=desc):
+        clips, labels = clips.to(device), labels.to(device)
+        logits = model(clips).view(-1)
+        loss = distillation_loss(logits, soft_targets[idx].to(device), labels, temperature, alpha)
+
+        opt.zero_grad()
+        loss.backward()
+        opt.step()
+        total += loss.item() * clips.size(0)
+    return total / len(loader.dataset)
+
+
+def teacher_logits(teacher_path, frames_dir, names, device="cpu", batch_size=4, workers=2):
+    """Teacher logits per video on un-augmented crops, cached next to the crops"""
+    cache_path = Path(frames_dir) / f"teacher_logits_{Path(teacher_path).stem}.json"
+    cached = json.loads(cache_path.read_text()) if cache_path.exists() else {}
+
+    missing = [n for n in names if n not in cached]
+    if missing:
+        print(f"🧑‍🏫 Scoring {len(missing)} videos with the teacher")
+        teacher, _, _ = load_checkpoint(teacher_path, device=device)
+        logits, _ = predict_logits(teacher, make_loader(frames_dir, missing, batch_size=batch_size, workers=workers), device)
+        cached.update({n: float(l) for n, l in zip(missing, logits)})
+        cache_path.write_text(json.dumps(cached))
+
+    return torch.tensor([cached[n] for n in names], dtype=torch.float32)
+
+
+# ============================================================================
+# REPORTS
+# ============================================================================
+
+def compare_models(models, loader, device="cpu", reference=None):
+    """
+    Accuracy, agreement and cost rows for (name, model, architecture) entries
+    Agreement is measured against `reference` logits, or the first model's
+    """
+    rows = []
+    for name, model, architecture in models:
+        logits, labels = predict_logits(model.to(device), loader, device)
+        if reference is None:
+            reference = logits
+
+        row = {"model": str(name), "architecture": architecture}
+        row["accuracy"] = accuracy(logits, labels)
+        row["agreement"] = agreement(logits, np.asarray(reference))
+        row.update(model_costs(model.cpu()))
+        rows.append(row)
+    return rows
+
+
+def print_report(rows):
+    print(f"\n   {'model':<28} {'arch':<16} {'params':>8} {'GFLOPs':>7} {'ms/clip':>8} {'clips/s':>8} {'acc':>6} {'agree':>6}")
+    for r in rows:
+        acc = f"{r['accuracy']:.1%}" if r["accuracy"] is not None else "-"
+        agree = f"{r['agreement']:.1%}" if r["agreement"] is not None else "-"
+        print(f"   {Path(r['model']).name:<28} {r['architecture']:<16} {r['parameters'] / 1e6:>7.1f}M "
+              f"{r['gflops_per_clip']:>7.1f} {r['latency_ms']:>8.1f} {r['clips_per_second']:>8.2f} "
+              f"{acc:>6} {agree:>6}")
+
+
+def write_report(path, args, rows, **extra):
+    """Dump CLI arguments and report rows as JSON"""
+    with open(path, "w") as f:
+        json.dump({"config": {k: str(v) for k, v in vars(args).items()}, "results": rows, **extra}, f, indent=2)